@@ -11,6 +11,7 @@ from emissor.processing.util import discover_plugins, from_plugins
 from emissor.representation.annotation import Triple, Entity, EntityType
 from emissor.representation.container import MultiIndex, Index, AtomicRuler, Ruler
 from emissor.representation.entity import Person, Gender, Emotion
+from emissor.representation.ids import new_id
 from emissor.representation.scenario import Scenario, Modality, Mention, \
     Annotation, Signal
 
@@ -58,19 +59,15 @@ class Backend:
         return ctrl.signals[modality]
 
     def load_signal(self, scenario_id: str, modality: Modality, signal_id: str) -> Signal[Any, Any]:
-        for signal in self.load_modality(scenario_id, modality):
-            if signal.id == signal_id:
-                return signal
-
-        return None
+        return self._load_scenario_ctrl(scenario_id).get_signal(signal_id, modality)
 
     def save_signal(self, scenario_id: str, signal: Signal[Any, Any]) -> None:
         scenario_ctrl = self._load_scenario_ctrl(scenario_id)
         scenario_ctrl.append_signal(signal)
-        self._storage.save_scenario(scenario_ctrl)
+        self._storage.save_signal(scenario_ctrl, signal)
 
     def create_mention(self, scenario_id: str, modality: Modality, signal_id: str):
-        return Mention(str(uuid.uuid4()), [], [])
+        return Mention(new_id(), [], [])
 
     def create_annotation(self, type_: str):
         if type_.lower() == "person":
@@ -125,16 +122,13 @@ class Backend:
     def create_denotations(self, scenario_id: str, modality: str, signal_id: str, mention_id: str,
                            annotation_id: str) -> Dict:
 
-        # Load modality data
-        signals = self.load_modality(scenario_id, Modality[modality.upper()])
-
-        # Filter signals to get the right one
-        signals = [sig for sig in signals if sig.id == signal_id]
-        signal = signals[0]
-
-        # Filter mentions to get the right one
-        mentions = [men for men in signal.mentions if men.id == mention_id]
-        mention = mentions[0]
+        # Look up the signal and mention by id
+        ctrl = self._load_scenario_ctrl(scenario_id)
+        signal = ctrl.get_signal(signal_id, Modality[modality.upper()])
+        signal_mention = ctrl.get_mention(mention_id)
+        if not signal or not signal_mention or signal_mention[0] is not signal:
+            raise ValueError(f"No mention {mention_id} in signal {signal_id}")
+        _, mention = signal_mention
 
         # Filter annotations to get the right one
         annotations = [ann for ann in mention.annotations if ann.value.id == annotation_id]
@@ -1,13 +1,24 @@
+import contextlib
+import copy
 import logging
-from glob import glob
+import re
+import uuid
+from glob import glob, escape as glob_escape
 
 import os
 from pathlib import Path
 from types import MappingProxyType
-from typing import Iterable, Optional, Any, Union, Mapping, Dict, Tuple
+from typing import Iterable, Optional, Any, Union, Mapping, Dict, Tuple, Iterator, Type, List, Set
 
-from emissor.representation.scenario import Scenario, Modality, Signal, AudioSignal, ImageSignal, TextSignal, ScenarioContext
-from emissor.representation.util import unmarshal, marshal
+import numpy as np
+import simplejson as json
+
+from emissor.representation.container import Index
+from emissor.representation.intervals import IntervalIndex
+from emissor.representation.scenario import Scenario, Modality, Signal, AudioSignal, ImageSignal, TextSignal, ScenarioContext, \
+    Mention, Annotation, FileArrayContainer, ColumnarMentions
+from emissor.representation.util import unmarshal, marshal, unmarshal_stream, BinaryArrayReader, BinaryArrayWriter, \
+    ARRAY_REFERENCE_FIELD
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +34,30 @@ DEFAULT_SIGNAL_PATHS = MappingProxyType({
 })
 
 
+JSONL_SIGNAL_PATHS = MappingProxyType({
+    Modality.AUDIO.name.lower(): "./audio.jsonl",
+    Modality.IMAGE.name.lower(): "./image.jsonl",
+    Modality.TEXT.name.lower(): "./text.jsonl"
+})
+
+
+_ARRAY_REFERENCE = re.compile(r'"' + re.escape(ARRAY_REFERENCE_FIELD) + r'"\s*:\s*"([^"]+)"')
+
+
+def atomic_write(path: str, content: str) -> None:
+    """
+    Write `content` to a temporary file next to `path` and move it to `path`,
+    such that `path` never contains partially written content.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as tmp_file:
+        tmp_file.write(content)
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+
+    os.replace(tmp_path, path)
+
+
 def file_name(path):
     return os.path.splitext(base_name(path))[0]
 
@@ -36,12 +71,116 @@ class ScenarioController:
         self._storage = storage
         self._scenario = scenario
         self._signals = dict()
+        self._signal_index = None
+        self._mention_index = None
+        self._time_indices = dict()
+        self._offset_indices = dict()
+        self._dirty = set()
 
     def append_signal(self, signal: Signal[Any, Any]):
         if signal.modality not in self._signals:
             self.load_signals((signal.modality,))
 
         self._signals[signal.modality].append(signal)
+        # noinspection PyProtectedMember
+        self._storage._attach_base_path(signal, self.id)
+        self._dirty.add(signal.modality)
+
+        if self._signal_index is not None:
+            self._signal_index[signal.id] = signal
+        if self._mention_index is not None:
+            self._mention_index.update(self._index_mentions(signal))
+        self._time_indices.pop(signal.modality, None)
+
+    def add_mention(self, signal: Signal[Any, Any], mention: Mention):
+        signal.mentions.append(mention)
+        self._dirty.add(signal.modality)
+
+        if self._mention_index is not None:
+            self._mention_index[mention.id] = (signal, mention)
+
+    def add_annotation(self, mention_id: str, annotation: Annotation):
+        signal_mention = self.get_mention(mention_id)
+        if not signal_mention:
+            raise ValueError(f"No mention with id {mention_id} in scenario {self.id}")
+
+        signal, mention = signal_mention
+        mention.annotations.append(annotation)
+        self._dirty.add(signal.modality)
+
+    def mark_dirty(self, *modalities: Modality):
+        """
+        Mark modalities as modified, such that they are written on the next
+        save of the scenario.
+
+        Changes made through :meth:`append_signal`, :meth:`add_mention` and
+        :meth:`add_annotation` are tracked automatically, this method must be
+        called when signals are modified directly.
+        """
+        self._dirty.update(modalities)
+        self._reset_interval_indices(modalities)
+
+    def mark_clean(self, *modalities: Modality):
+        self._dirty.difference_update(modalities)
+
+    def is_dirty(self, modality: Modality) -> bool:
+        return modality in self._dirty
+
+    def get_signal(self, signal_id: str, modality: Modality = None) -> Optional[Signal[Any, Any]]:
+        """
+        Look up a signal by its id.
+
+        Parameters
+        ----------
+        signal_id : str
+            The id of the signal.
+        modality : Modality, optional
+            The modality of the signal. If provided, the modality is loaded
+            if necessary, otherwise only already loaded modalities are
+            searched.
+
+        Returns
+        -------
+        Optional[Signal[Any, Any]]
+            The signal or 'None' if there is no signal with the given id.
+        """
+        if modality and modality not in self._signals:
+            self.load_signals((modality,))
+
+        if self._signal_index is None:
+            self._signal_index = {signal.id: signal for signals in self._signals.values() for signal in signals}
+
+        return self._signal_index.get(signal_id)
+
+    def get_mention(self, mention_id: str) -> Optional[Tuple[Signal[Any, Any], Mention]]:
+        """
+        Look up a mention by its id in the loaded signals.
+
+        Mentions added to a signal with :meth:`add_mention` are indexed
+        directly, mentions added otherwise are picked up by re-indexing the
+        loaded signals when a lookup fails.
+
+        Parameters
+        ----------
+        mention_id : str
+            The id of the mention.
+
+        Returns
+        -------
+        Optional[Tuple[Signal[Any, Any], Mention]]
+            The mention and the signal that contains it, or 'None' if there
+            is no mention with the given id.
+        """
+        if self._mention_index is None or mention_id not in self._mention_index:
+            self._mention_index = {mention_id: entry
+                                   for signals in self._signals.values() for signal in signals
+                                   for mention_id, entry in self._index_mentions(signal).items()}
+
+        return self._mention_index.get(mention_id)
+
+    @staticmethod
+    def _index_mentions(signal: Signal[Any, Any]) -> Dict[str, Tuple[Signal[Any, Any], Mention]]:
+        return {mention.id: (signal, mention) for mention in signal.mentions}
 
     @property
     def id(self) -> str:
@@ -57,9 +196,41 @@ class ScenarioController:
 
     def load_signals(self, modalities: Tuple[Modality]):
         for modality in modalities:
-            signals = self._storage.load_modality(self.scenario.id, modality)
+            signals = self._storage.load_modality(self.scenario.id, modality, scenario=self.scenario)
             signals = signals if signals else []
             self._signals[modality] = signals
+            self._dirty.discard(modality)
+
+        self._signal_index = None
+        self._mention_index = None
+        self._reset_interval_indices(modalities)
+
+    def replace_signals(self, signals: Iterable[Signal[Any, Any]]):
+        """
+        Replace loaded signals with signals that have the same id, e.g.
+        copies of the signals that were modified in another process.
+
+        Parameters
+        ----------
+        signals : Iterable[Signal[Any, Any]]
+            The signals that replace the loaded signals. The modalities of
+            the signals must be loaded.
+        """
+        positions = dict()
+        for signal in signals:
+            if signal.modality not in positions:
+                positions[signal.modality] = {loaded.id: idx for idx, loaded in enumerate(self._signals[signal.modality])}
+            if signal.id not in positions[signal.modality]:
+                raise ValueError(f"No signal with id {signal.id} in scenario {self.id}")
+
+            self._signals[signal.modality][positions[signal.modality][signal.id]] = signal
+            # noinspection PyProtectedMember
+            self._storage._attach_base_path(signal, self.id)
+
+        self._dirty.update(positions.keys())
+        self._signal_index = None
+        self._mention_index = None
+        self._reset_interval_indices(positions.keys())
 
     def get_signals(self, modality: Modality) -> Iterable[Signal[Any, Any]]:
         if modality not in self._signals:
@@ -67,18 +238,373 @@ class ScenarioController:
 
         return list(self._signals[modality])
 
+    def signals_between(self, start: int, end: int,
+                        modalities: Iterable[Modality] = None) -> List[Signal[Any, Any]]:
+        """
+        Find the signals whose time overlaps the interval from `start` to
+        `end`, including signals that start at `end` or end at `start`.
+
+        Parameters
+        ----------
+        start : int
+            The start of the interval.
+        end : int
+            The end of the interval.
+        modalities : Iterable[Modality], optional
+            The modalities of the signals, which are loaded if necessary. By
+            default the signals of the loaded modalities are searched.
+
+        Returns
+        -------
+        List[Signal[Any, Any]]
+            The signals ordered by their start time.
+        """
+        modalities = tuple(modalities) if modalities is not None else tuple(self._signals.keys())
+        unloaded = tuple(modality for modality in modalities if modality not in self._signals)
+        if unloaded:
+            self.load_signals(unloaded)
+
+        signals = [signal for modality in modalities
+                   for signal in self._get_time_index(modality).overlapping(start, end, closed=True)]
+
+        return sorted(signals, key=lambda signal: signal.time.start) if len(modalities) > 1 else signals
+
+    def mentions_at(self, signal: Signal[Any, Any], offset: int) -> List[Mention]:
+        """
+        Find the mentions of a signal with an :class:`Index` segment that
+        contains `offset`, e.g. the mentions of a character in a text signal.
+
+        Parameters
+        ----------
+        signal : Signal[Any, Any]
+            The signal of the mentions.
+        offset : int
+            The offset in the signal.
+
+        Returns
+        -------
+        List[Mention]
+            The mentions ordered by the start of their segment.
+        """
+        rows = dict.fromkeys(self._get_offset_index(signal).containing(offset))
+
+        return [signal.mentions[row] for row in rows]
+
+    def _get_time_index(self, modality: Modality) -> IntervalIndex:
+        if modality not in self._time_indices:
+            signals = self._signals[modality]
+            self._time_indices[modality] = IntervalIndex([signal.time.start for signal in signals],
+                                                         [signal.time.end for signal in signals], signals)
+
+        return self._time_indices[modality]
+
+    def _get_offset_index(self, signal: Signal[Any, Any]) -> IntervalIndex:
+        # Mentions added directly to the signal change the mentions or their number
+        mentions, length, index = self._offset_indices.get(signal.id, (None, None, None))
+        if mentions is not signal.mentions or length != len(signal.mentions):
+            index = self._index_segments(signal.mentions)
+            self._offset_indices[signal.id] = (signal.mentions, len(signal.mentions), index)
+
+        return index
+
+    @staticmethod
+    def _index_segments(mentions: Iterable[Mention]) -> IntervalIndex:
+        starts, stops, rows = [], [], []
+        object_rows = range(len(mentions))
+        if isinstance(mentions, ColumnarMentions):
+            # Segments stored in columns are indexed without creating mention objects
+            columnar = mentions.annotation_types != None
+            object_rows = np.flatnonzero(~columnar).tolist()
+            if mentions.offsets.shape[1] == 2:
+                starts = mentions.offsets[columnar, 0].tolist()
+                stops = mentions.offsets[columnar, 1].tolist()
+                rows = np.flatnonzero(columnar).tolist()
+
+        for row in object_rows:
+            for segment in mentions[row].segment:
+                if isinstance(segment, Index) and segment.stop is not None:
+                    starts.append(segment.start)
+                    stops.append(segment.stop)
+                    rows.append(row)
+
+        return IntervalIndex(starts, stops, rows)
+
+    def _reset_interval_indices(self, modalities: Iterable[Modality]):
+        for modality in modalities:
+            self._time_indices.pop(modality, None)
+        self._offset_indices.clear()
+
+
+class SignalArrayFiles:
+    """
+    Binary files with the arrays of the signals in a modality file.
+
+    Array files are named after the modality file with a unique suffix, such
+    that a new array file can be written without invalidating the references
+    in the current modality file. Array files that were referenced by the
+    replaced modality file only are removed after the modality file is
+    replaced, other files are never removed.
+    """
+    EXTENSION = ".bin"
+
+    def __init__(self, path: str):
+        self._path = path
+        self.reader = BinaryArrayReader(os.path.dirname(path))
+
+    def new_writer(self) -> BinaryArrayWriter:
+        return BinaryArrayWriter(f"{self._path}.{uuid.uuid4().hex[:12]}{self.EXTENSION}")
+
+    def append_writer(self, file_name: str) -> BinaryArrayWriter:
+        return BinaryArrayWriter(os.path.join(os.path.dirname(self._path), file_name))
+
+    def referenced(self) -> Set[str]:
+        """
+        The names of the array files referenced by the modality file. The
+        modality file is only scanned if there are array files for it.
+        """
+        if not glob(f"{glob_escape(self._path)}.*{self.EXTENSION}"):
+            return set()
+
+        try:
+            with open(self._path, encoding="utf-8") as modality_file:
+                return {file_name for line in modality_file for file_name in _ARRAY_REFERENCE.findall(line)
+                        if self._is_array_file(file_name)}
+        except FileNotFoundError:
+            return set()
+
+    def remove(self, file_names: Iterable[str]) -> None:
+        for file_name in file_names:
+            array_path = os.path.join(os.path.dirname(self._path), file_name)
+            if self._is_array_file(file_name) and os.path.isfile(array_path):
+                os.remove(array_path)
+                logger.debug("Removed array file %s", array_path)
+
+    def _is_array_file(self, file_name: str) -> bool:
+        return file_name.startswith(os.path.basename(self._path) + ".") and file_name.endswith(self.EXTENSION)
+
+
+class JsonLinesSignalFile:
+    """
+    Modality file with one signal per line.
+
+    Next to the data file an append-only index file is kept, with a line
+    `<signal id> <offset> <length>` for each record written to the data file.
+    Appending or updating a signal only appends a new record to both files,
+    records that are superseded by an update remain in the data file until it
+    is compacted. Compaction happens when more than :attr:`COMPACTION_RATIO`
+    of the data file is occupied by superseded records.
+    """
+    INDEX_EXTENSION = ".idx"
+    COMPACTION_RATIO = 0.5
+
+    def __init__(self, path: str, cls: Type[Signal[Any, Any]], binary_arrays: Optional[bool] = None):
+        self._path = path
+        self._index_path = path + self.INDEX_EXTENSION
+        self._cls = cls
+        self._records = None
+        self._garbage = 0
+        self._size = 0
+        self._array_files = SignalArrayFiles(path)
+        self._binary_arrays = binary_arrays
+        self._detected_binary_arrays = None
+        self._array_file_name = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def exists(self) -> bool:
+        return os.path.isfile(self._path)
+
+    def signal_ids(self) -> Iterable[str]:
+        return tuple(self._get_records().keys())
+
+    def load_signal(self, signal_id: str) -> Optional[Signal[Any, Any]]:
+        records = self._get_records()
+        if signal_id not in records:
+            return None
+
+        with open(self._path, 'rb') as data_file:
+            return self._read_record(data_file, *records[signal_id])
+
+    def iter_signals(self) -> Iterator[Signal[Any, Any]]:
+        records = self._get_records()
+        with open(self._path, 'rb') as data_file:
+            for offset, length in list(records.values()):
+                yield self._read_record(data_file, offset, length)
+
+    def save_signal(self, signal: Signal[Any, Any]) -> None:
+        records = self._get_records()
+
+        writer = None
+        if self._uses_binary_arrays():
+            writer = self._array_files.append_writer(self._array_file_name) if self._array_file_name \
+                else self._array_files.new_writer()
+        with writer if writer else contextlib.nullcontext():
+            record = self._serialize(signal, writer)
+        if writer and writer.written:
+            self._array_file_name = writer.file_name
+
+        with open(self._path, 'ab') as data_file:
+            offset = data_file.tell()
+            data_file.write(record)
+        with open(self._index_path, 'a') as index_file:
+            index_file.write(f"{signal.id} {offset} {len(record)}\n")
+
+        if signal.id in records:
+            self._garbage += records[signal.id][1]
+        records[signal.id] = (offset, len(record))
+        self._size = offset + len(record)
+
+        if self._garbage > self.COMPACTION_RATIO * self._size:
+            self.compact()
+
+    def save_signals(self, signals: Iterable[Signal[Any, Any]]) -> None:
+        records = dict()
+        offset = 0
+        data_tmp, index_tmp = self._path + ".tmp", self._index_path + ".tmp"
+        referenced = self._array_files.referenced()
+        binary_arrays = self._binary_arrays if self._binary_arrays is not None else bool(referenced)
+        writer = self._array_files.new_writer() if binary_arrays else None
+        with open(data_tmp, 'wb') as data_file, open(index_tmp, 'w') as index_file, \
+                writer if writer else contextlib.nullcontext():
+            for signal in signals:
+                record = self._serialize(signal, writer)
+                data_file.write(record)
+                index_file.write(f"{signal.id} {offset} {len(record)}\n")
+                records[signal.id] = (offset, len(record))
+                offset += len(record)
+            data_file.flush()
+            os.fsync(data_file.fileno())
+
+        os.replace(data_tmp, self._path)
+        os.replace(index_tmp, self._index_path)
+        self._array_file_name = writer.file_name if writer and writer.written else None
+        self._array_files.remove(referenced)
+        self._detected_binary_arrays = binary_arrays
+        self._records = records
+        self._garbage = 0
+        self._size = offset
+
+    def compact(self) -> None:
+        logger.debug("Compact %s", self._path)
+        self.save_signals(list(self.iter_signals()))
+
+    def _uses_binary_arrays(self) -> bool:
+        if self._binary_arrays is not None:
+            return self._binary_arrays
+        if self._detected_binary_arrays is None:
+            self._detected_binary_arrays = bool(self._array_files.referenced())
+
+        return self._detected_binary_arrays
+
+    def _serialize(self, signal: Signal[Any, Any], array_writer: BinaryArrayWriter = None) -> bytes:
+        return (marshal(signal, cls=self._cls, indent=None, array_writer=array_writer) + "\n").encode("utf-8")
+
+    def _read_record(self, data_file, offset: int, length: int) -> Signal[Any, Any]:
+        data_file.seek(offset)
+
+        return unmarshal(data_file.read(length).decode("utf-8"), cls=self._cls,
+                         array_reader=self._array_files.reader)
+
+    def _get_records(self) -> Dict[str, Tuple[int, int]]:
+        # Reload if the file was modified by another instance
+        size = os.path.getsize(self._path) if self.exists() else 0
+        if self._records is None or size != self._size:
+            self._records, self._garbage = self._load_index()
+            self._size = size
+
+        return self._records
+
+    def _load_index(self):
+        if not self.exists():
+            return dict(), 0
+
+        data_size = os.path.getsize(self._path)
+        if os.path.isfile(self._index_path):
+            records, garbage, end = self._read_index()
+            if end == data_size:
+                return records, garbage
+            logger.warning("Index %s out of sync with %s, rebuilding the index", self._index_path, self._path)
+
+        return self._rebuild_index()
+
+    def _read_index(self):
+        records = dict()
+        garbage = 0
+        end = 0
+        with open(self._index_path) as index_file:
+            for line in index_file:
+                signal_id, offset, length = line.rsplit(" ", 2)
+                offset, length = int(offset), int(length)
+                if signal_id in records:
+                    garbage += records[signal_id][1]
+                records[signal_id] = (offset, length)
+                end = max(end, offset + length)
+
+        return records, garbage, end
+
+    def _rebuild_index(self):
+        records = dict()
+        garbage = 0
+        offset = 0
+        with open(self._path, 'rb') as data_file, open(self._index_path, 'w') as index_file:
+            for line in data_file:
+                if line.strip():
+                    signal_id = json.loads(line)["id"]
+                    if signal_id in records:
+                        garbage += records[signal_id][1]
+                    records[signal_id] = (offset, len(line))
+                    index_file.write(f"{signal_id} {offset} {len(line)}\n")
+                offset += len(line)
+
+        return records, garbage
+
 
 class ScenarioStorage:
     EXTENSION = ".json"
-
-    def __init__(self, data_path):
+    JSONL_EXTENSION = ".jsonl"
+    PROVENANCE_FILE = ".provenance.json"
+
+    def __init__(self, data_path, binary_arrays: Optional[bool] = None):
+        """
+        Parameters
+        ----------
+        data_path : str
+            Base directory of the scenarios.
+        binary_arrays : bool, optional
+            Store numpy arrays in signals, e.g. embeddings in annotations, in
+            binary files next to the modality files instead of inline as JSON
+            lists. Arrays stored that way are loaded as read-only memory
+            mapped arrays, independent of this setting. By default arrays
+            are stored in binary files for modality files that already
+            reference binary files, and inline otherwise.
+        """
         self._data_path = data_path
+        self._binary_arrays = binary_arrays
         self._create_path(data_path)
+        self._jsonl_files = dict()
+        self._array_files = dict()
+        self._metadata_cache = dict()
 
     @property
     def base_path(self):
         return self._data_path
 
+    @property
+    def binary_arrays(self) -> Optional[bool]:
+        return self._binary_arrays
+
+    def __getstate__(self):
+        # Cached files are specific to the process
+        return {"_data_path": self._data_path, "_binary_arrays": self._binary_arrays}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._jsonl_files = dict()
+        self._array_files = dict()
+        self._metadata_cache = dict()
+
     def list_scenarios(self) -> Iterable[str]:
         return tuple(os.path.basename(path[:-1]) for path in glob(os.path.join(self.base_path, "*", "")))
 
@@ -88,65 +614,247 @@ class ScenarioStorage:
         metadata_path = self._get_scenario_metadata_path(scenario_id)
 
         self._create_path(self._get_scenario_path(scenario.id))
-        with open(metadata_path, 'w') as json_file:
-            json_file.write(marshal(scenario, cls=Scenario))
+        self._write_scenario_metadata(scenario)
 
         return ScenarioController(scenario, self)
 
     def load_scenario(self, scenario_id: str) -> Optional[ScenarioController]:
+        return ScenarioController(self._load_scenario_metadata(scenario_id), self)
+
+    def _load_scenario_metadata(self, scenario_id: str) -> Scenario:
         scenario_path = self._get_scenario_metadata_path(scenario_id)
-        if not os.path.isfile(scenario_path):
+        try:
+            stat = os.stat(scenario_path)
+        except FileNotFoundError:
             raise ValueError(f"No scenario with id {scenario_id} at {scenario_path}")
 
-        with open(scenario_path) as json_file:
-            json_string = json_file.read()
-        scenario = unmarshal(json_string, cls=Scenario)
+        # Callers get a copy, such that changes to it don't affect the cached Scenario
+        cache_key = (stat.st_mtime_ns, stat.st_size)
+        cached_key, _, scenario = self._metadata_cache.get(scenario_id, (None, None, None))
+        if cached_key != cache_key:
+            with open(scenario_path) as json_file:
+                json_string = json_file.read()
+            scenario = unmarshal(json_string, cls=Scenario)
+            self._metadata_cache[scenario_id] = (cache_key, json_string, scenario)
 
-        return ScenarioController(scenario, self)
+        return copy.deepcopy(scenario)
+
+    def _write_scenario_metadata(self, scenario: Scenario):
+        scenario_metadata_path = self._get_scenario_metadata_path(scenario.id)
+        json_string = marshal(scenario, cls=Scenario)
+
+        if scenario.id in self._metadata_cache and os.path.isfile(scenario_metadata_path):
+            cached_key, cached_json, _ = self._metadata_cache[scenario.id]
+            stat = os.stat(scenario_metadata_path)
+            if cached_key == (stat.st_mtime_ns, stat.st_size) and cached_json == json_string:
+                return
+
+        atomic_write(scenario_metadata_path, json_string)
+
+        stat = os.stat(scenario_metadata_path)
+        self._metadata_cache[scenario.id] = ((stat.st_mtime_ns, stat.st_size), json_string, copy.deepcopy(scenario))
 
     def save_scenario(self, scenario: ScenarioController) -> None:
         if not isinstance(scenario, ScenarioController):
             raise ValueError("Can only save ScenarioController instances, got: " + type(scenario) + ". See the #create_scenario method.")
 
-        scenario_metadata_path = self._get_scenario_metadata_path(scenario.id)
-
         plain_scenario = scenario.scenario
-        with open(scenario_metadata_path, 'w') as json_file:
-            json_file.write(marshal(plain_scenario, cls=Scenario))
+        self._write_scenario_metadata(plain_scenario)
 
         for modality, signals in scenario.signals.items():
+            if not scenario.is_dirty(modality):
+                logger.debug("Skip saving unmodified modality %s of scenario %s", modality.name, scenario.id)
+                continue
+
             self._save_signals(self._get_metadata_path(plain_scenario, modality), signals, modality)
+            scenario.mark_clean(modality)
+
+    def save_signal(self, scenario: ScenarioController, signal: Signal[Any, Any]) -> None:
+        """
+        Persist a single signal of the scenario.
+
+        For modalities stored as JSON Lines (see :data:`JSONL_SIGNAL_PATHS`)
+        only the record of the signal is written, otherwise the modality
+        file is rewritten from the signals in the `scenario`.
+
+        Parameters
+        ----------
+        scenario : ScenarioController
+            The scenario the signal belongs to.
+        signal : Signal[Any, Any]
+            The signal to persist.
+        """
+        path = self._get_metadata_path(scenario.scenario, signal.modality)
+        if not path:
+            raise ValueError(f"No file for modality {signal.modality.name} in scenario {scenario.id}")
+
+        if self._is_jsonl(path):
+            self._get_jsonl_file(path, signal.modality).save_signal(signal)
+        else:
+            self._save_signals(path, scenario.get_signals(signal.modality), signal.modality)
+            scenario.mark_clean(signal.modality)
+
+    def load_signal(self, scenario_id: str, modality: Modality, signal_id: str,
+                    scenario: Scenario = None) -> Optional[Signal[Any, Any]]:
+        """
+        Load a single signal of a scenario.
+
+        For modalities stored as JSON Lines the signal is read directly from
+        its offset in the modality file.
+
+        Parameters
+        ----------
+        scenario_id : str
+            The id of the scenario.
+        modality : Modality
+            The modality of the signal.
+        signal_id : str
+            The id of the signal.
+        scenario : Scenario, optional
+            The already loaded scenario metadata. If 'None', the metadata is
+            loaded from storage.
+
+        Returns
+        -------
+        Optional[Signal[Any, Any]]
+            The signal with the given id or 'None' if it does not exist.
+        """
+        scenario = scenario if scenario else self._load_scenario_metadata(scenario_id)
+        path = self._get_metadata_path(scenario, modality)
+        if not path or not os.path.isfile(path):
+            return None
+
+        if self._is_jsonl(path):
+            return self._attach_base_path(self._get_jsonl_file(path, modality).load_signal(signal_id), scenario_id)
+
+        return next((signal for signal in self.iter_modality(scenario_id, modality, scenario)
+                     if signal.id == signal_id), None)
 
     def _save_signals(self, path, signals, modality: Modality):
+        if self._is_jsonl(path):
+            self._get_jsonl_file(path, modality).save_signals(signals)
+            return
+
+        cls = self._get_signal_class(modality)
+        array_files = self._get_array_files(path)
+        referenced = array_files.referenced()
+
+        if self._binary_arrays or (self._binary_arrays is None and referenced):
+            with array_files.new_writer() as writer:
+                json_string = marshal(signals, cls=cls, array_writer=writer)
+            atomic_write(path, json_string)
+        else:
+            atomic_write(path, marshal(signals, cls=cls))
+        array_files.remove(referenced)
+
+    def load_modality(self, scenario_id: str, modality: Modality,
+                      scenario: Scenario = None) -> Optional[Iterable[Signal[Any, Any]]]:
+        signals = self.iter_modality(scenario_id, modality, scenario)
+
+        return list(signals) if signals is not None else None
+
+    def iter_modality(self, scenario_id: str, modality: Modality,
+                      scenario: Scenario = None) -> Optional[Iterator[Signal[Any, Any]]]:
+        """
+        Load the signals of a modality one at a time.
+
+        The modality file is parsed incrementally, such that memory usage is
+        bounded by the largest signal in the file.
+
+        Parameters
+        ----------
+        scenario_id : str
+            The id of the scenario.
+        modality : Modality
+            The modality of the signals.
+        scenario : Scenario, optional
+            The already loaded scenario metadata. If 'None', the metadata is
+            loaded from storage.
+
+        Returns
+        -------
+        Optional[Iterator[Signal[Any, Any]]]
+            An iterator over the signals in the modality file, or 'None' if
+            there is no file for the modality.
+        """
+        scenario = scenario if scenario else self._load_scenario_metadata(scenario_id)
+        modality_meta_path = self._get_metadata_path(scenario, modality)
+        if not modality_meta_path or not os.path.isfile(modality_meta_path):
+            return None
+
+        if self._is_jsonl(modality_meta_path):
+            signals = self._get_jsonl_file(modality_meta_path, modality).iter_signals()
+            return (self._attach_base_path(signal, scenario_id) for signal in signals)
+
+        cls = self._get_signal_class(modality)
+
+        array_reader = self._get_array_files(modality_meta_path).reader
+
+        def signal_iterator():
+            with open(modality_meta_path) as json_file:
+                for signal in unmarshal_stream(json_file, cls=cls, array_reader=array_reader):
+                    yield self._attach_base_path(signal, scenario_id)
+
+        return signal_iterator()
+
+    def _attach_base_path(self, signal: Optional[Signal[Any, Any]], scenario_id: str) -> Optional[Signal[Any, Any]]:
+        if isinstance(signal, FileArrayContainer):
+            signal.set_base_path(self._get_scenario_path(scenario_id))
+
+        return signal
+
+    @staticmethod
+    def _get_signal_class(modality: Modality) -> Type[Signal[Any, Any]]:
         if modality == Modality.IMAGE:
-            cls = ImageSignal
+            return ImageSignal
         elif modality == Modality.TEXT:
-            cls = TextSignal
+            return TextSignal
         elif modality == Modality.AUDIO:
-            cls = AudioSignal
+            return AudioSignal
         else:
             raise ValueError(f"Unsupported modality: {modality}")
 
-        with open(path, 'w') as json_file:
-            json_file.write(marshal(signals, cls=cls))
+    def _is_jsonl(self, path):
+        return path.endswith(self.JSONL_EXTENSION)
 
-    def load_modality(self, scenario_id: str, modality: Modality) -> Optional[Iterable[Signal[Any, Any]]]:
-        scenario = self.load_scenario(scenario_id)
-        modality_meta_path = self._get_metadata_path(scenario.scenario, modality)
-        if not modality_meta_path or not os.path.isfile(modality_meta_path):
-            return None
+    def _get_jsonl_file(self, path: str, modality: Modality) -> JsonLinesSignalFile:
+        if path not in self._jsonl_files:
+            self._jsonl_files[path] = JsonLinesSignalFile(path, self._get_signal_class(modality), self._binary_arrays)
+
+        return self._jsonl_files[path]
+
+    def _get_array_files(self, path: str) -> SignalArrayFiles:
+        if path not in self._array_files:
+            self._array_files[path] = SignalArrayFiles(path)
+
+        return self._array_files[path]
+
+    def load_provenance(self, scenario_id: str) -> Dict[str, Any]:
+        """
+        Load the provenance of the processing of a scenario.
+
+        Parameters
+        ----------
+        scenario_id : str
+            The id of the scenario.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The provenance records by processor name, or an empty dictionary
+            if the scenario was not processed yet.
+        """
+        try:
+            with open(self._get_provenance_path(scenario_id)) as json_file:
+                return json.load(json_file)
+        except FileNotFoundError:
+            return dict()
+
+    def save_provenance(self, scenario_id: str, provenance: Dict[str, Any]) -> None:
+        atomic_write(self._get_provenance_path(scenario_id), json.dumps(provenance))
 
-        with open(modality_meta_path) as json_file:
-            if modality == Modality.IMAGE:
-                cls = ImageSignal
-            elif modality == Modality.TEXT:
-                cls = TextSignal
-            elif modality == Modality.AUDIO:
-                cls = AudioSignal
-            else:
-                raise ValueError(f"Unsupported modality: {modality}")
-
-            return unmarshal(json_file.read(), cls=cls)
+    def _get_provenance_path(self, scenario_id):
+        return os.path.join(self._get_scenario_path(scenario_id), self.PROVENANCE_FILE)
 
     def _get_scenario_path(self, scenario_id):
         return os.path.join(self.base_path, scenario_id)
@@ -33,6 +33,19 @@ if __name__ == '__main__':
     parser.add_argument('--plugins', type=str, action="append", help="Path to plugin directory (parent of emissor/plugins) ")
     parser.add_argument('--scenarios', type=str, help="Base directory that contains the emissor scenarios.")
     parser.add_argument('--num-jobs', type=int, default=1, help="Max number of parallel processes")
+    parser.add_argument('--fused', action="store_true",
+                        help="Run all processors on a scenario at once, loading and saving each scenario only once")
+    parser.add_argument('--force', action="store_true",
+                        help="Process all scenarios, also if they are up-to-date with the processors")
+    parser.add_argument('--resume', action="store_true",
+                        help="Resume the previous run, skipping the steps it completed for each scenario")
+    parser.add_argument('--checkpoint-interval', type=int,
+                        help="Save scenarios after processing this number of signals")
+    parser.add_argument('--binary-arrays', action="store_true", default=None,
+                        help="Store arrays in binary files next to the modality files. By default modality files "
+                             "keep the array storage they were saved with")
+    parser.add_argument('--inline-arrays', dest="binary_arrays", action="store_false", default=None,
+                        help="Store arrays inline in the modality files")
 
     # Processing steps
     for step in [Step.PREPROCESSING, Step.INIT]:
@@ -47,5 +60,6 @@ if __name__ == '__main__':
     plugins = processing.discover_plugins(os.path.abspath(plugin) for plugin in args.plugins)
     data_processing = processing.from_plugins(plugins, args.scenarios,
                             arg_val(Step.PREPROCESSING, args), arg_val(Step.INIT, args), arg_val(Step.PROCESS, args),
-                            args.num_jobs)
+                            args.num_jobs, args.fused, args.force, args.resume,
+                            args.checkpoint_interval, args.binary_arrays)
     data_processing.run()
@@ -1,10 +1,15 @@
+import asyncio
+import logging
+import weakref
 from abc import ABC
-from typing import Iterable, Any, Tuple, Mapping
+from typing import Iterable, Any, Tuple, Mapping, Sequence, Optional, Type, Callable, Awaitable
 
 from emissor.persistence import ScenarioStorage
 from emissor.persistence.persistence import ScenarioController
-from emissor.representation.scenario import Signal, Modality
+from emissor.processing.provenance import signal_content_hash
+from emissor.representation.scenario import Signal, Modality, class_source
 
+logger = logging.getLogger(__name__)
 
 class DataPreprocessor(ABC):
     def preprocess(self):
@@ -28,6 +33,16 @@ class ScenarioInitializer(ABC):
     def initialize_modality(self, scenario: ScenarioController, modality: Modality):
         raise NotImplementedError("")
 
+    def setup_worker(self):
+        """
+        Initialize the state needed to initialize scenarios, e.g. load models.
+
+        Called once in each process that initializes scenarios, before the
+        first scenario is initialized in that process. The initializer is
+        pickled to be sent to worker processes, state set up here is not.
+        """
+        pass
+
     @property
     def name(self) -> str:
         return self.__class__.__name__
@@ -50,14 +65,61 @@ class SignalProcessor(ABC):
     def process_signal(self, scenario: ScenarioController, signal: Signal):
         raise NotImplementedError("")
 
+    def process_batch(self, scenarios: Sequence[ScenarioController], signals: Sequence[Signal]):
+        """
+        Process a batch of signals of the same modality.
+
+        Override this method to process multiple signals at once, e.g. to
+        run inference of a model on a batch of inputs.
+
+        Parameters
+        ----------
+        scenarios : Sequence[ScenarioController]
+            The scenario of each signal in the batch. Signals of different
+            scenarios are only batched if :attr:`batch_across_scenarios` is
+            enabled.
+        signals : Sequence[Signal]
+            The signals in the batch, in the order of :meth:`signal_key`.
+        """
+        for scenario, signal in zip(scenarios, signals):
+            self.process_signal(scenario, signal)
+
     def process_signals(self, scenario: ScenarioController, signals: Mapping[Modality, Iterable[Signal]]):
         for modality, signals in signals.items():
-            for signal in signals:
-                self.process_signal(scenario, signal)
+            signals = tuple(signals)
+            batch_size = max(1, self.batch_size or len(signals))
+            for start in range(0, len(signals), batch_size):
+                batch = signals[start:start + batch_size]
+                self.process_batch((scenario,) * len(batch), batch)
+
+    def setup_worker(self):
+        """
+        Initialize the state needed to process signals, e.g. load models.
+
+        Called once in each process that processes scenarios, before the
+        first scenario is processed in that process. The processor is
+        pickled to be sent to worker processes, state set up here is not,
+        such that processors only ship their configuration.
+        """
+        pass
 
-    def process_scenario(self, scenario: ScenarioController):
-        scenario.load_signals(self.modalities)
-        self.process_signals(scenario, scenario.signals)
+    def process_scenario(self, scenario: ScenarioController, signals: Mapping[Modality, Iterable[Signal]] = None):
+        """
+        Process the signals of the scenario.
+
+        Parameters
+        ----------
+        scenario : ScenarioController
+            The scenario to process.
+        signals : Mapping[Modality, Iterable[Signal]], optional
+            The signals of the scenario to process, by default all signals of
+            the :attr:`modalities` of the processor.
+        """
+        if signals is None:
+            signals = {modality: scenario.get_signals(modality) for modality in self.modalities}
+        self.process_signals(scenario, signals)
+        # Signals may be modified directly by the processor
+        scenario.mark_dirty(*self.modalities)
 
     @property
     def name(self) -> str:
@@ -67,10 +129,75 @@ class SignalProcessor(ABC):
     def parallel(self) -> bool:
         return False
 
+    @property
+    def parallel_signals(self) -> bool:
+        """
+        Whether the signals of a scenario can be processed in parallel.
+
+        If enabled, the signals of each scenario are sorted by :meth:`signal_key`
+        and split into consecutive chunks that are passed to
+        :meth:`process_signals` in separate worker processes. The processor
+        must therefore only modify the signals it is called with, which are
+        merged back into the scenario before it is saved.
+        """
+        return False
+
+    @property
+    def batch_size(self) -> Optional[int]:
+        """
+        The maximum number of signals passed to :meth:`process_batch`, or
+        'None' to pass all signals of a modality in a scenario at once.
+        """
+        return None
+
+    @property
+    def batch_across_scenarios(self) -> bool:
+        """
+        Whether batches can contain signals of multiple scenarios.
+
+        If enabled, the signals of all scenarios are collected into batches of
+        :attr:`batch_size` signals in the main process, and each scenario is
+        saved once all its signals are processed. Parallelization then is left
+        to the processor, e.g. by processing a batch with multiple processes.
+        """
+        return False
+
     @property
     def modalities(self) -> Tuple[Modality]:
         return ()
 
+    @property
+    def version(self) -> str:
+        """
+        The version of the processor. Scenarios processed with a different
+        version are processed again.
+        """
+        return class_source(self, include_type=True)
+
+    @property
+    def incremental(self) -> bool:
+        """
+        Whether the processor can process only the new or changed signals of a
+        scenario that was processed before. Otherwise all signals of the
+        scenario are processed again if any signal changed.
+        """
+        return False
+
+    def signal_hash(self, signal: Signal) -> str:
+        """
+        Hash of the content of a signal that is processed by the processor,
+        used to detect changed signals. By default the mentions of the signal
+        are not included.
+        """
+        return signal_content_hash(signal)
+
+    @property
+    def dependencies(self) -> Tuple[str]:
+        """
+        The names of the processors that must be run before this processor.
+        """
+        return ()
+
     def __enter__(self):
         pass
 
@@ -84,6 +211,126 @@ class SignalProcessor(ABC):
         return lambda signal: signal.time.start
 
 
+class AsyncSignalProcessor(SignalProcessor):
+    """
+    Base class for processors that await I/O bound calls, e.g. requests to
+    model services.
+
+    Signals are processed concurrently with :meth:`process_signal_async` on an
+    event loop, bounded by :attr:`concurrency`. Calls to a backend can be
+    limited further with the semaphore returned by :meth:`backend`::
+
+        async def process_signal_async(self, scenario, signal):
+            async with self.backend("face-analysis"):
+                result = await ...
+
+    Each signal is processed with a :attr:`timeout` and failed attempts are
+    retried :attr:`retries` times. When run with
+    :class:`emissor.processing.processing.DataProcessing`, multiple scenarios
+    are processed concurrently on the same event loop.
+    """
+    async def process_signal_async(self, scenario: ScenarioController, signal: Signal):
+        raise NotImplementedError("")
+
+    async def process_signals_async(self, scenario: ScenarioController,
+                                    signals: Mapping[Modality, Iterable[Signal]]):
+        await asyncio.gather(*(self.run_with_retries(self.process_signal_async, scenario, signal)
+                               for modality_signals in signals.values() for signal in modality_signals))
+
+    async def run_with_retries(self, function: Callable[..., Awaitable[Any]], *args) -> Any:
+        """
+        Await `function(*args)` within the concurrency limit of the processor,
+        with timeout and retries.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore(None, self.concurrency):
+                    return await asyncio.wait_for(function(*args), self.timeout)
+            except self.retry_exceptions as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.retry_delay * 2 ** attempt
+                logger.warning("Attempt %s of %s failed, retry in %ss: %s", attempt + 1, self.name, delay, e)
+                await asyncio.sleep(delay)
+
+    def backend(self, name: str) -> asyncio.Semaphore:
+        """
+        Semaphore that limits the concurrent calls to the backend with the
+        given name to the limit in :attr:`backend_limits`.
+        """
+        return self._semaphore(name, self.backend_limits.get(name, self.concurrency))
+
+    def process_signals(self, scenario: ScenarioController, signals: Mapping[Modality, Iterable[Signal]]):
+        asyncio.run(self.process_signals_async(scenario, signals))
+
+    def process_signal(self, scenario: ScenarioController, signal: Signal):
+        asyncio.run(self.run_with_retries(self.process_signal_async, scenario, signal))
+
+    @property
+    def concurrency(self) -> int:
+        """
+        The maximum number of signals that are processed concurrently.
+        """
+        return 64
+
+    @property
+    def backend_limits(self) -> Mapping[str, int]:
+        """
+        The maximum number of concurrent calls by backend name, see :meth:`backend`.
+        """
+        return {}
+
+    @property
+    def concurrent_scenarios(self) -> int:
+        """
+        The maximum number of scenarios that are processed concurrently.
+        """
+        return 8
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """
+        Timeout in seconds for processing a signal, or 'None' for no timeout.
+
+        The timeout cancels the awaited coroutine, but not blocking calls that
+        are run in an executor, which continue in their thread while the
+        signal is retried. Processors that run blocking calls in an executor
+        should use the timeout of the call instead, e.g.
+        :attr:`emissor.processing.client.BackendClient.timeout`.
+        """
+        return None
+
+    @property
+    def retries(self) -> int:
+        return 0
+
+    @property
+    def retry_delay(self) -> float:
+        """
+        Delay in seconds before the first retry, doubled for each further retry.
+        """
+        return 1.0
+
+    @property
+    def retry_exceptions(self) -> Tuple[Type[BaseException], ...]:
+        return asyncio.TimeoutError, OSError
+
+    def _semaphore(self, name: Optional[str], limit: int) -> asyncio.Semaphore:
+        # Semaphores are bound to an event loop and are not pickled with the processor
+        loops = self.__dict__.setdefault("_semaphores", weakref.WeakKeyDictionary())
+        semaphores = loops.setdefault(asyncio.get_running_loop(), dict())
+        if name not in semaphores:
+            semaphores[name] = asyncio.Semaphore(limit)
+
+        return semaphores[name]
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_semaphores", None)
+
+        return state
+
+
 class ProcessorPlugin:
     def create_preprocessor(self) -> DataPreprocessor:
         return None
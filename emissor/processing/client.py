@@ -0,0 +1,267 @@
+"""
+HTTP client for model backends, e.g. inference services run in containers.
+
+The client keeps a pool of persistent (keep-alive) connections that is
+shared by all threads of a process and supports binary request bodies,
+avoiding the overhead of opening a connection and encoding binary data as
+text for every request.
+"""
+import http.client
+import itertools
+import logging
+import queue
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Mapping, Optional, Tuple, Iterable, List, Any, Dict
+
+import simplejson as json
+
+logger = logging.getLogger(__name__)
+
+
+class BackendError(Exception):
+    def __init__(self, response: "BackendResponse"):
+        super().__init__(f"Request failed with status {response.status} {response.reason}: {response.text[:200]}")
+        self.response = response
+
+
+class BackendResponse:
+    def __init__(self, status: int, reason: str, headers: Mapping[str, str], content: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> "BackendResponse":
+        if not self.ok:
+            raise BackendError(self)
+
+        return self
+
+
+class BackendClient:
+    def __init__(self, host: str = "127.0.0.1", port: int = 80, pool_size: int = 8, timeout: float = 60.0):
+        """
+        Parameters
+        ----------
+        host : str, optional, default: 127.0.0.1
+            The host of the backend.
+        port : int, optional, default: 80
+            The port of the backend.
+        pool_size : int, optional, default: 8
+            The maximum number of idle connections kept open, also the
+            number of concurrent requests in :meth:`post_batch`.
+        timeout : float, optional, default: 60.0
+            Timeout of requests in seconds.
+        """
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Mapping[str, str] = None) -> BackendResponse:
+        """
+        Send a request over a pooled connection.
+
+        Requests on a reused connection that was closed by the backend in the
+        meantime are retried once on a new connection.
+        """
+        headers = dict(headers) if headers else dict()
+        for attempt in range(2):
+            connection, reused = self._acquire()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                content = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused and attempt == 0:
+                    logger.debug("Connection to %s was closed, retry on new connection", self.url)
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+
+            return BackendResponse(response.status, response.reason, dict(response.getheaders()), content)
+
+    def post_json(self, path: str, data: Any) -> BackendResponse:
+        body = json.dumps(data).encode("utf-8")
+
+        return self.request("POST", path, body, {"Content-Type": "application/json"}).raise_for_status()
+
+    def post_binary(self, path: str, data: bytes, content_type: str = "application/octet-stream") -> BackendResponse:
+        return self.request("POST", path, data, {"Content-Type": content_type}).raise_for_status()
+
+    def post_multipart(self, path: str, fields: Mapping[str, str] = None,
+                       files: Iterable[Tuple[str, str, bytes, str]] = None) -> BackendResponse:
+        """
+        Send a `multipart/form-data` request.
+
+        Parameters
+        ----------
+        path : str
+            The path of the request.
+        fields : Mapping[str, str], optional
+            Form fields by name.
+        files : Iterable[Tuple[str, str, bytes, str]], optional
+            Files as tuples of field name, file name, content and content
+            type. Multiple files can be sent in one request to batch inputs
+            for backends that support it.
+        """
+        body, content_type = encode_multipart(fields, files)
+
+        return self.request("POST", path, body, {"Content-Type": content_type}).raise_for_status()
+
+    def post_batch(self, path: str, bodies: Iterable[bytes],
+                   content_type: str = "application/octet-stream") -> List[BackendResponse]:
+        """
+        Send a POST request for each body concurrently over the connection pool.
+
+        Returns
+        -------
+        List[BackendResponse]
+            The responses in the order of the bodies.
+        """
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            return list(executor.map(lambda body: self.post_binary(path, body, content_type), bodies))
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, connection: http.client.HTTPConnection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getstate__(self):
+        # Connections are not shared between processes
+        state = dict(self.__dict__)
+        del state["_pool"]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
+
+
+class RoundRobinClient(BackendClient):
+    """
+    Client that distributes requests over multiple replicas of a backend.
+    """
+    def __init__(self, clients: Iterable[BackendClient]):
+        self._clients = tuple(clients)
+        if not self._clients:
+            raise ValueError("No clients provided")
+
+        self.host = self._clients[0].host
+        self.port = self._clients[0].port
+        self.pool_size = sum(client.pool_size for client in self._clients)
+        self.timeout = self._clients[0].timeout
+        self._next = itertools.cycle(self._clients)
+        self._lock = threading.Lock()
+
+    @property
+    def clients(self) -> Tuple[BackendClient, ...]:
+        return self._clients
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Mapping[str, str] = None) -> BackendResponse:
+        with self._lock:
+            client = next(self._next)
+
+        return client.request(method, path, body, headers)
+
+    def close(self):
+        for client in self._clients:
+            client.close()
+
+    def __getstate__(self):
+        return {"_clients": self._clients}
+
+    def __setstate__(self, state):
+        self.__init__(state["_clients"])
+
+
+_CLIENTS: Dict[Tuple[str, int], BackendClient] = dict()
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(host: str, port: int, **kwargs) -> BackendClient:
+    """
+    The client for the backend at the given host and port that is shared
+    within the current process. Keyword arguments are passed to the
+    :class:`BackendClient` when it is created.
+    """
+    with _CLIENTS_LOCK:
+        if (host, port) not in _CLIENTS:
+            _CLIENTS[(host, port)] = BackendClient(host, port, **kwargs)
+
+        return _CLIENTS[(host, port)]
+
+
+def encode_multipart(fields: Mapping[str, str] = None,
+                     files: Iterable[Tuple[str, str, bytes, str]] = None) -> Tuple[bytes, str]:
+    """
+    Encode form fields and files as `multipart/form-data` body.
+
+    Returns
+    -------
+    Tuple[bytes, str]
+        The body and its content type including the boundary.
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode("utf-8"))
+        parts.append(str(value).encode("utf-8"))
+        parts.append(b"\r\n")
+    for name, file_name, content, content_type in (files or ()):
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{file_name}"\r\n'
+                     f'Content-Type: {content_type}\r\n\r\n'.encode("utf-8"))
+        parts.append(content)
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
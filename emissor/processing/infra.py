@@ -0,0 +1,274 @@
+"""
+Infrastructure for services used during processing, e.g. model backends run
+in containers.
+
+A service is started as one or more replicas, each listening on its own host
+port, and is considered ready once a :class:`ReadinessProbe` succeeds for all
+replicas. Requests are distributed over the replicas by the :attr:`ServiceInfra.client`.
+"""
+import logging
+import re
+import socket
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence
+
+from emissor.processing.client import BackendClient, RoundRobinClient, get_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Replica:
+    """
+    A running replica of a service.
+    """
+    port: int
+    handle: Any = None
+    logs: Callable[[], str] = field(default=lambda: "")
+
+
+class ReadinessProbe(ABC):
+    @abstractmethod
+    def ready(self, host: str, replica: Replica) -> bool:
+        raise NotImplementedError("")
+
+
+class TcpProbe(ReadinessProbe):
+    """
+    Ready once a TCP connection to the port of the replica can be established.
+    """
+    def __init__(self, timeout: float = 1.0):
+        self.timeout = timeout
+
+    def ready(self, host: str, replica: Replica) -> bool:
+        try:
+            with socket.create_connection((host, replica.port), timeout=self.timeout):
+                return True
+        except OSError:
+            return False
+
+
+class HttpProbe(ReadinessProbe):
+    """
+    Ready once the replica responds to a GET request on `path`.
+
+    By default any HTTP response is accepted, such that services without a
+    health endpoint can be probed as well.
+    """
+    def __init__(self, path: str = "/", statuses: Sequence[int] = None, timeout: float = 1.0):
+        self.path = path
+        self.statuses = statuses
+        self.timeout = timeout
+
+    def ready(self, host: str, replica: Replica) -> bool:
+        client = BackendClient(host, replica.port, pool_size=1, timeout=self.timeout)
+        try:
+            response = client.request("GET", self.path)
+        except OSError:
+            return False
+        finally:
+            client.close()
+
+        return self.statuses is None or response.status in self.statuses
+
+
+class LogProbe(ReadinessProbe):
+    """
+    Ready once the logs of the replica contain a line matching `pattern`.
+    """
+    def __init__(self, pattern: str):
+        self.pattern = re.compile(pattern)
+
+    def ready(self, host: str, replica: Replica) -> bool:
+        return any(self.pattern.search(line) for line in replica.logs().splitlines())
+
+
+def wait_until(condition: Callable[[], bool], timeout: float, initial_delay: float = 0.05,
+               max_delay: float = 2.0, description: str = "condition") -> None:
+    """
+    Wait until `condition` returns True, checking it with exponential backoff.
+
+    Raises
+    ------
+    TimeoutError
+        If the condition is not met within `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while not condition():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Timeout after {timeout}s waiting for {description}")
+
+        time.sleep(min(delay, remaining))
+        delay = min(2 * delay, max_delay)
+
+
+class ServiceInfra(ABC):
+    def __init__(self, host_port: int, replicas: int = 1, probe: ReadinessProbe = None, boot_timeout: float = 120.0,
+                 keep_warm: bool = False, host: str = "127.0.0.1"):
+        """
+        Parameters
+        ----------
+        host_port : int
+            The host port of the first replica, further replicas use the
+            subsequent ports.
+        replicas : int, optional, default: 1
+            The number of replicas of the service to start.
+        probe : ReadinessProbe, optional
+            The probe to detect that a replica is ready, by default a
+            :class:`TcpProbe`.
+        boot_timeout : float, optional, default: 120.0
+            The maximum time in seconds to wait for the service to be ready.
+        keep_warm : bool, optional, default: False
+            Keep the service running when it is stopped, and use a service
+            that is ready on the host ports instead of starting a new one.
+        host : str, optional, default: 127.0.0.1
+            The host on which the service is reachable.
+        """
+        self.host_port = host_port
+        self.replicas = replicas
+        self.probe = probe if probe else TcpProbe()
+        self.boot_timeout = boot_timeout
+        self.keep_warm = keep_warm
+        self.host = host
+
+        self._replicas: List[Replica] = []
+        self._client: Optional[BackendClient] = None
+
+    @property
+    def host_ports(self) -> List[int]:
+        return [self.host_port + idx for idx in range(self.replicas)]
+
+    @property
+    def client(self) -> BackendClient:
+        """
+        Client for the service, shared within the current process. Requests
+        are distributed round-robin over the replicas.
+        """
+        if self._client is None:
+            clients = [get_client(self.host, port) for port in self.host_ports]
+            self._client = clients[0] if len(clients) == 1 else RoundRobinClient(clients)
+
+        return self._client
+
+    def start(self):
+        if self._replicas:
+            raise EnvironmentError("Service already started")
+
+        for port in self.host_ports:
+            if self.keep_warm and self.probe.ready(self.host, Replica(port)):
+                logger.info("Use running service %s on port %s", self, port)
+                continue
+
+            logger.info("Start service %s on port %s", self, port)
+            self._replicas.append(self._start_replica(port))
+
+        try:
+            for replica in self._replicas:
+                wait_until(lambda: self._check_ready(replica), self.boot_timeout,
+                           description=f"{self} on port {replica.port}")
+        except Exception:
+            self._stop_replicas()
+            raise
+
+        logger.debug("Service %s is ready", self)
+
+    def stop(self):
+        if self.keep_warm:
+            logger.info("Keep service %s running", self)
+            self._replicas = []
+            return
+
+        self._stop_replicas()
+
+    def _check_ready(self, replica: Replica) -> bool:
+        if not self._is_alive(replica):
+            raise EnvironmentError(f"Service {self} on port {replica.port} terminated: {replica.logs()[-1000:]}")
+
+        return self.probe.ready(self.host, replica)
+
+    def _stop_replicas(self):
+        for replica in self._replicas:
+            logger.info("Stop service %s on port %s", self, replica.port)
+            self._stop_replica(replica)
+        self._replicas = []
+
+    @abstractmethod
+    def _start_replica(self, port: int) -> Replica:
+        raise NotImplementedError("")
+
+    @abstractmethod
+    def _stop_replica(self, replica: Replica):
+        raise NotImplementedError("")
+
+    def _is_alive(self, replica: Replica) -> bool:
+        return True
+
+    def __enter__(self):
+        self.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __getstate__(self):
+        # Replicas are managed by the process that started them
+        state = dict(self.__dict__)
+        state["_replicas"] = []
+        state["_client"] = None
+
+        return state
+
+
+class ProcessInfra(ServiceInfra):
+    """
+    Service run as local process, e.g. as stand-in for a container in tests.
+    """
+    def __init__(self, command: Sequence[str], host_port: int, **kwargs):
+        """
+        Parameters
+        ----------
+        command : Sequence[str]
+            The command to start a replica, occurrences of `{port}` in the
+            arguments are replaced by the port of the replica.
+        host_port : int
+            See :class:`ServiceInfra`.
+        **kwargs
+            See :class:`ServiceInfra`.
+        """
+        super().__init__(host_port, **kwargs)
+        self.command = command
+
+    def _start_replica(self, port: int) -> Replica:
+        process = subprocess.Popen([arg.replace("{port}", str(port)) for arg in self.command],
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+        output = []
+
+        def read_output():
+            with process.stdout:
+                output.extend(process.stdout)
+
+        threading.Thread(target=read_output, daemon=True).start()
+
+        return Replica(port, process, lambda: "".join(list(output)))
+
+    def _stop_replica(self, replica: Replica):
+        replica.handle.terminate()
+        try:
+            replica.handle.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            replica.handle.kill()
+            replica.handle.wait()
+
+    def _is_alive(self, replica: Replica) -> bool:
+        return replica.handle.poll() is None
+
+    def __str__(self):
+        return " ".join(self.command)
@@ -0,0 +1,107 @@
+"""
+Journal of the processing steps completed for each scenario in a run.
+
+The journal is stored as JSON Lines file in the base directory of the
+scenarios. Every completed step of a scenario is appended as a single line,
+such that a run that is interrupted can be resumed without repeating the
+steps that were already completed.
+"""
+import logging
+import os
+import threading
+from typing import Set, Tuple
+
+import simplejson as json
+
+logger = logging.getLogger(__name__)
+
+
+class RunJournal:
+    FILE_NAME = ".processing_journal.jsonl"
+
+    def __init__(self, base_path: str, resume: bool = False):
+        """
+        Parameters
+        ----------
+        base_path : str
+            Base directory of the scenarios.
+        resume : bool, optional, default: False
+            Continue the journal of a previous run. Otherwise the journal
+            of a previous run is discarded when the run is started, see
+            :meth:`start`.
+        """
+        self._path = os.path.join(base_path, self.FILE_NAME)
+        self._lock = threading.Lock()
+        self._started = resume
+
+        if resume:
+            self._completed = self._read()
+            logger.info("Resume run with %s completed steps from %s", len(self._completed), self._path)
+        else:
+            self._completed = set()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def start(self) -> None:
+        """
+        Start a processing run, discarding the journal of the previous run
+        unless it is resumed.
+
+        Must be called before steps of the run are completed in worker
+        processes. Steps completed before, e.g. by runs that only initialize
+        scenarios, are added to the journal of the previous run.
+        """
+        with self._lock:
+            if self._started:
+                return
+
+            self._started = True
+            if os.path.exists(self._path):
+                os.remove(self._path)
+                logger.debug("Discarded journal of the previous run %s", self._path)
+
+    def is_completed(self, scenario_id: str, step: str) -> bool:
+        return (scenario_id, step) in self._completed
+
+    def complete(self, scenario_id: str, step: str) -> None:
+        """
+        Record the step as completed for the scenario.
+
+        The entry is appended with a single write to the journal, which makes
+        it safe to call from multiple worker processes.
+        """
+        line = json.dumps({"scenario": scenario_id, "step": step}) + "\n"
+        with self._lock:
+            with open(self._path, 'a') as journal_file:
+                journal_file.write(line)
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+
+            self._completed.add((scenario_id, step))
+
+    def _read(self) -> Set[Tuple[str, str]]:
+        completed = set()
+        try:
+            with open(self._path) as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Incomplete last line of an interrupted run
+                        logger.warning("Skipped invalid entry in %s: %s", self._path, line)
+                        continue
+                    completed.add((entry["scenario"], entry["step"]))
+        except FileNotFoundError:
+            pass
+
+        return completed
+
+    def __getstate__(self):
+        # Worker processes only append to the journal
+        return {"_path": self._path, "_completed": set(), "_started": True}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -1,9 +1,17 @@
+import asyncio
 import logging
+import threading
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from joblib import Parallel, delayed
-from typing import Iterable
+from typing import Iterable, List
 
 from emissor.persistence import ScenarioStorage
-from emissor.processing.api import DataPreprocessor, ScenarioInitializer, SignalProcessor
+from emissor.processing.api import DataPreprocessor, ScenarioInitializer, SignalProcessor, AsyncSignalProcessor
+from emissor.processing.journal import RunJournal
+from emissor.processing.provenance import ScenarioProvenance
 from emissor.representation.scenario import Modality
 
 logger = logging.getLogger(__name__)
@@ -12,14 +20,58 @@ logger = logging.getLogger(__name__)
 class DataProcessing:
     def __init__(self, storage: ScenarioStorage, preprocessors: Iterable[DataPreprocessor],
                  scenario_initializer: ScenarioInitializer, signal_processors: Iterable[SignalProcessor],
-                 num_jobs: int = 1):
+                 num_jobs: int = 1, chunk_size: int = 64, fused: bool = False, prefetch: int = 2,
+                 force: bool = False, resume: bool = False, checkpoint_interval: int = None):
+        """
+        Parameters
+        ----------
+        storage : ScenarioStorage
+            The storage of the scenarios.
+        preprocessors : Iterable[DataPreprocessor]
+            Preprocessors that create the dataset.
+        scenario_initializer : ScenarioInitializer
+            Initializer of the scenarios in the dataset.
+        signal_processors : Iterable[SignalProcessor]
+            Processors that are run on the scenarios, in order of their
+            :attr:`SignalProcessor.dependencies`.
+        num_jobs : int, optional, default: 1
+            The maximum number of parallel processes.
+        chunk_size : int, optional, default: 64
+            The number of signals processed per job for processors that
+            support :attr:`SignalProcessor.parallel_signals`.
+        fused : bool, optional, default: False
+            Run all signal processors on a scenario before continuing with the
+            next one, such that each scenario is loaded and saved only once.
+        prefetch : int, optional, default: 2
+            The number of scenarios loaded ahead while processing in fused mode.
+        force : bool, optional, default: False
+            Process all scenarios, also if they are up-to-date according to
+            their recorded provenance, see :class:`ScenarioProvenance`.
+        resume : bool, optional, default: False
+            Resume a previous run, skipping the steps that were completed for
+            each scenario according to the :class:`RunJournal` of the run.
+        checkpoint_interval : int, optional
+            Save a scenario after processing this number of its signals, such
+            that an interrupted run can continue within the scenario. Only
+            applies to :attr:`SignalProcessor.incremental` processors that are
+            not run in fused mode, by default scenarios are saved once.
+        """
         self._storage = storage
         self._preprocessors = preprocessors
         self._scenario_initializer = scenario_initializer
-        self._signal_processors = signal_processors
+        self._signal_processors = _dependency_order(signal_processors) if signal_processors else signal_processors
         self._num_jobs = num_jobs
+        self._chunk_size = chunk_size
+        self._fused = fused
+        self._prefetch = prefetch
+        self._force = force
+        self._journal = RunJournal(storage.base_path, resume)
+        self._checkpoint_interval = checkpoint_interval
 
     def run(self):
+        if self._signal_processors:
+            # Keep the steps completed by the initialization in the journal of this run
+            self._journal.start()
         self.run_preprocessing()
         self.run_init()
         self.run_process()
@@ -44,25 +96,234 @@ class DataProcessing:
             return
 
         logger.info("Processing scenarios with processors %s", [processor.name for processor in self._signal_processors])
+        self._journal.start()
+        if self._fused:
+            self.execute_pipeline(self._signal_processors)
+            return
+
         for processor in self._signal_processors:
             with processor:
-                self.execute_for_scenarios(_process, processor)
+                if isinstance(processor, AsyncSignalProcessor):
+                    self.execute_async(processor)
+                elif processor.batch_across_scenarios:
+                    self.execute_in_batches(processor)
+                elif processor.parallel_signals and self._num_jobs != 1:
+                    self.execute_for_signals(processor)
+                else:
+                    self.execute_for_scenarios(_process, processor, self._force, self._checkpoint_interval)
+
+    def execute_for_scenarios(self, function, task, *args):
+        scenario_ids = self._pending_scenarios(task)
+        task_key, = _new_task_keys()
+        try:
+            if not task.parallel:
+                for scenario_id in scenario_ids:
+                    _execute_in_worker(_execute_step, task_key, self._storage, task,
+                                       scenario_id, function, self._journal, *args)
+            else:
+                num_jobs = min(self._num_jobs, len(scenario_ids))
+                Parallel(n_jobs=num_jobs)(
+                    delayed(_execute_in_worker)(_execute_step, task_key, self._storage, task,
+                                                scenario_id, function, self._journal, *args)
+                    for scenario_id in scenario_ids)
+        finally:
+            _release_worker_task(task_key)
+
+    def _pending_scenarios(self, *tasks):
+        """The ids of the scenarios for which not all tasks are completed in the run journal, in scenario order."""
+        scenario_ids = sorted(self._storage.list_scenarios(), key=tasks[0].scenario_key(self._storage))
+        pending = tuple(scenario_id for scenario_id in scenario_ids
+                        if not all(self._journal.is_completed(scenario_id, _journal_step(task)) for task in tasks))
+
+        if len(pending) < len(scenario_ids):
+            logger.info("Skip %s scenarios completed in the previous run", len(scenario_ids) - len(pending))
+
+        return pending
 
-    def execute_for_scenarios(self, function, task):
-        scenario_ids = tuple(sorted(self._storage.list_scenarios(), key=task.scenario_key(self._storage)))
-        if not task.parallel:
+    def execute_for_signals(self, processor: SignalProcessor):
+        """
+        Process the signals of all scenarios in chunks distributed over the
+        worker pool.
+
+        The chunks of all scenarios are scheduled on the same pool, such that
+        a single long scenario keeps all workers busy. The results for a
+        scenario are merged and the scenario is saved once after all its
+        chunks are processed.
+        """
+        scenario_ids = self._pending_scenarios(processor)
+        task_key, = _new_task_keys()
+        step = _journal_step(processor)
+        pending = dict()
+
+        def tasks():
             for scenario_id in scenario_ids:
-                function(self._storage.base_path, task, scenario_id)
-        else:
-            scenario_ids = tuple(scenario_ids)
-            num_jobs = min(self._num_jobs, len(scenario_ids))
-            Parallel(n_jobs=num_jobs)(
-                delayed(function)(self._storage.base_path, task, scenario_id)
-                for scenario_id in scenario_ids)
+                scenario = self._storage.load_scenario(scenario_id)
+                provenance = ScenarioProvenance(self._storage, scenario_id, self._force)
+                signals = provenance.pending_signals(processor, scenario)
+                chunks = list(_signal_chunks(signals, processor, self._storage, self._chunk_size)) if signals else []
+                if not chunks:
+                    self._journal.complete(scenario_id, step)
+                    continue
+
+                logger.info("Processing scenario %s with processor %s", scenario_id, processor.name)
+
+                pending[scenario_id] = [scenario, provenance, [], len(chunks)]
+                for modality, signals in chunks:
+                    yield delayed(_execute_in_worker)(_process_signals, task_key, self._storage,
+                                                      processor, scenario_id, modality, signals)
+
+        parallel = Parallel(n_jobs=self._num_jobs, return_as="generator")
+        try:
+            for scenario_id, signals in parallel(tasks()):
+                scenario, provenance, results, _ = entry = pending[scenario_id]
+                results.extend(signals)
+                entry[3] -= 1
+                if not entry[3]:
+                    scenario.replace_signals(results)
+                    provenance.record(processor, scenario)
+                    _save_scenario(self._storage, scenario, provenance, self._journal, (step,))
+                    del pending[scenario_id]
+        finally:
+            _release_worker_task(task_key)
+
+    def execute_in_batches(self, processor: SignalProcessor):
+        """
+        Process the signals of all scenarios in batches that span multiple
+        scenarios, see :attr:`SignalProcessor.batch_across_scenarios`.
+        """
+        scenario_ids = self._pending_scenarios(processor)
+        task_key, = _new_task_keys()
+        try:
+            _execute_in_worker(_process_batches, task_key, self._storage, processor, scenario_ids,
+                               self._force, self._journal)
+        finally:
+            _release_worker_task(task_key)
+
+    def execute_async(self, processor: AsyncSignalProcessor):
+        """
+        Process scenarios concurrently on an event loop, see :class:`AsyncSignalProcessor`.
+        """
+        scenario_ids = self._pending_scenarios(processor)
+        task_key, = _new_task_keys()
+        try:
+            _execute_in_worker(_process_async, task_key, self._storage, processor, scenario_ids,
+                               self._force, self._journal)
+        finally:
+            _release_worker_task(task_key)
+
+    def execute_pipeline(self, processors: List[SignalProcessor]):
+        """
+        Run all processors on each scenario, loading and saving every scenario
+        only once.
+
+        If all processors are :attr:`SignalProcessor.parallel` and multiple jobs
+        are configured, scenarios are distributed over the worker pool.
+        Otherwise the next scenarios are loaded and the previous scenario is
+        saved in background threads while a scenario is processed.
+        """
+        scenario_ids = self._pending_scenarios(*processors)
+        task_keys = _new_task_keys(len(processors))
+
+        with ExitStack() as stack:
+            for processor in processors:
+                stack.enter_context(processor)
+            try:
+                if self._num_jobs != 1 and all(processor.parallel for processor in processors):
+                    num_jobs = min(self._num_jobs, len(scenario_ids))
+                    Parallel(n_jobs=num_jobs)(
+                        delayed(_process_pipeline)(self._storage, task_keys, processors, scenario_id,
+                                                   self._force, self._journal)
+                        for scenario_id in scenario_ids)
+                else:
+                    self._execute_pipeline_prefetched(scenario_ids, task_keys, processors)
+            finally:
+                for task_key in task_keys:
+                    _release_worker_task(task_key)
+
+    def _execute_pipeline_prefetched(self, scenario_ids, task_keys, processors):
+        processors = [_setup_worker_task(task_key, processor) for task_key, processor in zip(task_keys, processors)]
+        modalities = tuple({modality: None for processor in processors for modality in processor.modalities})
+        load_storage = _new_storage(self._storage)
+
+        with ThreadPoolExecutor(max_workers=1) as loader, ThreadPoolExecutor(max_workers=1) as saver:
+            pending_ids = deque(scenario_ids)
+            loading = deque()
+            saving = None
+            while pending_ids or loading:
+                while pending_ids and len(loading) < max(1, self._prefetch):
+                    loading.append(loader.submit(_load_scenario, load_storage, pending_ids.popleft(), modalities,
+                                                 self._force))
+
+                scenario, provenance = loading.popleft().result()
+                _run_pipeline(processors, scenario, provenance)
+
+                if saving:
+                    saving.result()
+                saving = saver.submit(_save_scenario, self._storage, scenario, provenance, self._journal,
+                                      [_journal_step(processor) for processor in processors])
+
+            if saving:
+                saving.result()
+
+
+_WORKER_TASKS = dict()
+_WORKER_TASKS_LOCK = threading.Lock()
+
 
+def _execute_in_worker(function, task_key, storage, task, *args):
+    """
+    Execute `function` with the instance of `task` that is set up in the
+    current process.
 
-def _initialize(base_path, scenario_initializer, scenario_id):
-    storage = ScenarioStorage(base_path)
+    Tasks are set up with their `setup_worker` method on first use in each
+    process and are reused for all subsequent calls with the same `task_key`,
+    also in the persistent worker processes of joblib. A worker process drops
+    the tasks of a step when it sets up a task of a later step, the tasks of
+    the last step are kept until the worker process exits.
+    """
+    return function(storage, _setup_worker_task(task_key, task), *args)
+
+
+def _new_task_keys(count=1):
+    """Keys for the tasks of a processing step, which share the id of the step."""
+    step_id = uuid.uuid4().hex
+
+    return [(step_id, idx) for idx in range(count)]
+
+
+def _setup_worker_task(task_key, task):
+    with _WORKER_TASKS_LOCK:
+        if task_key not in _WORKER_TASKS:
+            # Steps are executed one after another, release the state of the tasks of previous steps
+            for finished in [key for key in _WORKER_TASKS if key[0] != task_key[0]]:
+                del _WORKER_TASKS[finished]
+            task.setup_worker()
+            _WORKER_TASKS[task_key] = task
+
+        return _WORKER_TASKS[task_key]
+
+
+def _journal_step(task):
+    return ("init:" if isinstance(task, ScenarioInitializer) else "process:") + task.name
+
+
+def _execute_step(storage, task, scenario_id, function, journal, *args):
+    function(storage, task, scenario_id, *args)
+    journal.complete(scenario_id, _journal_step(task))
+
+
+def _new_storage(storage):
+    """A storage with the settings of `storage` and without its cached files."""
+    return ScenarioStorage(storage.base_path, storage.binary_arrays)
+
+
+def _release_worker_task(task_key):
+    with _WORKER_TASKS_LOCK:
+        _WORKER_TASKS.pop(task_key, None)
+
+
+def _initialize(storage, scenario_initializer, scenario_id):
+    storage = _new_storage(storage)
     try:
         storage.load_scenario(scenario_id)
         logger.debug("Scenario %s already initialized", scenario_id)
@@ -85,18 +346,208 @@ def _initialize(base_path, scenario_initializer, scenario_id):
     storage.save_scenario(scenario)
 
 
-def _process(base_path, processor, scenario_id):
-    storage = ScenarioStorage(base_path)
+def _process(storage, processor, scenario_id, force=False, checkpoint_interval=None):
+    storage = _new_storage(storage)
+    provenance = ScenarioProvenance(storage, scenario_id, force)
+    scenario = storage.load_scenario(scenario_id)
+
+    if not checkpoint_interval or not processor.incremental:
+        if _process_scenario(processor, scenario, provenance):
+            _save_scenario(storage, scenario, provenance)
+        return
+
+    signals = provenance.pending_signals(processor, scenario)
+    if signals is None:
+        return
+
+    for modality, checkpoint in _signal_chunks(signals, processor, storage, checkpoint_interval):
+        logger.info("Processing %s signals of scenario %s with processor %s", len(checkpoint), scenario_id,
+                    processor.name)
+        processor.process_scenario(scenario, {modality: checkpoint})
+        provenance.record(processor, scenario, {modality: checkpoint})
+        _save_scenario(storage, scenario, provenance)
 
-    logger.info("Processing scenario %s with processor %s", scenario_id, processor.name)
 
-    scenario = storage.load_scenario(scenario_id)
-    processor.process_scenario(scenario)
+def _process_scenario(processor, scenario, provenance):
+    signals = provenance.pending_signals(processor, scenario)
+    if signals is None:
+        return False
+
+    logger.info("Processing scenario %s with processor %s", scenario.id, processor.name)
+    processor.process_scenario(scenario, signals)
+    provenance.record(processor, scenario)
+
+    return True
+
+
+def _save_scenario(storage, scenario, provenance, journal=None, steps=()):
+    # Save the provenance and journal last, such that they never cover unsaved results
     storage.save_scenario(scenario)
+    provenance.save()
+    for step in steps:
+        journal.complete(scenario.id, step)
+
 
-# TODO
 def _signal_generator(scenario_id, modality, processor, storage):
-    signals = storage.load_modality(scenario_id, Modality[modality.upper()])
+    signals = storage.iter_modality(scenario_id, Modality[modality.upper()] if isinstance(modality, str) else modality)
+    if signals is None:
+        return
+
+    signal_key = processor.signal_key(storage)
+    if signal_key is None:
+        yield from signals
+    else:
+        yield from sorted(signals, key=signal_key)
+
+
+def _load_scenario(storage, scenario_id, modalities, force):
+    logger.info("Loading scenario %s", scenario_id)
+    scenario = storage.load_scenario(scenario_id)
+    scenario.load_signals(modalities)
+
+    return scenario, ScenarioProvenance(storage, scenario_id, force)
+
+
+def _run_pipeline(processors, scenario, provenance):
+    for processor in processors:
+        _process_scenario(processor, scenario, provenance)
+
+
+def _process_pipeline(storage, task_keys, processors, scenario_id, force, journal):
+    storage = _new_storage(storage)
+    processors = [_setup_worker_task(task_key, processor) for task_key, processor in zip(task_keys, processors)]
+
+    scenario = storage.load_scenario(scenario_id)
+    provenance = ScenarioProvenance(storage, scenario_id, force)
+    _run_pipeline(processors, scenario, provenance)
+    _save_scenario(storage, scenario, provenance, journal, [_journal_step(processor) for processor in processors])
+
+
+def _dependency_order(processors):
+    """
+    Sort processors such that each processor comes after its dependencies,
+    keeping the given order otherwise.
+    """
+    processors = list(processors)
+    ordered, done, visiting = [], set(), set()
+
+    def visit(processor):
+        if id(processor) in done:
+            return
+        if id(processor) in visiting:
+            raise ValueError(f"Circular dependency of processor {processor.name}")
+
+        visiting.add(id(processor))
+        for dependency in processor.dependencies:
+            dependencies = [candidate for candidate in processors if candidate.name == dependency]
+            if not dependencies:
+                logger.debug("Dependency %s of processor %s is not run", dependency, processor.name)
+            for candidate in dependencies:
+                visit(candidate)
+        visiting.discard(id(processor))
+
+        done.add(id(processor))
+        ordered.append(processor)
+
+    for processor in processors:
+        visit(processor)
+
+    return ordered
+
+
+def _process_async(storage, processor, scenario_ids, force, journal):
+    asyncio.run(_process_scenarios_async(storage, processor, scenario_ids, force, journal))
+
+
+async def _process_scenarios_async(storage, processor, scenario_ids, force, journal):
+    storage = _new_storage(storage)
+    step = _journal_step(processor)
+    scenario_slots = asyncio.Semaphore(processor.concurrent_scenarios)
+    loop = asyncio.get_running_loop()
+
+    async def process_scenario(scenario_id):
+        async with scenario_slots:
+            scenario, provenance = await loop.run_in_executor(None, _load_scenario, storage, scenario_id,
+                                                              processor.modalities, force)
+            signals = provenance.pending_signals(processor, scenario)
+            if signals is None:
+                journal.complete(scenario_id, step)
+                return
+
+            logger.info("Processing scenario %s with processor %s", scenario_id, processor.name)
+            await processor.process_signals_async(scenario, signals)
+            # Signals may be modified directly by the processor
+            scenario.mark_dirty(*processor.modalities)
+            provenance.record(processor, scenario)
+            await loop.run_in_executor(None, _save_scenario, storage, scenario, provenance, journal, (step,))
+
+    await asyncio.gather(*(process_scenario(scenario_id) for scenario_id in scenario_ids))
+
+
+def _process_batches(storage, processor, scenario_ids, force, journal):
+    storage = _new_storage(storage)
+    step = _journal_step(processor)
+    batches = defaultdict(list)
+    remaining = dict()
+    provenances = dict()
+
+    def process_batch(modality):
+        batch = batches.pop(modality)
+        processor.process_batch([scenario for scenario, _ in batch], [signal for _, signal in batch])
+
+        for scenario, _ in batch:
+            remaining[scenario.id] -= 1
+            if not remaining[scenario.id]:
+                # Signals may be modified directly by the processor
+                scenario.mark_dirty(*processor.modalities)
+                provenance = provenances.pop(scenario.id)
+                provenance.record(processor, scenario)
+                _save_scenario(storage, scenario, provenance, journal, (step,))
+                del remaining[scenario.id]
+
+    for scenario_id in scenario_ids:
+        scenario = storage.load_scenario(scenario_id)
+        provenance = ScenarioProvenance(storage, scenario_id, force)
+        pending = provenance.pending_signals(processor, scenario)
+        signals = list(_sorted_signals(pending, processor, storage)) if pending else []
+        num_signals = sum(len(modality_signals) for _, modality_signals in signals)
+        if not num_signals:
+            journal.complete(scenario_id, step)
+            continue
+
+        logger.info("Processing scenario %s with processor %s", scenario_id, processor.name)
+        remaining[scenario_id] = num_signals
+        provenances[scenario_id] = provenance
+
+        for modality, modality_signals in signals:
+            for signal in modality_signals:
+                batches[modality].append((scenario, signal))
+                if processor.batch_size and len(batches[modality]) >= processor.batch_size:
+                    process_batch(modality)
+
+        if not processor.batch_size:
+            for modality in list(batches):
+                process_batch(modality)
+
+    for modality in list(batches):
+        process_batch(modality)
+
+
+def _sorted_signals(signals, processor, storage):
+    signal_key = processor.signal_key(storage)
+    for modality, modality_signals in signals.items():
+        yield modality, sorted(modality_signals, key=signal_key) if signal_key is not None else list(modality_signals)
+
+
+def _signal_chunks(signals, processor, storage, chunk_size):
+    for modality, modality_signals in _sorted_signals(signals, processor, storage):
+        for start in range(0, len(modality_signals), chunk_size):
+            yield modality, modality_signals[start:start + chunk_size]
+
+
+def _process_signals(storage, processor, scenario_id, modality, signals):
+    storage = _new_storage(storage)
+    scenario = storage.load_scenario(scenario_id)
+    processor.process_signals(scenario, {modality: signals})
 
-    for signal in sorted(signals, key=processor.signal_key(storage)):
-        yield signal
\ No newline at end of file
+    return scenario_id, signals
@@ -0,0 +1,149 @@
+"""
+Provenance of the processing of scenarios.
+
+For each scenario the version of every processor that processed it is
+recorded together with the content hashes of the signals it processed. On
+subsequent runs scenarios that are up-to-date are skipped and, for
+incremental processors, only new or changed signals are processed. When a
+processor processes signals again, they are also processed again by the
+processors that depend on it.
+"""
+import dataclasses
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from emissor.persistence import ScenarioStorage
+from emissor.persistence.persistence import ScenarioController
+from emissor.representation.scenario import Modality, Signal
+from emissor.representation.util import marshal
+
+logger = logging.getLogger(__name__)
+
+
+def signal_content_hash(signal: Signal) -> str:
+    """
+    Hash of the content of a signal, excluding its mentions.
+    """
+    content = marshal(dataclasses.replace(signal, mentions=[]), cls=signal.__class__)
+
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class ScenarioProvenance:
+    def __init__(self, storage: ScenarioStorage, scenario_id: str, force: bool = False):
+        """
+        Parameters
+        ----------
+        storage : ScenarioStorage
+            The storage of the scenario.
+        scenario_id : str
+            The id of the scenario.
+        force : bool, optional, default: False
+            Consider all signals as pending, independent of the recorded
+            provenance.
+        """
+        self._storage = storage
+        self._scenario_id = scenario_id
+        self._force = force
+        self._provenance = storage.load_provenance(scenario_id)
+        self._modified = False
+
+    def pending_signals(self, processor, scenario: ScenarioController) -> Optional[Dict[Modality, List[Signal]]]:
+        """
+        The signals of the scenario that need to be processed by the processor.
+
+        Parameters
+        ----------
+        processor : SignalProcessor
+            The processor.
+        scenario : ScenarioController
+            The scenario.
+
+        Returns
+        -------
+        Optional[Dict[Modality, List[Signal]]]
+            The signals to process by modality, or 'None' if the scenario is
+            up-to-date for the processor.
+        """
+        signals = {modality: scenario.get_signals(modality) for modality in processor.modalities}
+
+        record = self._provenance.get(processor.name)
+        if self._force or not self._is_valid(processor, record):
+            return signals
+
+        recorded = record["signals"]
+        changed = {modality: [signal for signal in modality_signals
+                              if recorded.get(signal.id) != processor.signal_hash(signal)]
+                   for modality, modality_signals in signals.items()}
+
+        if not any(changed.values()):
+            logger.debug("Scenario %s is up-to-date for processor %s", scenario.id, processor.name)
+            return None
+
+        return changed if processor.incremental else signals
+
+    def record(self, processor, scenario: ScenarioController, signals: Dict[Modality, List[Signal]] = None):
+        """
+        Record that the current signals of the scenario are processed by the processor.
+
+        Parameters
+        ----------
+        processor : SignalProcessor
+            The processor.
+        scenario : ScenarioController
+            The scenario.
+        signals : Dict[Modality, List[Signal]], optional
+            Only record the given signals as processed, keeping the records of
+            the other signals of the scenario for the current version of the
+            processor. By default all signals of the scenario are recorded.
+        """
+        if signals is None:
+            signals = {modality: scenario.get_signals(modality) for modality in processor.modalities}
+            hashes = dict()
+        else:
+            record = self._provenance.get(processor.name)
+            hashes = dict(record["signals"]) if self._is_valid(processor, record) else dict()
+
+        processed = {signal.id: processor.signal_hash(signal)
+                     for modality_signals in signals.values() for signal in modality_signals}
+        hashes.update(processed)
+        self._provenance[processor.name] = {"version": processor.version, "signals": hashes,
+                                            "dependencies": list(processor.dependencies)}
+        self._invalidate_dependents(processor.name, processed.keys())
+        self._modified = True
+
+    @staticmethod
+    def _is_valid(processor, record: Optional[dict]) -> bool:
+        """
+        Whether the record is for the version of the processor and was not
+        invalidated as a whole by its dependencies.
+        """
+        return bool(record) and record["version"] == processor.version and not record.get("invalidated", False)
+
+    def _invalidate_dependents(self, name: str, signal_ids: Iterable[str], invalidated: Set[str] = None):
+        """
+        Mark the signals as pending for the processors that depend on the
+        processor, directly or indirectly, as they consume its mentions.
+        """
+        invalidated = invalidated if invalidated is not None else {name}
+        signal_ids = set(signal_ids)
+        for dependent, record in list(self._provenance.items()):
+            if dependent in invalidated or name not in record.get("dependencies", ()):
+                continue
+
+            invalidated.add(dependent)
+            if signal_ids.isdisjoint(record["signals"]):
+                # The dependent processes other or no modalities
+                record["invalidated"] = True
+            else:
+                record["signals"] = {signal_id: signal_hash for signal_id, signal_hash in record["signals"].items()
+                                     if signal_id not in signal_ids}
+            logger.debug("Invalidated %s signals of processor %s after processing with %s",
+                         len(signal_ids), dependent, name)
+            self._invalidate_dependents(dependent, signal_ids, invalidated)
+
+    def save(self):
+        if self._modified:
+            self._storage.save_provenance(self._scenario_id, self._provenance)
+            self._modified = False
@@ -3,7 +3,7 @@ import logging
 import pkgutil
 import sys
 from inspect import getmembers, isclass
-from typing import List, Iterable
+from typing import List, Iterable, Optional
 
 import emissor
 import emissor.plugins
@@ -31,8 +31,10 @@ def discover_plugins(plugin_paths: Iterable[str]) -> List[api.ProcessorPlugin]:
 
 
 def from_plugins(plugins: List[api.ProcessorPlugin], data_path: str,
-                 preprocessing: bool, init: bool, processors: List[str], num_jobs: int) -> DataProcessing:
-    storage = ScenarioStorage(data_path)
+                 preprocessing: bool, init: bool, processors: List[str], num_jobs: int,
+                 fused: bool = False, force: bool = False, resume: bool = False,
+                 checkpoint_interval: int = None, binary_arrays: Optional[bool] = None) -> DataProcessing:
+    storage = ScenarioStorage(data_path, binary_arrays)
 
     all_steps = not any([preprocessing, init, processors])
 
@@ -55,4 +57,5 @@ def from_plugins(plugins: List[api.ProcessorPlugin], data_path: str,
     else:
         signal_processors = []
 
-    return DataProcessing(storage, preprocessors, scenario_initializer, signal_processors, num_jobs)
+    return DataProcessing(storage, preprocessors, scenario_initializer, signal_processors, num_jobs,
+                          fused=fused, force=force, resume=resume, checkpoint_interval=checkpoint_interval)
@@ -8,12 +8,12 @@ Basic classes for values used in :class:`emissor.representation.Annotation`.
 from dataclasses import dataclass
 from enum import Enum, auto
 
-import uuid
 from rdflib import URIRef, Namespace
-from typing import Any, List
+from typing import Any, List, Iterable
 
 from emissor.representation.container import Sequence, AtomicContainer, AtomicRuler
 from emissor.representation.ldschema import LdId, emissor_dataclass
+from emissor.representation.ids import new_id, new_ids
 from emissor.representation.util import Identifier
 
 friends_namespace = Namespace("http://cltl.nl/leolani/friends/")
@@ -54,17 +54,27 @@ class Entity:
 class Token(AtomicContainer[str]):
     @classmethod
     def for_string(cls, value: str):
-        token_id = str(uuid.uuid4())
+        token_id = new_id()
         return cls(token_id, AtomicRuler(token_id), value)
 
+    @classmethod
+    def for_strings(cls, values: Iterable[str]) -> List[Any]:
+        values = list(values)
+        return [cls(token_id, AtomicRuler(token_id), value) for token_id, value in zip(new_ids(len(values)), values)]
+
 
 @dataclass
 class NER(AtomicContainer[str]):
     @classmethod
     def for_string(cls, value: str):
-        token_id = str(uuid.uuid4())
+        token_id = new_id()
         return cls(token_id, AtomicRuler(token_id), value)
 
+    @classmethod
+    def for_strings(cls, values: Iterable[str]) -> List[Any]:
+        values = list(values)
+        return [cls(token_id, AtomicRuler(token_id), value) for token_id, value in zip(new_ids(len(values)), values)]
+
 
 @dataclass
 class Triple:
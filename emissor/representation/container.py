@@ -3,16 +3,16 @@
 # from __future__ import annotations
 
 import numpy as np
-import uuid
 from abc import ABC
 from numpy.typing import ArrayLike
-from typing import TypeVar, Generic, Iterable, Tuple, Type, Any, List, Optional
+from typing import TypeVar, Generic, Iterable, Tuple, Type, Any, List, Optional, Union
 
+from emissor.representation.ids import new_id
 from emissor.representation.ldschema import emissor_dataclass, LdId
 from emissor.representation.util import Identifier, get_serializable_type_var
 
 
-@emissor_dataclass
+@emissor_dataclass(slots=True)
 class Ruler(ABC):
     """Base type of Rulers that allow to identify a segment relative to a ruler in a signal"""
     container_id: Identifier = LdId()
@@ -36,7 +36,7 @@ class BaseContainer(Generic[R, T], Container[R, T]):
     ruler: R
 
 
-@emissor_dataclass
+@emissor_dataclass(slots=True)
 class Index(Ruler):
     start: int
     stop: Optional[int]
@@ -60,7 +60,7 @@ class Sequence(Generic[T], BaseContainer[Index, T]):
     @classmethod
     def from_seq(cls: Type[C], seq: Iterable[Any]) -> C:
         seq_tuple = list(seq)
-        sequence_id = str(uuid.uuid4())
+        sequence_id = new_id()
         ruler = Index.from_range(sequence_id, 0, len(seq_tuple))
 
         return cls(sequence_id, ruler, seq_tuple)
@@ -69,7 +69,7 @@ class Sequence(Generic[T], BaseContainer[Index, T]):
         return self.seq[offset.start:offset.stop]
 
 
-@emissor_dataclass
+@emissor_dataclass(slots=True)
 class MultiIndex(Ruler):
     bounds: Tuple[int, int, int, int]
 
@@ -89,7 +89,7 @@ class ArrayContainer(BaseContainer[MultiIndex, ArrayLike]):
     @classmethod
     def from_array(cls: Type[C], array_: ArrayLike) -> C:
         value = np.array(array_)
-        container_id = str(uuid.uuid4())
+        container_id = new_id()
         ruler = MultiIndex(container_id, (0, 0, value.shape[0], value.shape[1]))
 
         return cls(container_id, ruler, value)
@@ -98,13 +98,61 @@ class ArrayContainer(BaseContainer[MultiIndex, ArrayLike]):
     def bounds(self):
         return self.ruler.bounds
 
+    def get_array(self) -> np.ndarray:
+        return self.array
+
     def get_segment(self, bounding_box: MultiIndex) -> np.array:
-        b = bounding_box.bounds
+        (start_0, stop_0), (start_1, stop_1) = self._get_axis_bounds(bounding_box.bounds)
 
-        return self.array[b[0]:b[1], b[1]:b[3]]
+        return self.get_array()[start_0:stop_0, start_1:stop_1]
 
+    def get_segments(self, bounding_boxes: Iterable[MultiIndex],
+                     shape: Tuple[int, int] = None) -> Union[List[np.ndarray], np.ndarray]:
+        """
+        Extract multiple segments of the array at once.
 
-@emissor_dataclass
+        Parameters
+        ----------
+        bounding_boxes : Iterable[MultiIndex]
+            The bounding boxes of the segments.
+        shape : Tuple[int, int], optional
+            If provided, all segments are resized to this shape of the first
+            two axes using nearest neighbour sampling and returned as a single
+            stacked array.
+
+        Returns
+        -------
+        Union[List[np.ndarray], np.ndarray]
+            A list of views on the array for each bounding box if `shape` is
+            not provided, otherwise an array of shape
+            `(len(bounding_boxes), *shape, *array.shape[2:])`.
+        """
+        if shape is None:
+            return [self.get_segment(bounding_box) for bounding_box in bounding_boxes]
+
+        array = self.get_array()
+        bounds = np.array([bounding_box.bounds for bounding_box in bounding_boxes], dtype=np.int64).reshape(-1, 4)
+        (start_0, stop_0), (start_1, stop_1) = self._get_axis_bounds(bounds.T)
+
+        rows = self._sample_indices(start_0, stop_0, shape[0], array.shape[0])
+        columns = self._sample_indices(start_1, stop_1, shape[1], array.shape[1])
+
+        return array[rows[:, :, None], columns[:, None, :]]
+
+    @staticmethod
+    def _get_axis_bounds(bounds):
+        """Map the bounds of a :class:`MultiIndex` to (start, stop) of the first two axes of the array."""
+        return (bounds[0], bounds[2]), (bounds[1], bounds[3])
+
+    @staticmethod
+    def _sample_indices(start: np.ndarray, stop: np.ndarray, size: int, limit: int) -> np.ndarray:
+        steps = (np.arange(size) + 0.5) / size
+        indices = start[:, None] + np.floor(steps[None, :] * (stop - start)[:, None]).astype(np.int64)
+
+        return np.clip(indices, 0, limit - 1)
+
+
+@emissor_dataclass(slots=True)
 class TemporalRuler(Ruler):
     start: int
     end: Optional[int]
@@ -121,7 +169,7 @@ class TemporalRuler(Ruler):
 class TemporalContainer(BaseContainer[TemporalRuler, TemporalRuler]):
     @classmethod
     def from_range(cls: Type[C], start: int, end: int) -> C:
-        id = str(uuid.uuid4())
+        id = new_id()
         return cls(id, TemporalRuler(id, start, end))
 
     @property
@@ -0,0 +1,127 @@
+"""
+Generation of identifiers for containers, signals, mentions and annotation values.
+
+Identifiers are created by the :class:`IdGenerator` set with
+:func:`set_id_generator`. The default :class:`TimeOrderedIdGenerator` creates
+UUIDs in the version 7 layout, which sort by their creation time and are
+cheap to create in bulk.
+"""
+import os
+import secrets
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import List
+
+from emissor.representation.util import Identifier
+
+
+class IdGenerator(ABC):
+    @abstractmethod
+    def new_id(self) -> Identifier:
+        raise NotImplementedError("")
+
+    def new_ids(self, count: int) -> List[Identifier]:
+        return [self.new_id() for _ in range(count)]
+
+
+class RandomIdGenerator(IdGenerator):
+    """
+    Random (version 4) UUIDs.
+    """
+    def new_id(self) -> Identifier:
+        return str(uuid.uuid4())
+
+
+_LOW_MASK = (1 << 48) - 1
+
+
+class TimeOrderedIdGenerator(IdGenerator):
+    """
+    Time-ordered UUIDs in the version 7 layout.
+
+    The UUIDs consist of the creation time in milliseconds, 12 random bits, a
+    42 bit counter that increases with every identifier created by the process
+    and another 20 random bits. The random bits are drawn once per process.
+    Identifiers created by the same process are strictly increasing, also if
+    the system clock is set back.
+    """
+    _COUNTER_BITS = 42
+    _RANDOM_BITS = 20
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._random_a = 0
+        self._random_b = 0
+        self._millis = 0
+        self._counter = 0
+
+    def new_id(self) -> Identifier:
+        millis, counter = self._reserve(1)
+        value = 0b10 << 62 | counter << self._RANDOM_BITS | self._random_b
+
+        return (f"{millis >> 16:08x}-{millis & 0xffff:04x}-7{self._random_a:03x}-"
+                f"{value >> 48:04x}-{value & _LOW_MASK:012x}")
+
+    def new_ids(self, count: int) -> List[Identifier]:
+        millis, start = self._reserve(count)
+
+        prefix = f"{millis >> 16:08x}-{millis & 0xffff:04x}-7{self._random_a:03x}-"
+        variant = 0b10 << 62 | self._random_b
+
+        return [f"{prefix}{value >> 48:04x}-{value & _LOW_MASK:012x}"
+                for value in range(variant | start << self._RANDOM_BITS,
+                                   variant | (start + count) << self._RANDOM_BITS,
+                                   1 << self._RANDOM_BITS)]
+
+    def _reserve(self, count: int):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Separate the identifiers of forked processes
+                self._pid = os.getpid()
+                self._random_a = secrets.randbits(12)
+                self._random_b = secrets.randbits(self._RANDOM_BITS)
+                self._millis = 0
+                self._counter = 0
+
+            millis = time.time_ns() // 1_000_000
+            if millis > self._millis:
+                self._millis = millis
+                self._counter = 0
+            if self._counter + count > 1 << self._COUNTER_BITS:
+                self._millis += 1
+                self._counter = 0
+
+            start = self._counter
+            self._counter += count
+
+            return self._millis, start
+
+
+_ID_GENERATOR: IdGenerator = TimeOrderedIdGenerator()
+
+
+def get_id_generator() -> IdGenerator:
+    return _ID_GENERATOR
+
+
+def set_id_generator(generator: IdGenerator) -> None:
+    """
+    Set the generator used for new identifiers in the current process, e.g.
+    :class:`RandomIdGenerator` to create random UUIDs.
+    """
+    global _ID_GENERATOR
+    _ID_GENERATOR = generator
+
+
+def new_id() -> Identifier:
+    return _ID_GENERATOR.new_id()
+
+
+def new_ids(count: int) -> List[Identifier]:
+    """
+    Create identifiers for a batch of objects.
+    """
+    return _ID_GENERATOR.new_ids(count)
@@ -0,0 +1,92 @@
+"""
+Index of intervals, e.g. the time of signals or the offsets of mention
+segments, for overlap queries.
+"""
+import numpy as np
+from numpy.typing import ArrayLike
+from typing import Generic, List, Sequence, TypeVar
+
+T = TypeVar('T')
+
+
+class IntervalIndex(Generic[T]):
+    """
+    Sorted-array index of intervals.
+
+    The intervals are sorted by their start, together with the running maximum
+    of their ends, such that the candidates for a query are found by binary
+    search and only the intervals within that range are compared.
+    """
+    def __init__(self, starts: ArrayLike, ends: ArrayLike, items: Sequence[T]):
+        """
+        Parameters
+        ----------
+        starts : ArrayLike
+            The start of each interval.
+        ends : ArrayLike
+            The end of each interval, `None` for intervals without end, e.g.
+            signals that are not finished.
+        items : Sequence[T]
+            The item for each interval, returned by the queries.
+        """
+        starts = np.asarray(starts).reshape(-1)
+        ends = np.asarray(ends).reshape(-1)
+        if ends.dtype == object:
+            # Intervals without end overlap everything after their start
+            ends = np.array([np.inf if end is None else end for end in ends.tolist()], dtype=float)
+        if not len(starts) == len(ends) == len(items):
+            raise ValueError(f"Number of starts ({len(starts)}), ends ({len(ends)}) and items ({len(items)}) differ")
+
+        self._order = np.argsort(starts, kind="stable")
+        self._starts = starts[self._order]
+        self._ends = ends[self._order]
+        self._max_ends = np.maximum.accumulate(self._ends) if len(self._ends) else self._ends
+        self._items = items
+
+    def __len__(self):
+        return len(self._starts)
+
+    def overlapping(self, start, end, closed: bool = False) -> List[T]:
+        """
+        The items whose interval overlaps the interval from `start` to `end`.
+
+        Parameters
+        ----------
+        start :
+            The start of the query interval.
+        end :
+            The end of the query interval.
+        closed : bool, optional, default: False
+            If set, intervals include their end, i.e. intervals that only touch
+            the query interval overlap. Otherwise intervals exclude their end.
+
+        Returns
+        -------
+        List[T]
+            The items ordered by the start of their interval.
+        """
+        # Candidates start before the end of the query and have a running maximum end after its start
+        last = np.searchsorted(self._starts, end, side="right" if closed else "left")
+        first = np.searchsorted(self._max_ends[:last], start, side="left" if closed else "right")
+
+        ends = self._ends[first:last]
+        matches = np.flatnonzero(ends >= start if closed else ends > start) + first
+
+        return [self._items[idx] for idx in self._order[matches].tolist()]
+
+    def containing(self, point) -> List[T]:
+        """
+        The items whose interval contains `point`, i.e. whose start is at or
+        before and whose end is after `point`.
+
+        Returns
+        -------
+        List[T]
+            The items ordered by the start of their interval.
+        """
+        last = np.searchsorted(self._starts, point, side="right")
+        first = np.searchsorted(self._max_ends[:last], point, side="right")
+
+        matches = np.flatnonzero(self._ends[first:last] > point) + first
+
+        return [self._items[idx] for idx in self._order[matches].tolist()]
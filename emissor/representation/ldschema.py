@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field, Field
+from dataclasses import dataclass, field, fields, Field
 
 import inspect
 from rdflib import URIRef, Namespace
@@ -10,7 +10,20 @@ LD_TYPE_FIELD = "_ld_type"
 EMISSOR_NAMESPACE = "https://emissor.org"
 
 
-def emissor_dataclass(cls: Type = None, **kwargs):
+def emissor_dataclass(cls: Type = None, *, slots: bool = False, **kwargs):
+    """
+    Decorator to create a dataclass with linked data information, see :func:`ld_type`.
+
+    Keyword arguments are passed to :func:`ld_type` and :func:`dataclasses.dataclass`.
+
+    Parameters
+    ----------
+    slots : bool, default: False
+        Store the fields of the dataclass in `__slots__` instead of an instance
+        `__dict__`, which reduces the memory used by instances. Instances only
+        benefit from this if all base classes define `__slots__`, and cannot
+        be extended with attributes that are not fields of the dataclass.
+    """
     def wrapper(clazz):
         ld_type_kw = _get_kw_args(ld_type)
         ld_type_args = {k: v for k, v in kwargs.items() if k in ld_type_kw}
@@ -21,11 +34,32 @@ def emissor_dataclass(cls: Type = None, **kwargs):
         dataclass_kw = _get_kw_args(dataclass)
         dataclass_args = {k: v for k, v in kwargs.items() if k in dataclass_kw}
 
-        return dataclass(ld_clazz, **dataclass_args)
+        data_clazz = dataclass(ld_clazz, **dataclass_args)
+
+        return _add_slots(data_clazz) if slots else data_clazz
 
     return wrapper(cls) if cls else wrapper
 
 
+def _add_slots(cls: Type) -> Type:
+    # Slots must be defined when the class is created, therefore the class is re-created as in dataclasses (>= 3.10)
+    field_names = tuple(field_.name for field_ in fields(cls))
+    inherited_slots = {slot for base in cls.__mro__[1:] for slot in base.__dict__.get("__slots__", ())}
+
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = tuple(name for name in field_names if name not in inherited_slots)
+    for name in field_names:
+        # Remove defaults that would conflict with the slot descriptors
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+
+    slots_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slots_cls.__qualname__ = cls.__qualname__
+
+    return slots_cls
+
+
 @dataclass
 class LdProperty:
     """
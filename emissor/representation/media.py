@@ -0,0 +1,172 @@
+"""
+Loading of the array data of signals from their files.
+
+Decoded arrays are kept in an LRU cache that is bounded by the total number
+of decoded bytes. Arrays that are memory mapped from their file, i.e. audio
+in WAV format and arrays stored in the numpy `.npy` format, are not counted
+towards that bound.
+"""
+import logging
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+
+class ArrayCache:
+    """
+    LRU cache of arrays loaded from files, bounded by the total size in bytes
+    of the cached arrays that are held in memory.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_SIZE):
+        self._max_bytes = max_bytes
+        self._arrays = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str, loader: Callable[[str], np.ndarray]) -> np.ndarray:
+        with self._lock:
+            if key in self._arrays:
+                self._arrays.move_to_end(key)
+                return self._arrays[key][0]
+
+        array = loader(key)
+        array_size = _decoded_size(array)
+
+        with self._lock:
+            if key not in self._arrays and array_size <= self._max_bytes:
+                self._arrays[key] = (array, array_size)
+                self._size += array_size
+                self._evict()
+
+        return array
+
+    def clear(self):
+        with self._lock:
+            self._arrays.clear()
+            self._size = 0
+
+    def _evict(self):
+        while self._size > self._max_bytes and self._arrays:
+            key, (_, array_size) = self._arrays.popitem(last=False)
+            self._size -= array_size
+            logger.debug("Evicted %s (%s bytes) from array cache", key, array_size)
+
+
+_ARRAY_CACHE = ArrayCache()
+
+
+def get_array_cache() -> ArrayCache:
+    """
+    The cache used for the arrays of signals, see
+    :meth:`emissor.representation.scenario.FileArrayContainer.get_array`.
+    The size of the cache can be adjusted by setting its `max_bytes` attribute.
+    """
+    return _ARRAY_CACHE
+
+
+def load_image(path: str) -> np.ndarray:
+    """
+    Load an image as array of shape (height, width[, channels]).
+
+    Images in `.npy` format are memory mapped, other formats are decoded with
+    Pillow.
+    """
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode='r')
+
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise ImportError("Loading images requires Pillow to be installed (pip install emissor[media])") from e
+
+    with Image.open(path) as image:
+        array = np.asarray(image)
+    array.flags.writeable = False
+
+    return array
+
+
+def load_audio(path: str) -> np.ndarray:
+    """
+    Load audio as memory mapped array of shape (samples, channels).
+
+    Supports PCM and IEEE float WAV files and arrays in `.npy` format.
+    """
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode='r')
+
+    offset, dtype, channels, length = _read_wav_header(path)
+
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(length // dtype.itemsize // channels, channels))
+
+
+_WAV_PCM = 1
+_WAV_IEEE_FLOAT = 3
+_WAV_EXTENSIBLE = 0xFFFE
+
+
+def _read_wav_header(path: str):
+    with open(path, 'rb') as wav_file:
+        riff, _, wave = struct.unpack("<4sI4s", wav_file.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"Not a WAV file: {path}")
+
+        fmt = None
+        while True:
+            header = wav_file.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data in WAV file: {path}")
+
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", wav_file.read(16))
+                wav_file.seek(chunk_size - 16 + chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"Missing format of WAV file: {path}")
+
+                return wav_file.tell(), _wav_dtype(path, fmt), fmt[1], chunk_size
+            else:
+                wav_file.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
+def _wav_dtype(path: str, fmt) -> np.dtype:
+    audio_format, _, _, _, _, bits = fmt
+    if audio_format in (_WAV_PCM, _WAV_EXTENSIBLE) and bits in (8, 16, 32):
+        return np.dtype({8: "u1", 16: "<i2", 32: "<i4"}[bits])
+    if audio_format == _WAV_IEEE_FLOAT and bits in (32, 64):
+        return np.dtype({32: "<f4", 64: "<f8"}[bits])
+
+    raise ValueError(f"Unsupported WAV format {audio_format} with {bits} bits: {path}")
+
+
+def _decoded_size(array: Optional[np.ndarray]) -> int:
+    if array is None:
+        return 0
+    if isinstance(array, np.memmap) or isinstance(array.base, np.memmap):
+        return 0
+
+    return array.nbytes
@@ -1,6 +1,9 @@
+import collections.abc
 import enum
-import uuid
+import os
+import time
 from abc import ABC
+from dataclasses import field
 from typing import Iterable, Dict, TypeVar, Type, Generic, List, Optional, Union, Any
 
 try:
@@ -9,13 +12,17 @@ except ImportError:
     # Requires Python >= 3.8.
     pass
 
-from marshmallow import fields
+import numpy as np
+from marshmallow import fields, missing
 from numpy.typing import ArrayLike
 
 from emissor.representation.container import TemporalContainer, Ruler, TemporalRuler, ArrayContainer, Index, MultiIndex, \
     BaseContainer, Sequence
 from emissor.representation.ldschema import emissor_dataclass
-from emissor.representation.util import Identifier, marshal, get_serializable_type_var
+from emissor.representation.media import get_array_cache, load_image, load_audio
+from emissor.representation.ids import new_id, new_ids
+from emissor.representation.util import Identifier, marshal, get_serializable_type_var, GenericField, ArrayLikeField, \
+    _marshal, _unmarshal, _writes_binary_arrays
 
 C = TypeVar('C')
 T = get_serializable_type_var('T')
@@ -29,7 +36,7 @@ class Modality(enum.Enum):
     VIDEO = 3
 
 
-@emissor_dataclass
+@emissor_dataclass(slots=True)
 class Annotation(Generic[T]):
     type: Identifier
     value: T
@@ -37,55 +44,705 @@ class Annotation(Generic[T]):
     timestamp: int
 
 
-@emissor_dataclass
+@emissor_dataclass(slots=True)
 class Mention:
     id: Identifier
     segment: List[T]
     annotations: List[T]
 
 
+def create_mentions(container_id: Identifier, offsets: ArrayLike, annotation_type: Identifier,
+                    values: Iterable[Any], source: Identifier, timestamp: int = None) -> List[Mention]:
+    """
+    Create a mention with a single annotation for each segment of a container.
+
+    Parameters
+    ----------
+    container_id : Identifier
+        The identifier of the container, e.g. the signal, the segments refer to.
+    offsets : ArrayLike
+        The segments as array of shape `(n, 2)` with start and stop offsets,
+        which are converted to :class:`Index`, or of shape `(n, 4)` with
+        bounding boxes, which are converted to :class:`MultiIndex`.
+    annotation_type : Identifier
+        The type of the annotations.
+    values : Iterable[Any]
+        The annotation value for each segment.
+    source : Identifier
+        The source of the annotations.
+    timestamp : int, optional
+        The timestamp of the annotations, by default the current time.
+
+    Returns
+    -------
+    List[Mention]
+        The mentions in the order of the offsets.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets.size == 0:
+        return []
+    if offsets.ndim != 2 or offsets.shape[1] not in (2, 4):
+        raise ValueError(f"offsets must be of shape (n, 2) or (n, 4), was {offsets.shape}")
+
+    values = list(values)
+    if len(values) != len(offsets):
+        raise ValueError(f"Number of values ({len(values)}) does not match the number of offsets ({len(offsets)})")
+
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    if offsets.shape[1] == 2:
+        segments = [Index(container_id, start, stop) for start, stop in offsets.tolist()]
+    else:
+        segments = [MultiIndex(container_id, tuple(bounds)) for bounds in offsets.tolist()]
+
+    return [Mention(mention_id, [segment], [Annotation(annotation_type, value, source, timestamp)])
+            for mention_id, segment, value in zip(new_ids(len(segments)), segments, values)]
+
+
+MENTION_COLUMNS_FIELD = "@mentions"
+
+_CONTAINER, _TYPE, _VALUE, _SOURCE = range(4)
+
+
+class _Dictionary:
+    """
+    Table of the distinct values of a column. Values that are not hashable
+    are stored once per object.
+    """
+    def __init__(self, values: Iterable[Any] = ()):
+        self.values = list(values)
+        self._codes = None
+        self._identities = None
+
+    def encode(self, value: Any) -> int:
+        if self._codes is None:
+            self._codes = dict()
+            self._identities = dict()
+            for code, existing in enumerate(self.values):
+                self._add_code(existing, code)
+
+        try:
+            # Distinguish equal values of different types, e.g. 1 and True
+            code = self._codes.setdefault((type(value), value), len(self.values))
+        except TypeError:
+            code = self._identities.setdefault(id(value), len(self.values))
+        if code == len(self.values):
+            self.values.append(value)
+
+        return code
+
+    def set(self, code: int, value: Any):
+        """
+        Replace the value of a code, e.g. by its deserialized form.
+        """
+        self.values[code] = value
+        if self._codes is not None:
+            self._add_code(value, code)
+
+    def _add_code(self, value: Any, code: int):
+        try:
+            self._codes.setdefault((type(value), value), code)
+        except TypeError:
+            # Values are kept in the table, therefore their id is not reused
+            self._identities.setdefault(id(value), code)
+
+
+class _EncodedValue:
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+
+class ColumnarMentions(collections.abc.MutableSequence):
+    """
+    Mentions of a signal stored as columns.
+
+    Mentions with a single :class:`Index` or :class:`MultiIndex` segment and a
+    single :class:`Annotation`, e.g. token annotations, are stored as arrays of
+    segment offsets, codes of the container, annotation type, value and source,
+    and timestamps. Container ids, annotation types, values and sources are
+    dictionary encoded. If arrays are written to a binary file, see
+    :class:`emissor.representation.util.BinaryArrayWriter`, the columns are
+    serialized as arrays. Otherwise the mentions are serialized as a list of
+    mentions, the same as mentions in a list.
+
+    :class:`Mention` objects are only created when they are accessed and are
+    kept afterwards, such that changes made to them are preserved. Mentions
+    added as objects, and mentions that cannot be stored in columns, are kept
+    as objects.
+    """
+    def __init__(self, mentions: Iterable[Mention] = ()):
+        self._ids: List[Identifier] = []
+        self._offsets = np.zeros((0, 0), dtype=np.int64)
+        self._codes = np.zeros((0, 4), dtype=np.int32)
+        self._timestamps = np.zeros(0, dtype=np.int64)
+        self._mentions = np.empty(0, dtype=object)
+        self._materialized = np.zeros(0, dtype=bool)
+        self._snapshots = np.empty(0, dtype=object)
+
+        self._containers = _Dictionary()
+        self._types = _Dictionary()
+        self._values = _Dictionary()
+        self._sources = _Dictionary()
+
+        self.extend(mentions)
+
+    @classmethod
+    def from_offsets(cls, container_id: Identifier, offsets: ArrayLike, annotation_type: Identifier,
+                     values: Iterable[Any], source: Identifier, timestamp: int = None) -> "ColumnarMentions":
+        """
+        Create mentions with a single annotation for each segment of a
+        container, see :func:`create_mentions` for the parameters.
+        """
+        mentions = cls()
+        mentions.extend_offsets(container_id, offsets, annotation_type, values, source, timestamp)
+
+        return mentions
+
+    @property
+    def ids(self) -> List[Identifier]:
+        return list(self._ids)
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """
+        The offsets of the segments, of shape `(n, 2)` for :class:`Index` and
+        `(n, 4)` for :class:`MultiIndex` segments. Rows of mentions that are not
+        stored in columns are zero.
+        """
+        self._flush()
+
+        return self._offsets
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        self._flush()
+
+        return self._timestamps
+
+    @property
+    def annotation_types(self) -> np.ndarray:
+        """
+        The annotation type of each mention, 'None' for mentions that are not
+        stored in columns.
+        """
+        self._flush()
+
+        return np.array(self._types.values + [None], dtype=object)[self._codes[:, _TYPE]]
+
+    def extend_offsets(self, container_id: Identifier, offsets: ArrayLike, annotation_type: Identifier,
+                       values: Iterable[Any], source: Identifier, timestamp: int = None) -> None:
+        """
+        Add a mention with a single annotation for each segment of a container,
+        see :func:`create_mentions` for the parameters. No :class:`Mention`
+        objects are created.
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if offsets.size == 0:
+            return
+        if offsets.ndim != 2 or offsets.shape[1] not in (2, 4):
+            raise ValueError(f"offsets must be of shape (n, 2) or (n, 4), was {offsets.shape}")
+        if not self._set_width(offsets.shape[1]):
+            raise ValueError(f"offsets must be of shape (n, {self._offsets.shape[1]}), was {offsets.shape}")
+
+        value_codes = [self._values.encode(value) for value in values]
+        if len(value_codes) != len(offsets):
+            raise ValueError(f"Number of values ({len(value_codes)}) does not match the number of offsets "
+                             f"({len(offsets)})")
+
+        codes = np.empty((len(offsets), 4), dtype=np.int32)
+        codes[:, _CONTAINER] = self._containers.encode(container_id)
+        codes[:, _TYPE] = self._types.encode(annotation_type)
+        codes[:, _VALUE] = value_codes
+        codes[:, _SOURCE] = self._sources.encode(source)
+        timestamp = int(time.time()) if timestamp is None else timestamp
+
+        self._insert_rows(len(self), new_ids(len(offsets)), offsets, codes,
+                          np.full(len(offsets), timestamp, dtype=np.int64), np.empty(len(offsets), dtype=object))
+
+    def filter(self, annotation_type: Identifier = None, source: Identifier = None,
+               invert: bool = False) -> "ColumnarMentions":
+        """
+        Select the mentions that have an annotation of the given type and
+        source, without creating :class:`Mention` objects for them.
+
+        Parameters
+        ----------
+        annotation_type : Identifier, optional
+            The type of the annotation, any type if not provided.
+        source : Identifier, optional
+            The source of the annotation, any source if not provided.
+        invert : bool, optional, default: False
+            Select the mentions that don't have such an annotation instead.
+
+        Returns
+        -------
+        ColumnarMentions
+            The selected mentions.
+        """
+        selected = np.ones(len(self), dtype=bool)
+        if annotation_type is not None:
+            selected &= np.isin(self._codes[:, _TYPE], self._find_codes(self._types, annotation_type))
+        if source is not None:
+            selected &= np.isin(self._codes[:, _SOURCE], self._find_codes(self._sources, source))
+
+        # Mentions held as objects may have been modified
+        for row in np.flatnonzero(self._materialized):
+            selected[row] = any((annotation_type is None or annotation.type == annotation_type)
+                                and (source is None or annotation.source == source)
+                                for annotation in self._mentions[row].annotations)
+
+        return self._take(np.flatnonzero(selected != invert))
+
+    def insert(self, index: int, mention: Mention) -> None:
+        self._insert_mentions(self._normalize_index(index, insert=True), [mention])
+
+    def extend(self, mentions: Iterable[Mention]) -> None:
+        self._insert_mentions(len(self), list(mentions))
+
+    def clear(self) -> None:
+        self._select(np.zeros(0, dtype=int))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(row) for row in range(*index.indices(len(self)))]
+
+        return self._get(self._normalize_index(index))
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            rows = range(*index.indices(len(self)))
+            mentions = list(value)
+            if index.step not in (None, 1):
+                if len(rows) != len(mentions):
+                    raise ValueError(f"attempt to assign sequence of size {len(mentions)} "
+                                     f"to extended slice of size {len(rows)}")
+                for row, mention in zip(rows, mentions):
+                    self[row] = mention
+            else:
+                del self[index]
+                self._insert_mentions(rows.start, mentions)
+            return
+
+        row = self._normalize_index(index)
+        self._ids[row] = value.id
+        self._mentions[row] = value
+        self._materialized[row] = True
+        self._snapshots[row] = None
+
+    def __delitem__(self, index):
+        rows = np.arange(len(self))[index] if isinstance(index, slice) else self._normalize_index(index)
+        keep = np.ones(len(self), dtype=bool)
+        keep[rows] = False
+        self._select(np.flatnonzero(keep))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return (self._get(row) for row in range(len(self)))
+
+    def __eq__(self, other):
+        if isinstance(other, collections.abc.Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ColumnarMentions({len(self)} mentions)"
+
+    def _get(self, row: int) -> Mention:
+        if self._materialized[row]:
+            return self._mentions[row]
+
+        container, type_, value, source = self._codes[row].tolist()
+        offsets = self._offsets[row].tolist()
+        container_id = self._containers.values[container]
+        segment = Index(container_id, *offsets) if len(offsets) == 2 else MultiIndex(container_id, tuple(offsets))
+        annotation = Annotation(self._types.values[type_], self._decode_value(value), self._sources.values[source],
+                                int(self._timestamps[row]))
+        mention = Mention(self._ids[row], [segment], [annotation])
+
+        self._mentions[row] = mention
+        self._materialized[row] = True
+        self._snapshots[row] = (mention.id, self._column_values(mention))
+
+        return mention
+
+    def _decode_value(self, code: int) -> Any:
+        value = self._values.values[code]
+        if isinstance(value, _EncodedValue):
+            value = GenericField()._deserialize(value.data, None, None)
+            self._values.set(code, value)
+
+        return value
+
+    def _insert_mentions(self, row: int, mentions: List[Mention]):
+        objects = np.empty(len(mentions), dtype=object)
+        objects[:] = mentions
+        codes = np.full((len(mentions), 4), -1, dtype=np.int32)
+
+        self._insert_rows(row, [mention.id for mention in mentions],
+                          np.zeros((len(mentions), self._offsets.shape[1]), dtype=np.int64), codes,
+                          np.zeros(len(mentions), dtype=np.int64), objects)
+
+    def _insert_rows(self, row: int, ids: List[Identifier], offsets: np.ndarray, codes: np.ndarray,
+                     timestamps: np.ndarray, mentions: np.ndarray):
+        self._ids[row:row] = ids
+        self._offsets = np.concatenate([self._offsets[:row], offsets, self._offsets[row:]])
+        self._codes = np.concatenate([self._codes[:row], codes, self._codes[row:]])
+        self._timestamps = np.concatenate([self._timestamps[:row], timestamps, self._timestamps[row:]])
+        self._mentions = np.concatenate([self._mentions[:row], mentions, self._mentions[row:]])
+        self._materialized = np.concatenate([self._materialized[:row], np.not_equal(mentions, None).astype(bool),
+                                             self._materialized[row:]])
+        self._snapshots = np.concatenate([self._snapshots[:row], np.empty(len(ids), dtype=object),
+                                          self._snapshots[row:]])
+
+    def _select(self, rows: np.ndarray):
+        self._ids = [self._ids[row] for row in rows.tolist()]
+        self._offsets = self._offsets[rows]
+        self._codes = self._codes[rows]
+        self._timestamps = self._timestamps[rows]
+        self._mentions = self._mentions[rows]
+        self._materialized = self._materialized[rows]
+        self._snapshots = self._snapshots[rows]
+
+    def _take(self, rows: np.ndarray) -> "ColumnarMentions":
+        selection = ColumnarMentions()
+        selection.__dict__.update(self.__dict__)
+        selection._select(rows)
+        # The selection gets its own dictionaries
+        selection._compact()
+
+        return selection
+
+    def _compact(self):
+        """
+        Replace the dictionaries by dictionaries of the values used in the columns.
+        """
+        for column, name in ((_CONTAINER, "_containers"), (_TYPE, "_types"), (_VALUE, "_values"),
+                             (_SOURCE, "_sources")):
+            dictionary = getattr(self, name)
+            codes = self._codes[:, column]
+            used = np.unique(codes[codes >= 0])
+            # The last entry maps the code -1 of rows that are not stored in columns
+            mapping = np.full(len(dictionary.values) + 1, -1, dtype=np.int32)
+            mapping[used] = np.arange(len(used), dtype=np.int32)
+            self._codes[:, column] = mapping[codes]
+            setattr(self, name, _Dictionary(dictionary.values[code] for code in used.tolist()))
+
+    def _set_width(self, width: int) -> bool:
+        if self._offsets.shape[1] == width:
+            return True
+        if self._offsets.shape[1] != 0 and np.any(self._codes[:, _TYPE] >= 0):
+            return False
+
+        self._offsets = np.zeros((len(self), width), dtype=np.int64)
+
+        return True
+
+    def _flush(self):
+        """
+        Update the columns from the mentions held as objects that changed
+        since they were created or last flushed.
+        """
+        for row in np.flatnonzero(self._materialized).tolist():
+            mention = self._mentions[row]
+            values = self._column_values(mention)
+            if self._unchanged(self._snapshots[row], mention.id, values):
+                continue
+
+            self._snapshots[row] = (mention.id, values)
+            self._ids[row] = mention.id
+            self._codes[row] = -1
+            if values is None or not self._set_width(len(values[0])):
+                continue
+
+            offsets, container_id, annotation_type, source, timestamp, value = values
+            self._offsets[row] = offsets
+            self._codes[row] = (self._containers.encode(container_id), self._types.encode(annotation_type),
+                                self._values.encode(value), self._sources.encode(source))
+            self._timestamps[row] = timestamp
+
+    @staticmethod
+    def _column_values(mention: Mention) -> Optional[tuple]:
+        """
+        The offsets, container, annotation type, source, timestamp and value
+        of a mention, or 'None' if it cannot be stored in columns.
+        """
+        if len(mention.segment) != 1 or len(mention.annotations) != 1 \
+                or type(mention.segment[0]) not in (Index, MultiIndex) \
+                or type(mention.annotations[0]) is not Annotation:
+            return None
+
+        segment = mention.segment[0]
+        offsets = (segment.start, segment.stop) if isinstance(segment, Index) else tuple(segment.bounds)
+        if None in offsets:
+            return None
+
+        annotation = mention.annotations[0]
+
+        return offsets, segment.container_id, annotation.type, annotation.source, annotation.timestamp, \
+            annotation.value
+
+    @staticmethod
+    def _unchanged(snapshot: Optional[tuple], mention_id: Identifier, values: Optional[tuple]) -> bool:
+        if snapshot is None or snapshot[0] != mention_id:
+            return False
+        if snapshot[1] is None or values is None:
+            return snapshot[1] is values
+
+        # Values are compared by identity, they may not support comparison, e.g. arrays
+        return snapshot[1][:-1] == values[:-1] and snapshot[1][-1] is values[-1]
+
+    @staticmethod
+    def _find_codes(dictionary: _Dictionary, value: Any) -> List[int]:
+        return [code for code, existing in enumerate(dictionary.values) if existing == value]
+
+    def _normalize_index(self, index: int, insert: bool = False) -> int:
+        row = index + len(self) if index < 0 else index
+        if insert:
+            return min(max(row, 0), len(self))
+        if not 0 <= row < len(self):
+            raise IndexError("mention index out of range")
+
+        return row
+
+    def _serialize(self) -> dict:
+        self._flush()
+        self._compact()
+
+        columnar = self._codes[:, _TYPE] >= 0
+        objects = np.flatnonzero(~columnar).tolist()
+        array_field = ArrayLikeField()
+        values = [value.data if isinstance(value, _EncodedValue) else GenericField()._serialize(value, None, None)
+                  for value in self._values.values]
+
+        return {
+            MENTION_COLUMNS_FIELD: len(self),
+            "ids": self._ids,
+            "offsets": array_field._serialize(self._offsets, None, None),
+            "codes": array_field._serialize(self._codes, None, None),
+            "timestamps": array_field._serialize(self._timestamps, None, None),
+            "containers": self._containers.values,
+            "types": self._types.values,
+            "values": values,
+            "sources": self._sources.values,
+            "objects": {"rows": objects, "mentions": _marshal([self._mentions[row] for row in objects], cls=Mention,
+                                                             serialize=False)}
+        }
+
+    @classmethod
+    def _deserialize(cls, data: dict) -> "ColumnarMentions":
+        count = data[MENTION_COLUMNS_FIELD]
+        array_field = ArrayLikeField()
+
+        mentions = cls()
+        mentions._ids = list(data["ids"])
+        # Copy arrays mapped from binary files to allow modifications
+        mentions._offsets = np.array(array_field._deserialize(data["offsets"], None, None),
+                                     dtype=np.int64).reshape(count, -1)
+        mentions._codes = np.array(array_field._deserialize(data["codes"], None, None),
+                                   dtype=np.int32).reshape(count, 4)
+        mentions._timestamps = np.array(array_field._deserialize(data["timestamps"], None, None),
+                                        dtype=np.int64).reshape(count)
+        mentions._mentions = np.empty(count, dtype=object)
+        mentions._materialized = np.zeros(count, dtype=bool)
+        mentions._snapshots = np.empty(count, dtype=object)
+        mentions._containers = _Dictionary(data["containers"])
+        mentions._types = _Dictionary(data["types"])
+        mentions._values = _Dictionary(_EncodedValue(value) for value in data["values"])
+        mentions._sources = _Dictionary(data["sources"])
+
+        rows = data["objects"]["rows"]
+        objects = _unmarshal(data["objects"]["mentions"], cls=Mention, serialized=False) if rows else []
+        for row, mention in zip(rows, objects):
+            mentions._mentions[row] = mention
+            mentions._materialized[row] = True
+
+        return mentions
+
+
+class _MentionsField(fields.Field):
+    """
+    Mentions are serialized as list, or as columns if they are stored in
+    :class:`ColumnarMentions` and arrays are written to a binary file. The
+    columnar layout is only used for storage with binary arrays, which keeps
+    JSON files and API responses compatible with consumers of mention lists.
+    """
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        if isinstance(value, ColumnarMentions) and _writes_binary_arrays():
+            return value._serialize()
+
+        return _marshal(list(value), cls=Mention, serialize=False)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, dict) and MENTION_COLUMNS_FIELD in value:
+            return ColumnarMentions._deserialize(value)
+
+        return _unmarshal(value, cls=Mention, serialized=False)
+
+
 @emissor_dataclass
 class Signal(Generic[R, T], BaseContainer[R, T], ABC):
     modality: Modality
     time: TemporalRuler
     files: List[str]
-    mentions: List[Mention]
+    mentions: List[Mention] = field(metadata={"marshmallow_field": _MentionsField()})
+
+
+class TextSequence(collections.abc.Sequence):
+    """
+    Read-only view of the characters of a text.
+
+    The view shares the underlying string instead of storing a separate list
+    of characters. Slicing the view returns the corresponding substring.
+    """
+    __slots__ = ("_text",)
+
+    def __init__(self, text: str):
+        self._text = text if text else ""
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def __getitem__(self, index):
+        return self._text[index]
+
+    def __len__(self):
+        return len(self._text)
+
+    def __iter__(self):
+        return iter(self._text)
+
+    def __contains__(self, value):
+        return value in self._text
+
+    def __eq__(self, other):
+        if isinstance(other, TextSequence):
+            return self._text == other._text
+        if isinstance(other, str):
+            return self._text == other
+        if isinstance(other, collections.abc.Sequence):
+            return len(other) == len(self._text) and all(a == b for a, b in zip(self._text, other))
+
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._text)
+
+    def __repr__(self):
+        return f"TextSequence({self._text!r})"
+
+
+class _TextSequenceField(fields.Field):
+    """
+    The sequence of a :class:`TextSignal` is derived from its text and not
+    serialized. A character array stored by earlier versions is accepted on
+    load and replaced by a view on the text.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(load_only=True, required=False, allow_none=True, **kwargs)
+
+    def deserialize(self, value, attr=None, data=None, **kwargs):
+        if value is missing:
+            return None
+
+        return super().deserialize(value, attr, data, **kwargs)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        return value
 
 
 @emissor_dataclass
 class TextSignal(Signal[Index, str], Sequence[str]):
+    seq: List[str] = field(metadata={"marshmallow_field": _TextSequenceField()})
     text: str
 
+    def __post_init__(self):
+        if self.text is None and self.seq is not None:
+            self.text = "".join(self.seq)
+        if not isinstance(self.seq, TextSequence) or self.seq.text is not self.text:
+            self.seq = TextSequence(self.text)
+
     @classmethod
     def for_scenario(cls: Type[C], scenario_id: Identifier, start: int, stop: int, file: str, text: str = None,
                      mentions: Iterable[Mention] = None, signal_id: Optional[str] = None) -> C:
-        signal_id = signal_id if signal_id else str(uuid.uuid4())
+        signal_id = signal_id if signal_id else new_id()
         text = text if text else ""
 
-        return cls(signal_id, Index.from_range(signal_id, 0, len(text)), list(text), Modality.TEXT,
+        return cls(signal_id, Index.from_range(signal_id, 0, len(text)), TextSequence(text), Modality.TEXT,
                    TemporalRuler(scenario_id, start, stop), [file] if file else [], list(mentions) if mentions else [],
                    text)
 
 
+class FileArrayContainer:
+    """
+    Mixin for signals with array data that is stored in their file.
+
+    If the `array` of the signal is not set, the array is loaded from the
+    first file of the signal on first access and kept in the array cache of
+    :mod:`emissor.representation.media`. Relative file paths are resolved
+    against the base path of the signal, which is set by the storage to the
+    scenario directory when the signal is loaded.
+    """
+    _base_path = None
+
+    def set_base_path(self, base_path: Optional[str]):
+        self._base_path = base_path
+
+    def get_array(self) -> np.ndarray:
+        if self.array is not None:
+            return self.array
+        if not self.files:
+            return None
+
+        path = self.files[0]
+        if self._base_path and not os.path.isabs(path):
+            path = os.path.join(self._base_path, path)
+
+        return get_array_cache().get(os.path.abspath(path), self._load_array)
+
+    @staticmethod
+    def _load_array(path: str) -> np.ndarray:
+        raise NotImplementedError()
+
+
 @emissor_dataclass
-class ImageSignal(Signal[MultiIndex, ArrayLike], ArrayContainer):
+class ImageSignal(FileArrayContainer, Signal[MultiIndex, ArrayLike], ArrayContainer):
     @classmethod
     def for_scenario(cls: Type[C], scenario_id: Identifier, start: int, stop: int, file: str,
                      bounds: Iterable[int], mentions: Iterable[Mention] = None, signal_id: Optional[str] = None) -> C:
-        signal_id = signal_id if signal_id else str(uuid.uuid4())
+        signal_id = signal_id if signal_id else new_id()
         return cls(signal_id, MultiIndex(signal_id, tuple(bounds)), None, Modality.IMAGE,
                    TemporalRuler(scenario_id, start, stop), [file] if file else [], list(mentions) if mentions else [])
 
+    @staticmethod
+    def _load_array(path: str) -> np.ndarray:
+        return load_image(path)
+
+    @staticmethod
+    def _get_axis_bounds(bounds):
+        # Bounds are (x_min, y_min, x_max, y_max) for an image array of shape (height, width[, channels])
+        return (bounds[1], bounds[3]), (bounds[0], bounds[2])
+
 
 @emissor_dataclass
-class AudioSignal(Signal[MultiIndex, ArrayLike], ArrayContainer):
+class AudioSignal(FileArrayContainer, Signal[MultiIndex, ArrayLike], ArrayContainer):
     @classmethod
     def for_scenario(cls: Type[C], scenario_id: Identifier, start: int, stop: int, file: str,
                      length: int, channels: int, mentions: Iterable[Mention] = None, signal_id: Optional[str] = None) -> C:
-        signal_id = signal_id if signal_id else str(uuid.uuid4())
+        signal_id = signal_id if signal_id else new_id()
         return cls(signal_id, MultiIndex(signal_id, (0, 0, length, channels)), None, Modality.AUDIO,
                    TemporalRuler(scenario_id, start, stop), [file] if file else [], list(mentions) if mentions else [])
 
+    @staticmethod
+    def _load_array(path: str) -> np.ndarray:
+        return load_audio(path)
+
 
 @emissor_dataclass
 class VideoSignal(Signal[MultiIndex, ArrayLike], ArrayContainer):
@@ -110,7 +767,7 @@ class Scenario(TemporalContainer, Generic[SC]):
     def new_instance(cls: Type[C], scenario_id: str, start: int, end: int, context: ScenarioContext,
                      signals: Dict[str, str]) -> C:
         temporal_ruler = TemporalRuler(scenario_id, start, end)
-        return cls(scenario_id, temporal_ruler, context, signals)
+        return cls(scenario_id, temporal_ruler, context, dict(signals))
 
 
 class AnnotationField(fields.Field):
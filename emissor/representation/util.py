@@ -5,6 +5,9 @@ from collections import namedtuple
 from dataclasses import is_dataclass
 
 import collections.abc
+import contextlib
+import contextvars
+import os
 from datetime import datetime, date
 
 import marshmallow
@@ -13,22 +16,29 @@ import numbers
 import numpy as np
 import simplejson as json
 import sys
+import threading
 import uuid
 from marshmallow import fields, EXCLUDE, ValidationError
 from numpy.typing import ArrayLike
 from rdflib import URIRef
-from typing import Any, Callable, TypeVar, Type, Mapping, Union
+from typing import Any, Callable, TypeVar, Type, Mapping, Union, IO, Iterator
 
 _logger = logging.getLogger(__name__)
 
 
 PY_TYPE_FIELD = "_py_type"
+ARRAY_REFERENCE_FIELD = "@array"
 
 Identifier = str
 
 
 class GenericField(fields.Field):
     def _serialize(self, value, attr, obj, **kwargs):
+        if isinstance(value, np.ndarray):
+            reference = _write_array(value)
+            if reference is not None:
+                return reference
+
         try:
             object_dict = _marshal(value, cls=value.__class__, serialize=False)
             object_dict[PY_TYPE_FIELD] = f"{value.__class__.__module__}-{value.__class__.__name__}"
@@ -38,6 +48,9 @@ class GenericField(fields.Field):
             return _marshal(value, serialize=False)
 
     def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, dict) and ARRAY_REFERENCE_FIELD in value:
+            return _read_array(value)
+
         try:
             module_, type_ = value[PY_TYPE_FIELD].split("-")
             clazz = getattr(sys.modules[module_], type_)
@@ -55,15 +68,154 @@ class ArrayLikeField(fields.Field):
         if value is None:
             return ""
 
-        return np.array(value).tolist()
+        array = np.asarray(value)
+        reference = _write_array(array)
+
+        return reference if reference is not None else array.tolist()
 
     def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, dict) and ARRAY_REFERENCE_FIELD in value:
+            return _read_array(value)
+
         try:
             return np.array(value) if value != "" else None
         except ValueError as error:
             raise ValidationError("Not an ArrayLike") from error
 
 
+class BinaryArrayWriter:
+    """
+    Writes numpy arrays to a binary file instead of embedding them in JSON.
+
+    If a writer is passed to :func:`marshal`, arrays with at least `min_size`
+    elements and a numeric data type are appended to the file and the JSON
+    contains a reference with the name of the file, the offset, data type and
+    shape of the array. Arrays are aligned to :attr:`ALIGNMENT` bytes in the
+    file.
+
+    The file is created on the first write. The writer must be closed before
+    the JSON referencing the file is persisted.
+    """
+    ALIGNMENT = 64
+
+    def __init__(self, path: str, min_size: int = 16):
+        self._path = path
+        self._min_size = min_size
+        self._file = None
+        self._written = False
+
+    @property
+    def file_name(self) -> str:
+        return os.path.basename(self._path)
+
+    @property
+    def written(self) -> bool:
+        return self._written
+
+    def accepts(self, array: np.ndarray) -> bool:
+        return array.size >= self._min_size and array.dtype.kind in "biufc"
+
+    def write(self, array: np.ndarray) -> dict:
+        array = np.ascontiguousarray(array)
+        if self._file is None:
+            self._file = open(self._path, 'ab')
+
+        offset = self._file.tell()
+        padding = -offset % self.ALIGNMENT
+        if padding:
+            self._file.write(b"\0" * padding)
+            offset += padding
+        self._file.write(array.tobytes())
+        self._written = True
+
+        return {ARRAY_REFERENCE_FIELD: self.file_name, "offset": offset,
+                "dtype": array.dtype.str, "shape": list(array.shape)}
+
+    def close(self):
+        if self._file is None:
+            return
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class BinaryArrayReader:
+    """
+    Resolves array references written by :class:`BinaryArrayWriter`.
+
+    Array files in `directory` are memory mapped read-only, arrays are
+    returned as views on the mapped files and are not copied into memory
+    until their data is accessed.
+    """
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._files = dict()
+        self._lock = threading.Lock()
+
+    def read(self, reference: Mapping[str, Any]) -> np.ndarray:
+        dtype = np.dtype(reference["dtype"])
+        shape = tuple(reference["shape"])
+        offset = reference["offset"]
+        end = offset + dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+
+        raw = self._get_file(reference[ARRAY_REFERENCE_FIELD], end)
+
+        return np.asarray(raw[offset:end]).view(dtype).reshape(shape)
+
+    def _get_file(self, file_name: str, min_size: int) -> np.ndarray:
+        with self._lock:
+            raw = self._files.get(file_name)
+            # Array files may have grown since they were mapped
+            if raw is None or len(raw) < min_size:
+                raw = np.memmap(os.path.join(self._directory, file_name), dtype=np.uint8, mode='r')
+                self._files[file_name] = raw
+
+            return raw
+
+
+_ARRAY_WRITER = contextvars.ContextVar("array_writer", default=None)
+_ARRAY_READER = contextvars.ContextVar("array_reader", default=None)
+
+
+@contextlib.contextmanager
+def _array_context(writer: BinaryArrayWriter = None, reader: BinaryArrayReader = None):
+    writer_token = _ARRAY_WRITER.set(writer)
+    reader_token = _ARRAY_READER.set(reader)
+    try:
+        yield
+    finally:
+        _ARRAY_WRITER.reset(writer_token)
+        _ARRAY_READER.reset(reader_token)
+
+
+def _write_array(array: np.ndarray) -> Union[dict, None]:
+    writer = _ARRAY_WRITER.get()
+    if writer is None or not writer.accepts(array):
+        return None
+
+    return writer.write(array)
+
+
+def _writes_binary_arrays() -> bool:
+    return _ARRAY_WRITER.get() is not None
+
+
+def _read_array(reference: Mapping[str, Any]) -> np.ndarray:
+    reader = _ARRAY_READER.get()
+    if reader is None:
+        raise ValidationError(f"No array reader available to resolve {reference[ARRAY_REFERENCE_FIELD]}")
+
+    return reader.read(reference)
+
+
 class URIRefField(fields.Field):
     def _serialize(self, value, attr, obj, **kwargs):
         if value is None:
@@ -140,10 +292,94 @@ def get_serializable_type_var(name: str, *constraints: type, bound: Union[None,
     # noinspection PyTypeHints
     var = TypeVar(name, *constraints, bound=bound, covariant=covariant, contravariant=contravariant)
     _JsonLdSchema.TYPE_MAPPING[var] = GenericField
+    # Schemas built before the registration don't know about the new type variable
+    _SCHEMA_CACHE.clear(reset_stats=False)
 
     return var
 
 
+SchemaCacheInfo = namedtuple('SchemaCacheInfo', ['hits', 'misses', 'size'])
+
+
+class SchemaCache:
+    """
+    Registry of marshmallow schemas for dataclass types.
+
+    Building a schema with :func:`marshmallow_dataclass.class_schema` is
+    expensive, the registry therefore builds the schema for each type only
+    once per process and reuses the instance for subsequent calls.
+    """
+    def __init__(self):
+        self._schemas = dict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_schema(self, cls: type) -> marshmallow.Schema:
+        """
+        Obtain the schema for a dataclass type.
+
+        Parameters
+        ----------
+        cls : type
+            The dataclass type for which the schema is requested.
+
+        Returns
+        -------
+        marshmallow.Schema
+            A schema instance for `cls`.
+        """
+        try:
+            schema = self._schemas[cls]
+            self._hits += 1
+
+            return schema
+        except KeyError:
+            pass
+
+        with self._lock:
+            if cls not in self._schemas:
+                self._schemas[cls] = marshmallow_dataclass.class_schema(cls, base_schema=_JsonLdSchema)()
+                self._misses += 1
+            else:
+                self._hits += 1
+
+            return self._schemas[cls]
+
+    def info(self) -> SchemaCacheInfo:
+        return SchemaCacheInfo(self._hits, self._misses, len(self._schemas))
+
+    def clear(self, reset_stats: bool = True) -> None:
+        with self._lock:
+            self._schemas.clear()
+            if reset_stats:
+                self._hits = 0
+                self._misses = 0
+
+
+_SCHEMA_CACHE = SchemaCache()
+
+
+def schema_cache_info() -> SchemaCacheInfo:
+    """
+    Statistics of the schema registry used by :func:`marshal` and :func:`unmarshal`.
+
+    Returns
+    -------
+    SchemaCacheInfo
+        Named tuple with the number of cache `hits`, `misses` and the current
+        `size` of the registry.
+    """
+    return _SCHEMA_CACHE.info()
+
+
+def clear_schema_cache() -> None:
+    """
+    Remove all schemas from the schema registry and reset its statistics.
+    """
+    _SCHEMA_CACHE.clear()
+
+
 def serializer(obj: Any) -> Union[dict, tuple, str, int, float, complex, bool]:
     """
     Convert an object to a type supported by default by :func:`json.dumps`.
@@ -182,7 +418,8 @@ def serializer(obj: Any) -> Union[dict, tuple, str, int, float, complex, bool]:
     return {k: getattr(obj, k) for k in attrs}
 
 
-def marshal(obj: Any, *, indent: int = 2, cls: type = None, default: Callable[[Any], Any] = serializer) -> str:
+def marshal(obj: Any, *, indent: int = 2, cls: type = None, default: Callable[[Any], Any] = serializer,
+            array_writer: BinaryArrayWriter = None) -> str:
     """Serialize a Python object to JSON.
 
     Serialization can be performed either based on the type of the object, in
@@ -203,13 +440,17 @@ def marshal(obj: Any, *, indent: int = 2, cls: type = None, default: Callable[[A
         A function that converts any object to a Python type that is supported
         by :mod:`json` by default, i.e. one of primitive type, list, dict.
         If `cls` is not 'None', `default` is ignored.
+    array_writer : BinaryArrayWriter, optional
+        If provided, numpy arrays in `obj` are written to the binary file of
+        the writer and only referenced in the JSON output.
 
     Returns
     -------
     str
         The serialized JSON object.
     """
-    return _marshal(obj, indent=indent, cls=cls, default=default)
+    with _array_context(writer=array_writer):
+        return _marshal(obj, indent=indent, cls=cls, default=default)
 
 
 def _marshal(obj: Any, *, indent: int = 2, cls: type = None, default: Callable[[Any], Any] = serializer,
@@ -218,7 +459,7 @@ def _marshal(obj: Any, *, indent: int = 2, cls: type = None, default: Callable[[
         json_string = json.dumps(obj, default=default if default else serializer, indent=indent)
     else:
         is_collection = isinstance(obj, collections.abc.Iterable)
-        schema = marshmallow_dataclass.class_schema(cls, base_schema=_JsonLdSchema)()
+        schema = _SCHEMA_CACHE.get_schema(cls)
 
         json_string = schema.dumps(obj, indent=indent, many=is_collection)
 
@@ -226,7 +467,7 @@ def _marshal(obj: Any, *, indent: int = 2, cls: type = None, default: Callable[[
     return json_string if serialize else json.loads(json_string)
 
 
-def unmarshal(json_string: str, *, cls: type = None) -> Any:
+def unmarshal(json_string: str, *, cls: type = None, array_reader: BinaryArrayReader = None) -> Any:
     """Deserialize a JSON to a Python object.
 
     Deserialization can be performed either based on the expected output type,
@@ -241,6 +482,9 @@ def unmarshal(json_string: str, *, cls: type = None) -> Any:
         should be a dataclass (see :mod:`dataclasses).
         If the input is a collection, the expected type of its elements should
         be provided.
+    array_reader : BinaryArrayReader, optional
+        Used to resolve references to arrays written with a
+        :class:`BinaryArrayWriter`.
 
     Returns
     -------
@@ -249,7 +493,8 @@ def unmarshal(json_string: str, *, cls: type = None) -> Any:
         an instance or collection of this type is returned, otherwise a named
         tuple.
     """
-    return _unmarshal(json_string, cls=cls)
+    with _array_context(reader=array_reader):
+        return _unmarshal(json_string, cls=cls)
 
 
 def _unmarshal(json_obj: str, *, cls: type = None, serialized: bool = True) -> Any:
@@ -261,7 +506,7 @@ def _unmarshal(json_obj: str, *, cls: type = None, serialized: bool = True) -> A
             return mapping
 
         is_collection = not isinstance(mapping, dict)
-        schema = marshmallow_dataclass.class_schema(cls, base_schema=_JsonLdSchema)()
+        schema = _SCHEMA_CACHE.get_schema(cls)
 
         return schema.load(mapping, unknown=marshmallow.EXCLUDE, many=is_collection)
     elif not serialized:
@@ -275,6 +520,101 @@ def _unmarshal(json_obj: str, *, cls: type = None, serialized: bool = True) -> A
         return json.loads(json_obj, object_hook=object_hook)
 
 
+def unmarshal_stream(stream: IO[str], *, cls: type = None, chunk_size: int = 1 << 16,
+                     array_reader: BinaryArrayReader = None) -> Iterator[Any]:
+    """Incrementally deserialize a JSON array from a stream.
+
+    The array is parsed one element at a time, such that memory usage is
+    bounded by the largest element rather than the size of the whole array.
+
+    Parameters
+    ----------
+    stream : IO[str]
+        A text stream containing a JSON array.
+    cls : type, optional
+        The type of the elements in the array, see :func:`unmarshal`.
+    chunk_size : int, optional, default: 64k
+        Number of characters read from the stream at once.
+    array_reader : BinaryArrayReader, optional
+        See :func:`unmarshal`.
+
+    Returns
+    -------
+    Iterator[Any]
+        The deserialized elements of the array.
+    """
+    for element in _iter_json_array(stream, chunk_size):
+        with _array_context(reader=array_reader):
+            unmarshalled = _unmarshal(element, cls=cls, serialized=False)
+        yield unmarshalled
+
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def _iter_json_array(stream: IO[str], chunk_size: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill(size):
+        nonlocal buffer, pos, eof
+        chunk = stream.read(size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+        return not eof
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or not fill(chunk_size):
+                return
+
+    skip_whitespace()
+    if pos == len(buffer):
+        return
+    if buffer[pos] != "[":
+        raise ValueError(f"Expected a JSON array, found {buffer[pos:pos + 20]!r}")
+    pos += 1
+
+    skip_whitespace()
+    if buffer[pos:pos + 1] == "]":
+        return
+
+    while True:
+        read_size = chunk_size
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+                # A number at the end of the buffer may be truncated
+                if eof or end < len(buffer) and buffer[end] in _DELIMITERS:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill(read_size)
+            # Grow reads for large elements to avoid re-parsing them too often
+            read_size *= 2
+
+        pos = end
+        yield element
+
+        skip_whitespace()
+        separator = buffer[pos:pos + 1]
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, found {separator!r}")
+        skip_whitespace()
+
+
 def object_hook(obj_dict):
     valid_attributes = {key: val for key, val in obj_dict.items() if key.isidentifier() and not key.startswith("_")}
 
@@ -8,6 +8,7 @@ from emissor.annotation.brain.util import EmissorBrain
 from emissor.persistence.persistence import ScenarioController
 from emissor.processing.api import SignalProcessor
 from emissor.representation.annotation import AnnotationType, Entity
+from emissor.representation.container import Index
 from emissor.representation.scenario import Modality, TextSignal, Annotation, ImageSignal, Signal
 
 logger = logging.getLogger(__name__)
@@ -25,6 +26,10 @@ class MeldEntityLinkingProcessor(SignalProcessor):
     def modalities(self) -> Tuple[Modality]:
         return (Modality.TEXT, Modality.IMAGE)
 
+    @property
+    def dependencies(self) -> Tuple[str]:
+        return ("MeldNERProcessor", "MeldFaceProcessor")
+
     def process_signal(self, scenario: ScenarioController, signal: Signal):
         ememory_path = os.path.join(self._base_path, scenario.id, 'rdf', 'episodic_memory')
         if ememory_path in self._brain_cache:
@@ -50,20 +55,13 @@ class MeldEntityLinkingProcessor(SignalProcessor):
                             and annotation.value.value.lower() == "person")]
 
         for mention, annotation in ner_mentions:
-            token = None
-            try:
-                container = mention.segment[0].container_id
-                annotation = [annotation
-                              for mention in signal.mentions
-                              for annotation in mention.annotations
-                              if hasattr(annotation.value, "id") and annotation.value.id == container]
-                assert len(mention.segment) == 1 and len(annotation) == 1
-
-                token = annotation[0].value
-            except:
-                pass
-
-            uri = self.resolve_name(token.value if token else None, brain)
+            # NER mentions refer to the character offsets of the entity in the signal
+            segment = mention.segment[0] if len(mention.segment) == 1 else None
+            name = None
+            if isinstance(segment, Index) and segment.container_id == signal.id:
+                name = signal.text[segment.start:segment.stop]
+
+            uri = self.resolve_name(name, brain)
             link_annotation = Annotation(AnnotationType.LINK.name, Entity(uri), self.name, int(time.time()))
             mention.annotations.append(link_annotation)
 
@@ -1,33 +1,36 @@
+import asyncio
 import jsonpickle
 import logging
 import numpy as np
 import os
-import requests
 import time
 import uuid
-from sklearn.cluster import AgglomerativeClustering
-from tqdm import tqdm
 from typing import Iterable, Tuple, Mapping
 
 from emissor.persistence.persistence import ScenarioController
-from emissor.processing.api import SignalProcessor
+from emissor.processing.api import AsyncSignalProcessor
 from emissor.representation.annotation import AnnotationType
 from emissor.representation.container import MultiIndex
 from emissor.representation.entity import Person
+from emissor.representation.ids import new_id
 from emissor.representation.scenario import Modality, ImageSignal, Annotation, Mention, Signal
 from example_processing.meld.emissor.plugins.meld.docker import DockerInfra
+from example_processing.meld.emissor.plugins.meld.face_clustering import IdentityIndex
 from example_processing.meld.emissor.plugins.meld.friends import FRIENDS
 
 
-class MeldFaceProcessor(SignalProcessor):
+class MeldFaceProcessor(AsyncSignalProcessor):
     BYTES_AT_LEAST = 256
 
     def __init__(self, base_path: str, port_docker_face_analysis: int, run_on_gpu: int,
-                 face_cos_distance_threshold: float):
+                 face_cos_distance_threshold: float, link_scenarios: bool = False):
         self._base_path = base_path
         self.face_infra = DockerInfra('face-analysis-cuda' if run_on_gpu else 'face-analysis',
-                                      port_docker_face_analysis, 30000, run_on_gpu, 30)
+                                      port_docker_face_analysis, 30000, run_on_gpu)
         self.face_cos_distance_threshold = face_cos_distance_threshold
+        # Unknown faces are linked across scenarios processed in the same process if link_scenarios is set
+        self.link_scenarios = link_scenarios
+        self.identities = IdentityIndex(FRIENDS, face_cos_distance_threshold)
 
     @property
     def parallel(self) -> bool:
@@ -43,16 +46,24 @@ class MeldFaceProcessor(SignalProcessor):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.face_infra.__exit__(exc_type, exc_val, exc_tb)
 
-    def process_signal(self, scenario: ScenarioController, signal: ImageSignal):
+    @property
+    def concurrency(self) -> int:
+        return 16
+
+    @property
+    def retries(self) -> int:
+        return 2
+
+    async def process_signal_async(self, scenario: ScenarioController, signal: ImageSignal):
         raise NotImplementedError("Face detection only supported for all scenarios")
 
-    def process_signals(self, scenario: ScenarioController, signals: Mapping[Modality, Iterable[Signal]]):
+    async def process_signals_async(self, scenario: ScenarioController, signals: Mapping[Modality, Iterable[Signal]]):
         logging.debug("Face features extraction will begin ...")
         image_signals = tuple(signals[Modality.IMAGE])
-        self.detect_faces_for_scenario(scenario.id, image_signals)
+        await self.detect_faces_for_scenario(scenario.id, image_signals)
         logging.info("Face feature extraction complete!")
 
-    def detect_faces_for_scenario(self, scenario_id: str, signals: Iterable[Signal]):
+    async def detect_faces_for_scenario(self, scenario_id: str, signals: Iterable[Signal]):
         # TODO do we want to store these?
         # save_path_face_features = os.path.join(self.processing_dir, "face-features", f"{self.scenario_id}.pkl")
         #
@@ -60,14 +71,22 @@ class MeldFaceProcessor(SignalProcessor):
         #         os.path.getsize(save_path_face_features) > self.BYTES_AT_LEAST:
         #     logging.info("%s seems to be already done. skipping ...", save_path_face_features)
         #     return
+        signals = [signal for signal in signals if len(signal.files) == 1]
+        results = await asyncio.gather(*(self.run_with_retries(self.image2face_async, scenario_id, signal.files[0])
+                                         for signal in signals),
+                                       return_exceptions=True)
+
         fa_results_all = []
-        for signal in tqdm(signals):
-            try:
-                assert len(signal.files) == 1
-                result = self.image2face(scenario_id, signal.files[0])
+        for signal, result in zip(signals, results):
+            if isinstance(result, Exception):
+                logging.error("Failed to process %s for scenario %s", signal.files[0], scenario_id, exc_info=result)
+            else:
                 fa_results_all.append((signal, result))
-            except Exception:
-                logging.exception("Failed to process %s for scenario %s", signal.files[0], scenario_id)
+
+        # Replace annotations from previous runs
+        for signal, _ in fa_results_all:
+            signal.mentions = [mention for mention in signal.mentions
+                               if not any(annotation.source == self.name for annotation in mention.annotations)]
 
         detection_results = self.face_detection(fa_results_all)
         for signal, face_result, face_id in detection_results:
@@ -83,30 +102,14 @@ class MeldFaceProcessor(SignalProcessor):
     def get_unique_faces(self, embeddings):
         logging.debug(f"finding unique faces ...")
 
-        friends, representations = zip(*FRIENDS.items())
-
-        if len(embeddings) == 0:
-            return None
-        # elif len(embeddings) == 1:
-        #     labels_clustered = np.array([0])
-        else:
-            ac = AgglomerativeClustering(n_clusters=None,
-                                         affinity='cosine',
-                                         linkage='average',
-                                         distance_threshold=self.face_cos_distance_threshold)
-
-            clustering = ac.fit(representations + tuple(embeddings))
-            friend_labels = clustering.labels_[:len(friends)]
-            labels_clustered = clustering.labels_[len(friends):]
-
-        friend_labels = {label: friend for friend, label in zip(friends, friend_labels)}
-        labels_unique = np.unique(labels_clustered)
-        label2name = {label: friend_labels[label] if label in friend_labels else str(uuid.uuid4())
-                      for label in labels_unique}
+        identities = self.identities if self.link_scenarios else self.identities.copy()
 
-        face_ids = [label2name[label] for label in labels_clustered]
+        return identities.assign(embeddings)
 
-        return face_ids[len(friends):]
+    async def image2face_async(self, scenario_id, image_path):
+        # Requests are bounded by the timeout of the client, the processor timeout would not cancel them
+        async with self.backend("face-analysis"):
+            return await asyncio.get_running_loop().run_in_executor(None, self.image2face, scenario_id, image_path)
 
     def image2face(self, scenario_id, image_path):
         logging.info("Processing image %s", image_path)
@@ -115,13 +118,9 @@ class MeldFaceProcessor(SignalProcessor):
         with open(path, 'rb') as stream:
             data = stream.read()
 
-        data = jsonpickle.encode({'image': data})
-        response = requests.post(
-            f"{'http://127.0.0.1'}:{self.face_infra.host_port}/", json=data)
-        if response.ok:
-            logging.info("%s received", response)
-        else:
-            raise ValueError(f"{response} received with reason {response.reason}")
+        # The face-analysis service expects jsonpickle encoded JSON
+        response = self.face_infra.client.post_json("/", jsonpickle.encode({'image': data}))
+        logging.info("%s received", response.status)
 
         response = jsonpickle.decode(response.text)
 
@@ -136,8 +135,8 @@ class MeldFaceProcessor(SignalProcessor):
 
         # segment = signal.ruler.get_area_bounding_box(*bbox)
         segment = MultiIndex(signal.ruler.container_id, bbox)
-        annotation_person = Annotation(AnnotationType.PERSON.name, Person(str(uuid.uuid4()), name, age, gender), MeldFaceProcessor.name, int(time.time()))
-        annotation_representation = Annotation(AnnotationType.REPRESENTATION.name, representation.tolist(), MeldFaceProcessor.name, int(time.time()))
-        mention = Mention(str(uuid.uuid4()), [segment], [annotation_person, annotation_representation])
+        annotation_person = Annotation(AnnotationType.PERSON.name, Person(str(uuid.uuid4()), name, age, gender), self.name, int(time.time()))
+        annotation_representation = Annotation(AnnotationType.REPRESENTATION.name, np.asarray(representation), self.name, int(time.time()))
+        mention = Mention(new_id(), [segment], [annotation_person, annotation_representation])
 
         signal.mentions.append(mention)
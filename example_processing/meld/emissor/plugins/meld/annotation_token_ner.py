@@ -1,67 +1,70 @@
 import logging
 import spacy
 import time
-import uuid
-from tqdm import tqdm
-from typing import Tuple, Mapping, Iterable
+from typing import Tuple, Sequence
 
 from emissor.persistence.persistence import ScenarioController
 from emissor.processing.api import SignalProcessor
 from emissor.representation.annotation import AnnotationType, Token, NER
-from emissor.representation.container import Index
-from emissor.representation.scenario import Modality, Mention, Annotation, Signal
+from emissor.representation.scenario import Modality, Signal, ColumnarMentions
 
 logger = logging.getLogger(__name__)
 
 
 class MeldNERProcessor(SignalProcessor):
-    def __enter__(self):
+    def __init__(self, batch_size: int = 256, num_processes: int = 1):
+        self._batch_size = batch_size
+        self._num_processes = num_processes
+        self._nlp = None
+
+    def setup_worker(self):
         self._nlp = spacy.load('en_core_web_sm')
 
     @property
-    def parallel(self) -> bool:
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def batch_across_scenarios(self) -> bool:
+        return True
+
+    @property
+    def incremental(self) -> bool:
         return True
 
     @property
     def modalities(self) -> Tuple[Modality]:
         return (Modality.TEXT,)
 
-    def process_signals(self, scenario: ScenarioController, signals: Mapping[Modality, Iterable[Signal]]):
-        logger.info("Add tokenization and NER annotations to %s", scenario.id)
-        text_signals = tuple(signals[Modality.TEXT])
-        with tqdm(text_signals) as progress:
-            cnt = 0
-            for signal in progress:
-                # TODO: check if annotations already exist
-                cnt += self.add_ner_annotations(signal)
-                progress.set_postfix({'NER count': cnt})
+    def process_batch(self, scenarios: Sequence[ScenarioController], signals: Sequence[Signal]):
+        logger.info("Add tokenization and NER annotations to %s signals", len(signals))
+        docs = self._nlp.pipe((signal.text for signal in signals), batch_size=self._batch_size,
+                              n_process=self._num_processes)
+        cnt = sum(self.add_ner_annotations(signal, doc) for signal, doc in zip(signals, docs))
+        logger.debug("Added %s NER annotations", cnt)
 
     def process_signal(self, scenario: ScenarioController, signal: Signal):
         if not signal.modality == Modality.TEXT:
             return
 
-        self.add_ner_annotations(signal)
-
-    def add_ner_annotations(self, signal: Signal):
-        utterance = ''.join(signal.seq)
-
-        doc = self._nlp(utterance)
-
-        offsets, tokens = zip(*[(Index(signal.id, token.idx, token.idx+len(token)), Token.for_string(token.text))
-                                for token in doc])
+        self.add_ner_annotations(signal, self._nlp(signal.text))
 
-        ents = [NER.for_string(ent.label_) for ent in doc.ents]
-        entity_text = [ent.text for ent in doc.ents]
-        segments = [token.ruler for token in tokens if token.value in entity_text]
+    def add_ner_annotations(self, signal: Signal, doc):
+        # Replace annotations from previous runs
+        mentions = signal.mentions if isinstance(signal.mentions, ColumnarMentions) \
+            else ColumnarMentions(signal.mentions)
+        mentions = mentions.filter(source=self.name, invert=True)
 
-        annotations = [Annotation(AnnotationType.TOKEN.name.lower(), token, self.name, int(time.time()))
-                       for token in tokens]
-        ner_annotations = [Annotation(AnnotationType.NER.name.lower(), ent, self.name, int(time.time()))
-                           for ent in ents]
+        timestamp = int(time.time())
+        tokens = Token.for_strings(token.text for token in doc)
+        token_offsets = [(token.idx, token.idx + len(token)) for token in doc]
+        ents = NER.for_strings(ent.label_ for ent in doc.ents)
+        entity_offsets = [(ent.start_char, ent.end_char) for ent in doc.ents]
 
-        signal.mentions.extend([Mention(str(uuid.uuid4()), [offset], [annotation])
-                                for offset, annotation in zip(offsets, annotations)])
-        signal.mentions.extend([Mention(str(uuid.uuid4()), [segment], [annotation])
-                                for segment, annotation in zip(segments, ner_annotations)])
+        mentions.extend_offsets(signal.id, token_offsets, AnnotationType.TOKEN.name.lower(), tokens, self.name,
+                                timestamp)
+        mentions.extend_offsets(signal.id, entity_offsets, AnnotationType.NER.name.lower(), ents, self.name,
+                                timestamp)
+        signal.mentions = mentions
 
-        return len(ner_annotations)
+        return len(ents)
@@ -1,47 +1,55 @@
 import logging
-import time
 from python_on_whales import docker
+from python_on_whales.exceptions import NoSuchContainer
+
+from emissor.processing.infra import ServiceInfra, Replica, HttpProbe, ReadinessProbe, wait_until
 
 logger = logging.getLogger(__name__)
 
 
-class DockerInfra:
-    def __init__(self, image, port, host_port, run_on_gpu = False, boot_time=10):
+class DockerInfra(ServiceInfra):
+    def __init__(self, image, port, host_port, run_on_gpu=False, boot_timeout=120.0, probe: ReadinessProbe = None,
+                 replicas=1, keep_warm=False):
+        # Docker accepts connections on published ports before the service is up, therefore probe with HTTP
+        super().__init__(host_port, replicas=replicas, probe=probe if probe else HttpProbe("/"),
+                         boot_timeout=boot_timeout, keep_warm=keep_warm)
         self.image = image
         self.port = port
-        self.host_port = host_port
         self.run_on_gpu = run_on_gpu
-        self.boot_time = boot_time
-
-        self.container = None
-
-    def __enter__(self):
-        self.start_container()
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.stop_container()
-
-    def start_container(self):
-        if self.container:
-            raise EnvironmentError("Container already started")
-
-        logger.info("Creating container from %s (boot time: %s)", self.image, self.boot_time)
-
-        self.container = docker.run(image=self.image, detach=True, remove=True, publish=[(self.host_port, self.port)])
-        self.wait_for_container_running(True)
-
-        time.sleep(self.boot_time)
-        logger.debug("Container for %s started...", self.image)
-
-    def stop_container(self):
-        logger.info("Stopping container %s of %s ...", self.container, self.image)
-        self.container.stop()
-        self.container = None
-        logger.info("Stopped container %s of %s ...", self.container, self.image)
 
-    def wait_for_container_running(self, expect_running):
-        container_state = self.container.state
-        while not (expect_running and container_state.running or not expect_running and container_state.dead):
-            logger.debug("Waiting for container state %s for %s (current state %s)", "running" if expect_running else "dead", self.image, container_state)
-            time.sleep(1)
-            container_state = self.container.state
\ No newline at end of file
+    def _start_replica(self, host_port: int) -> Replica:
+        logger.info("Creating container from %s on port %s", self.image, host_port)
+
+        # Containers are removed when stopped instead of on exit, such that boot failures can be reported with logs
+        container = docker.run(image=self.image, detach=True, publish=[(host_port, self.port)])
+        # A container that exits right away is reported with its logs by the readiness check
+        wait_until(lambda: container.state.status != "created", self.boot_timeout,
+                   description=f"container of {self.image}")
+
+        return Replica(host_port, container, lambda: self._logs(container))
+
+    def _stop_replica(self, replica: Replica):
+        logger.info("Stopping container %s of %s ...", replica.handle, self.image)
+        try:
+            replica.handle.stop()
+            replica.handle.remove()
+        except NoSuchContainer:
+            logger.debug("Container %s of %s was already removed", replica.handle, self.image)
+            return
+        logger.info("Stopped container %s of %s ...", replica.handle, self.image)
+
+    def _is_alive(self, replica: Replica) -> bool:
+        try:
+            return replica.handle.state.status not in ("exited", "dead")
+        except NoSuchContainer:
+            return False
+
+    @staticmethod
+    def _logs(container) -> str:
+        try:
+            return container.logs()
+        except NoSuchContainer:
+            return ""
+
+    def __str__(self):
+        return self.image
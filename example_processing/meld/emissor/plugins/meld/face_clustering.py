@@ -0,0 +1,167 @@
+import logging
+import uuid
+from typing import Mapping, List, Tuple, Iterable
+
+import numpy as np
+from sklearn.cluster import AgglomerativeClustering
+
+logger = logging.getLogger(__name__)
+
+
+class IdentityIndex:
+    """
+    Assigns face embeddings to identities.
+
+    Embeddings are first matched to the nearest known identity by cosine
+    distance. Only the remaining embeddings are clustered, in chunks of at most
+    `cluster_size` embeddings, and each cluster is added as new identity. As
+    identities are added to the index, subsequent calls to :meth:`assign`
+    link faces to the identities found before.
+    """
+    def __init__(self, identities: Mapping[str, np.ndarray] = None, distance_threshold: float = 0.8,
+                 cluster_size: int = 1000, chunk_size: int = 4096):
+        """
+        Parameters
+        ----------
+        identities : Mapping[str, np.ndarray], optional
+            Reference embeddings of known identities by name. The embeddings
+            of known identities are not updated with matched faces.
+        distance_threshold : float, optional, default: 0.8
+            The maximum cosine distance of a face to an identity, also the
+            distance threshold of the clustering.
+        cluster_size : int, optional, default: 1000
+            The maximum number of unmatched embeddings that are clustered at once.
+        chunk_size : int, optional, default: 4096
+            The number of embeddings that are matched against the identities
+            at once, bounds the size of the similarity matrix.
+        """
+        self.distance_threshold = distance_threshold
+        self.cluster_size = cluster_size
+        self.chunk_size = chunk_size
+
+        self._names: List[str] = []
+        self._centroids = None
+        self._sums = None
+        self._counts = np.zeros(0, dtype=int)
+
+        if identities:
+            names, embeddings = zip(*identities.items())
+            self._add(names, _normalize(np.stack(embeddings)), np.zeros(len(names), dtype=int))
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def copy(self) -> "IdentityIndex":
+        index = IdentityIndex(distance_threshold=self.distance_threshold, cluster_size=self.cluster_size,
+                              chunk_size=self.chunk_size)
+        if self._names:
+            index._add(self._names, self._sums.copy(), self._counts.copy())
+
+        return index
+
+    def match(self, embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the nearest identity for normalized embeddings.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The indices of the nearest identities and the cosine distances to them.
+        """
+        indices = np.zeros(len(embeddings), dtype=int)
+        distances = np.full(len(embeddings), np.inf)
+        if not self._names:
+            return indices, distances
+
+        for start in range(0, len(embeddings), self.chunk_size):
+            similarity = embeddings[start:start + self.chunk_size] @ self._centroids.T
+            nearest = np.argmax(similarity, axis=1)
+            indices[start:start + self.chunk_size] = nearest
+            distances[start:start + self.chunk_size] = 1 - similarity[np.arange(len(nearest)), nearest]
+
+        return indices, distances
+
+    def assign(self, embeddings: Iterable[np.ndarray]) -> List[str]:
+        """
+        Assign embeddings to identities, adding new identities for faces that
+        do not match any known identity.
+
+        Returns
+        -------
+        List[str]
+            The name of the identity for each embedding.
+        """
+        embeddings = list(embeddings)
+        if not embeddings:
+            return []
+
+        embeddings = _normalize(np.asarray(embeddings, dtype=np.float32))
+
+        labels = np.empty(len(embeddings), dtype=int)
+        indices, distances = self.match(embeddings)
+        matched = distances <= self.distance_threshold
+        labels[matched] = indices[matched]
+
+        residual = np.flatnonzero(~matched)
+        logger.debug("Matched %s of %s faces to known identities", np.count_nonzero(matched), len(embeddings))
+        for start in range(0, len(residual), self.cluster_size):
+            chunk = residual[start:start + self.cluster_size]
+            if start > 0:
+                # Match against the identities added for the previous chunks
+                chunk_indices, chunk_distances = self.match(embeddings[chunk])
+                chunk_matched = chunk_distances <= self.distance_threshold
+                labels[chunk[chunk_matched]] = chunk_indices[chunk_matched]
+                matched[chunk[chunk_matched]] = True
+                chunk = chunk[~chunk_matched]
+
+            labels[chunk] = self._add_clusters(embeddings[chunk])
+
+        self._update(labels[matched], embeddings[matched])
+
+        return [self._names[label] for label in labels]
+
+    def _add_clusters(self, embeddings: np.ndarray) -> np.ndarray:
+        if len(embeddings) == 0:
+            return np.zeros(0, dtype=int)
+        elif len(embeddings) == 1:
+            clusters = np.zeros(1, dtype=int)
+        else:
+            clustering = AgglomerativeClustering(n_clusters=None,
+                                                 affinity='cosine',
+                                                 linkage='average',
+                                                 distance_threshold=self.distance_threshold)
+            clusters = clustering.fit(embeddings).labels_
+
+        n_clusters = clusters.max() + 1
+        sums = np.zeros((n_clusters, embeddings.shape[1]), dtype=embeddings.dtype)
+        np.add.at(sums, clusters, embeddings)
+        offset = len(self._names)
+        self._add([str(uuid.uuid4()) for _ in range(n_clusters)], sums, np.bincount(clusters, minlength=n_clusters))
+
+        return clusters + offset
+
+    def _add(self, names: Iterable[str], sums: np.ndarray, counts: np.ndarray):
+        self._names.extend(names)
+        self._sums = sums if self._sums is None else np.concatenate([self._sums, sums])
+        self._counts = np.concatenate([self._counts, counts])
+        self._centroids = _normalize(self._sums)
+
+    def _update(self, labels: np.ndarray, embeddings: np.ndarray):
+        # Known identities keep their reference embedding
+        learned = self._counts[labels] > 0
+        if not np.any(learned):
+            return
+
+        np.add.at(self._sums, labels[learned], embeddings[learned])
+        np.add.at(self._counts, labels[learned], 1)
+        self._centroids = _normalize(self._sums)
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    return embeddings / np.where(norms > 0, norms, 1)
@@ -33,6 +33,8 @@ class MeldExamplePlugin(ProcessorPlugin):
         # Face detection
         parser.add_argument('--port-docker-face-analysis', type=int,
                             default=10002)
+        parser.add_argument('--link-faces', action='store_true',
+                            help="Link unknown faces across scenarios.")
 
         args, _ = parser.parse_known_args()
         logger.info("Initialize %s plugin with %s", self.name, args)
@@ -50,5 +52,6 @@ class MeldExamplePlugin(ProcessorPlugin):
 
     def create_processors(self) -> Iterable[SignalProcessor]:
         return [MeldNERProcessor(),
-                MeldFaceProcessor(self.scenarios, self.port_docker_face_analysis, self.run_on_gpu, 0.8),
+                MeldFaceProcessor(self.scenarios, self.port_docker_face_analysis, self.run_on_gpu, 0.8,
+                                  self.link_faces),
                 MeldEntityLinkingProcessor(self.scenarios)]
@@ -5,13 +5,13 @@ import jsonpickle
 import logging
 import os
 import random
-import requests
 import shutil
 from joblib import Parallel, delayed
 from pathlib import Path
 from tqdm import tqdm
 
 from emissor.processing.api import DataPreprocessor
+from emissor.processing.client import get_client
 from emissor.representation.scenario import Modality
 from example_processing.meld.emissor.plugins.meld.docker import DockerInfra
 
@@ -58,9 +58,8 @@ class Video2Frames:
 
         data = {'fps_max': self.fps_max, 'width_max': self.width_max,
                 'height_max': self.height_max, 'video': binary_video}
-        data = jsonpickle.encode(data)
-        response = requests.post(
-            f"{'http://127.0.0.1'}:{self.video2frames_port}/", json=data)
+        # The video2frames service expects jsonpickle encoded JSON
+        response = get_client("127.0.0.1", self.video2frames_port).post_json("/", jsonpickle.encode(data))
         response = jsonpickle.decode(response.text)
         frames = response['frames']
         metadata = response['metadata']
@@ -84,7 +83,7 @@ class VideoProcessing:
         self.dataset = dataset
         self.scenarios = scenarios
 
-        self.video_infra = DockerInfra('video2frames', port_docker_video2frames, 20000, run_on_gpu, 5)
+        self.video_infra = DockerInfra('video2frames', port_docker_video2frames, 20000, run_on_gpu)
         self.num_jobs = num_jobs
         self.width_max = width_max
         self.height_max = height_max
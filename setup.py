@@ -35,6 +35,7 @@ setuptools.setup(
                       'typeguard~=2.13'],
     python_requires='>=3.7',
     extras_require={
-        "processing": ["joblib~=1.0", "tqdm~=4.60", "scikit-learn~=0.24"]
+        "processing": ["joblib~=1.3", "tqdm~=4.60", "scikit-learn~=0.24"],
+        "media": ["pillow>=8.0"]
     }
 )
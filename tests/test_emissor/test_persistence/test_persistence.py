@@ -0,0 +1,370 @@
+import os
+import shutil
+import tempfile
+from glob import glob
+from unittest import TestCase, mock
+
+import numpy as np
+
+from emissor.persistence import ScenarioStorage
+from emissor.representation.annotation import Token
+from emissor.representation.container import Index
+from emissor.persistence.persistence import JSONL_SIGNAL_PATHS, JsonLinesSignalFile, DEFAULT_SIGNAL_PATHS
+from emissor.representation.scenario import Modality, TextSignal, ScenarioContext, Mention, ImageSignal, Annotation, \
+    ColumnarMentions
+from emissor.representation.util import unmarshal
+
+
+class TestScenarioStorage(TestCase):
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        self.storage = ScenarioStorage(self.base_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    def test_save_and_load_scenario(self):
+        scenario = self.storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"))
+        signals = [TextSignal.for_scenario("scenario", i, i + 1, "file.txt", f"text {i}") for i in range(3)]
+        for signal in signals:
+            scenario.append_signal(signal)
+        scenario.append_signal(ImageSignal.for_scenario("scenario", 0, 1, "file.jpg", (0, 0, 2, 2)))
+        self.storage.save_scenario(scenario)
+
+        loaded = ScenarioStorage(self.base_path).load_scenario("scenario")
+
+        self.assertEqual(signals, loaded.get_signals(Modality.TEXT))
+        self.assertEqual(1, len(loaded.get_signals(Modality.IMAGE)))
+        self.assertEqual([], loaded.get_signals(Modality.AUDIO))
+
+    def test_iter_modality(self):
+        scenario = self.storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"))
+        signals = [TextSignal.for_scenario("scenario", i, i + 1, "file.txt", f"text {i}") for i in range(3)]
+        for signal in signals:
+            scenario.append_signal(signal)
+        self.storage.save_scenario(scenario)
+
+        self.assertEqual(signals, list(self.storage.iter_modality("scenario", Modality.TEXT)))
+        self.assertIsNone(self.storage.iter_modality("scenario", Modality.AUDIO))
+
+    def test_metadata_cache(self):
+        self.storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"))
+        storage = ScenarioStorage(self.base_path)
+
+        with mock.patch("emissor.persistence.persistence.unmarshal", wraps=unmarshal) as parse:
+            scenario = storage.load_scenario("scenario")
+            scenario.scenario.signals[Modality.TEXT.name.lower()] = "./other_text.json"
+            self.assertEqual(dict(DEFAULT_SIGNAL_PATHS), storage.load_scenario("scenario").scenario.signals)
+        self.assertEqual(1, parse.call_count)
+
+        ScenarioStorage(self.base_path).save_scenario(scenario)
+
+        reloaded = storage.load_scenario("scenario")
+        self.assertIsNot(scenario.scenario, reloaded.scenario)
+        self.assertEqual("./other_text.json", reloaded.scenario.signals[Modality.TEXT.name.lower()])
+
+    def test_save_only_modified_modalities(self):
+        scenario = self.storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"))
+        scenario.append_signal(TextSignal.for_scenario("scenario", 0, 1, "file.txt", "text"))
+        scenario.append_signal(ImageSignal.for_scenario("scenario", 0, 1, "file.jpg", (0, 0, 2, 2)))
+        self.storage.save_scenario(scenario)
+
+        image_path = os.path.join(self.base_path, "scenario", "image.json")
+        text_path = os.path.join(self.base_path, "scenario", "text.json")
+        os.utime(image_path, ns=(0, 0))
+        os.utime(text_path, ns=(0, 0))
+
+        loaded = self.storage.load_scenario("scenario")
+        loaded.load_signals((Modality.TEXT, Modality.IMAGE))
+        loaded.add_mention(loaded.get_signals(Modality.TEXT)[0], Mention("mention", [], []))
+        self.storage.save_scenario(loaded)
+
+        self.assertEqual(0, os.stat(image_path).st_mtime_ns)
+        self.assertNotEqual(0, os.stat(text_path).st_mtime_ns)
+        self.assertFalse(loaded.is_dirty(Modality.TEXT))
+        self.assertEqual(1, len(ScenarioStorage(self.base_path).load_modality("scenario", Modality.TEXT)[0].mentions))
+
+    def test_save_is_atomic(self):
+        scenario = self.storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"))
+        scenario.append_signal(TextSignal.for_scenario("scenario", 0, 1, "file.txt", "text"))
+        self.storage.save_scenario(scenario)
+
+        self.assertListEqual(["scenario.json", "text.json"],
+                             sorted(os.listdir(os.path.join(self.base_path, "scenario"))))
+
+
+class TestScenarioController(TestCase):
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        self.storage = ScenarioStorage(self.base_path)
+        self.scenario = self.storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"))
+        self.signals = [TextSignal.for_scenario("scenario", i, i + 1, "file.txt", f"text {i}",
+                                                [Mention(f"mention{i}", [], [])])
+                        for i in range(3)]
+        for signal in self.signals:
+            self.scenario.append_signal(signal)
+        self.storage.save_scenario(self.scenario)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    def test_get_signal(self):
+        scenario = self.storage.load_scenario("scenario")
+
+        self.assertIsNone(scenario.get_signal(self.signals[1].id))
+        self.assertEqual(self.signals[1], scenario.get_signal(self.signals[1].id, Modality.TEXT))
+        self.assertIsNone(scenario.get_signal("unknown", Modality.TEXT))
+
+        signal = TextSignal.for_scenario("scenario", 5, 6, "file.txt", "new")
+        scenario.append_signal(signal)
+        self.assertIs(signal, scenario.get_signal(signal.id))
+
+    def test_get_mention(self):
+        self.assertEqual((self.signals[1], self.signals[1].mentions[0]), self.scenario.get_mention("mention1"))
+        self.assertIsNone(self.scenario.get_mention("unknown"))
+
+        mention = Mention("added", [], [])
+        self.scenario.add_mention(self.signals[0], mention)
+        self.assertEqual((self.signals[0], mention), self.scenario.get_mention("added"))
+
+        mention = Mention("appended", [], [])
+        self.signals[2].mentions.append(mention)
+        self.assertEqual((self.signals[2], mention), self.scenario.get_mention("appended"))
+
+
+    def test_signals_between(self):
+        scenario = self.storage.create_scenario("other", 0, 10, ScenarioContext("agent"))
+        texts = [TextSignal.for_scenario("other", i, i + 2, "file.txt", f"text {i}") for i in range(0, 10, 2)]
+        images = [ImageSignal.for_scenario("other", i, i, "file.jpg", (0, 0, 2, 2)) for i in range(10)]
+        for signal in texts + images:
+            scenario.append_signal(signal)
+
+        self.assertEqual(texts[1:3], scenario.signals_between(3, 4, (Modality.TEXT,)))
+        self.assertEqual(images[2:5], scenario.signals_between(2, 4, (Modality.IMAGE,)))
+        self.assertEqual([texts[1], images[3]], scenario.signals_between(3, 3))
+
+        signal = TextSignal.for_scenario("other", 3, 4, "file.txt", "text")
+        scenario.append_signal(signal)
+        self.assertIn(signal, scenario.signals_between(3, 3))
+
+    def test_signals_between_open_ended(self):
+        scenario = self.storage.create_scenario("other", 0, None, ScenarioContext("agent"))
+        texts = [TextSignal.for_scenario("other", 0, 2, "file.txt", "text"),
+                 TextSignal.for_scenario("other", 4, None, "file.txt", "text")]
+        for signal in texts:
+            scenario.append_signal(signal)
+
+        self.assertEqual(texts, scenario.signals_between(1, 4))
+        self.assertEqual(texts[1:], scenario.signals_between(100, 200))
+        self.assertEqual([], scenario.signals_between(3, 3))
+
+    def test_mentions_at(self):
+        scenario = self.storage.create_scenario("other", 0, 10, ScenarioContext("agent"))
+        signal = TextSignal.for_scenario("other", 0, 1, "file.txt", "Hello world")
+        scenario.append_signal(signal)
+        hello = Mention("hello", [Index(signal.id, 0, 5)], [])
+        sentence = Mention("sentence", [Index(signal.id, 0, 11)], [])
+        scenario.add_mention(signal, sentence)
+        scenario.add_mention(signal, hello)
+
+        self.assertEqual([sentence, hello], scenario.mentions_at(signal, 4))
+        self.assertEqual([sentence], scenario.mentions_at(signal, 5))
+        self.assertEqual([], scenario.mentions_at(signal, 11))
+
+        world = Mention("world", [Index(signal.id, 6, 11)], [])
+        scenario.add_mention(signal, world)
+        self.assertEqual([sentence, world], scenario.mentions_at(signal, 6))
+
+    def test_mentions_at_columnar(self):
+        scenario = self.storage.create_scenario("other", 0, 10, ScenarioContext("agent"))
+        signal = TextSignal.for_scenario("other", 0, 1, "file.txt", "Hello world")
+        signal.mentions = ColumnarMentions.from_offsets(signal.id, [(0, 5), (6, 11)], "token", ["Hello", "world"],
+                                                        "source", 0)
+        signal.mentions.append(Mention("sentence", [Index(signal.id, 0, 11)], []))
+        scenario.append_signal(signal)
+
+        self.assertEqual(["sentence", signal.mentions[1].id],
+                         [mention.id for mention in scenario.mentions_at(signal, 7)])
+        self.assertCountEqual(["sentence", signal.mentions[0].id],
+                              [mention.id for mention in scenario.mentions_at(signal, 0)])
+
+
+class TestJsonLinesStorage(TestCase):
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        self.storage = ScenarioStorage(self.base_path)
+        self.scenario = self.storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"), JSONL_SIGNAL_PATHS)
+        self.signals = [TextSignal.for_scenario("scenario", i, i + 1, "file.txt", f"text\n{i}") for i in range(3)]
+        for signal in self.signals:
+            self.scenario.append_signal(signal)
+        self.storage.save_scenario(self.scenario)
+
+        self.path = os.path.join(self.base_path, "scenario", "text.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    def test_load_modality(self):
+        with open(self.path) as data_file:
+            self.assertEqual(3, len(data_file.readlines()))
+
+        self.assertEqual(self.signals, ScenarioStorage(self.base_path).load_modality("scenario", Modality.TEXT))
+
+    def test_load_signal(self):
+        signal = ScenarioStorage(self.base_path).load_signal("scenario", Modality.TEXT, self.signals[1].id)
+
+        self.assertEqual(self.signals[1], signal)
+
+    def test_append_signal(self):
+        signal = TextSignal.for_scenario("scenario", 5, 6, "file.txt", "new")
+        size = os.path.getsize(self.path)
+        self.scenario.append_signal(signal)
+        self.storage.save_signal(self.scenario, signal)
+
+        self.assertEqual(size + len(JsonLinesSignalFile(self.path, TextSignal)._serialize(signal)),
+                         os.path.getsize(self.path))
+        self.assertEqual(self.signals + [signal], ScenarioStorage(self.base_path).load_modality("scenario", Modality.TEXT))
+
+    def test_update_signal_preserves_order(self):
+        self.signals[0].mentions.append(Mention("mention", [], []))
+        self.storage.save_signal(self.scenario, self.signals[0])
+
+        loaded = ScenarioStorage(self.base_path).load_modality("scenario", Modality.TEXT)
+
+        self.assertEqual(self.signals, loaded)
+        self.assertEqual(1, len(loaded[0].mentions))
+
+    def test_compaction(self):
+        signal_file = JsonLinesSignalFile(self.path, TextSignal)
+        for i in range(5):
+            self.signals[0].mentions.append(Mention(f"mention{i}", [], []))
+            signal_file.save_signal(self.signals[0])
+
+        with open(self.path) as data_file:
+            self.assertLess(len(data_file.readlines()), 8)
+        self.assertEqual(self.signals, list(signal_file.iter_signals()))
+
+    def test_rebuild_index(self):
+        self.signals[0].mentions.append(Mention("mention", [], []))
+        self.storage.save_signal(self.scenario, self.signals[0])
+        os.remove(self.path + JsonLinesSignalFile.INDEX_EXTENSION)
+
+        loaded = ScenarioStorage(self.base_path).load_modality("scenario", Modality.TEXT)
+
+        self.assertEqual(self.signals, loaded)
+
+
+class TestBinaryArrayStorage(TestCase):
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    def _image_signals(self, scenario_id):
+        return [ImageSignal.for_scenario(scenario_id, i, i + 1, "file.jpg", (0, 0, 2, 2),
+                                         [Mention(f"mention{i}", [], [Annotation("representation",
+                                                                                np.full(512, i, dtype=np.float32),
+                                                                                "source", 0)])])
+                for i in range(3)]
+
+    def _assert_roundtrip(self, signal_paths):
+        storage = ScenarioStorage(self.base_path, binary_arrays=True)
+        scenario = storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"), signal_paths)
+        signals = self._image_signals("scenario")
+        for signal in signals:
+            scenario.append_signal(signal)
+        storage.save_scenario(scenario)
+        scenario.mark_dirty(Modality.IMAGE)
+        storage.save_scenario(scenario)
+
+        array_files = glob(os.path.join(self.base_path, "scenario", "image.json*.bin"))
+        self.assertEqual(1, len(array_files))
+
+        loaded = ScenarioStorage(self.base_path).load_modality("scenario", Modality.IMAGE)
+        for signal, clone in zip(signals, loaded):
+            value = clone.mentions[0].annotations[0].value
+            self.assertIsInstance(value, np.ndarray)
+            np.testing.assert_array_equal(signal.mentions[0].annotations[0].value, value)
+
+        return storage, scenario
+
+    def test_json(self):
+        self._assert_roundtrip(DEFAULT_SIGNAL_PATHS)
+
+        with open(os.path.join(self.base_path, "scenario", "image.json")) as json_file:
+            self.assertLess(len(json_file.read()), 10000)
+
+    def test_jsonl(self):
+        storage, scenario = self._assert_roundtrip(JSONL_SIGNAL_PATHS)
+
+        signal = self._image_signals("scenario")[0]
+        scenario.append_signal(signal)
+        storage.save_signal(scenario, signal)
+
+        loaded = ScenarioStorage(self.base_path).load_signal("scenario", Modality.IMAGE, signal.id)
+        np.testing.assert_array_equal(signal.mentions[0].annotations[0].value,
+                                      loaded.mentions[0].annotations[0].value)
+
+    def test_keep_binary_arrays(self):
+        self._assert_roundtrip(DEFAULT_SIGNAL_PATHS)
+
+        scenario = ScenarioStorage(self.base_path).load_scenario("scenario")
+        scenario.load_signals((Modality.IMAGE,))
+        scenario.mark_dirty(Modality.IMAGE)
+        ScenarioStorage(self.base_path).save_scenario(scenario)
+
+        self.assertEqual(1, len(glob(os.path.join(self.base_path, "scenario", "image.json*.bin"))))
+        with open(os.path.join(self.base_path, "scenario", "image.json")) as json_file:
+            self.assertLess(len(json_file.read()), 10000)
+
+    def test_inline_removes_referenced_array_files(self):
+        self._assert_roundtrip(DEFAULT_SIGNAL_PATHS)
+        unreferenced = os.path.join(self.base_path, "scenario", "image.json.other.bin")
+        open(unreferenced, 'wb').close()
+
+        scenario = ScenarioStorage(self.base_path).load_scenario("scenario")
+        scenario.load_signals((Modality.IMAGE,))
+        scenario.mark_dirty(Modality.IMAGE)
+        ScenarioStorage(self.base_path, binary_arrays=False).save_scenario(scenario)
+
+        self.assertEqual([unreferenced], glob(os.path.join(self.base_path, "scenario", "*.bin")))
+        loaded = ScenarioStorage(self.base_path).load_modality("scenario", Modality.IMAGE)
+        self.assertEqual([1.0] * 512, loaded[1].mentions[0].annotations[0].value)
+
+    def test_columnar_mentions(self):
+        storage = ScenarioStorage(self.base_path, binary_arrays=True)
+        scenario = storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"))
+        signal = TextSignal.for_scenario("scenario", 0, 1, "file.txt", "text " * 100)
+        signal.mentions = ColumnarMentions.from_offsets(signal.id, [(i * 5, i * 5 + 4) for i in range(100)], "token",
+                                                        ["text"] * 100, "source", 0)
+        scenario.append_signal(signal)
+        storage.save_scenario(scenario)
+
+        self.assertEqual(1, len(glob(os.path.join(self.base_path, "scenario", "text.json*.bin"))))
+        loaded = ScenarioStorage(self.base_path).load_modality("scenario", Modality.TEXT)[0]
+        self.assertIsInstance(loaded.mentions, ColumnarMentions)
+        self.assertEqual(signal.mentions.offsets.tolist(), loaded.mentions.offsets.tolist())
+        self.assertEqual(signal, loaded)
+
+    def test_columnar_mentions_dictionary_size(self):
+        storage = ScenarioStorage(self.base_path, binary_arrays=True)
+        scenario = storage.create_scenario("scenario", 0, 10, ScenarioContext("agent"))
+        signal = TextSignal.for_scenario("scenario", 0, 1, "file.txt", "text " * 100)
+        signal.mentions = ColumnarMentions.from_offsets(signal.id, [(i * 5, i * 5 + 4) for i in range(100)], "token",
+                                                        Token.for_strings(["text"] * 100), "source", 0)
+        scenario.append_signal(signal)
+        storage.save_scenario(scenario)
+
+        for _ in range(3):
+            scenario = storage.load_scenario("scenario")
+            signal = scenario.get_signal(signal.id, Modality.TEXT)
+            self.assertEqual(1, len(scenario.mentions_at(signal, 7)))
+            signal.mentions.offsets
+            self.assertEqual(100, len(signal.mentions._values.values))
+            scenario.mark_dirty(Modality.TEXT)
+            storage.save_scenario(scenario)
+
+        loaded = ScenarioStorage(self.base_path).load_modality("scenario", Modality.TEXT)[0]
+        self.assertEqual(100, len(loaded.mentions._values.values))
+        self.assertEqual(signal, loaded)
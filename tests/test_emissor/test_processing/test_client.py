@@ -0,0 +1,65 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+from emissor.processing.client import BackendClient, BackendError
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        status = 500 if self.path == "/error" else 200
+
+        self.send_response(status)
+        self.send_header("Content-Type", self.headers["Content-Type"])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestBackendClient(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+        self.server.connections = set()
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+        self.client = BackendClient("127.0.0.1", self.server.server_address[1], pool_size=2)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keep_alive(self):
+        for i in range(5):
+            self.assertEqual({"value": i}, self.client.post_json("/", {"value": i}).json())
+
+        self.assertEqual(1, len(self.server.connections))
+
+    def test_binary(self):
+        data = bytes(range(256))
+        response = self.client.post_binary("/", data)
+
+        self.assertEqual(data, response.content)
+        self.assertEqual("application/octet-stream", response.headers["Content-Type"])
+
+    def test_multipart(self):
+        response = self.client.post_multipart("/", {"size": "10"}, [("image", "image.jpg", b"\xff\xd8", "image/jpeg")])
+
+        self.assertTrue(response.headers["Content-Type"].startswith("multipart/form-data; boundary="))
+        self.assertIn(b'name="size"\r\n\r\n10\r\n', response.content)
+        self.assertIn(b'filename="image.jpg"\r\nContent-Type: image/jpeg\r\n\r\n\xff\xd8\r\n', response.content)
+
+    def test_batch(self):
+        bodies = [str(i).encode() for i in range(20)]
+
+        self.assertEqual(bodies, [response.content for response in self.client.post_batch("/", bodies)])
+
+    def test_error(self):
+        with self.assertRaises(BackendError):
+            self.client.post_binary("/error", b"data")
@@ -0,0 +1,114 @@
+import socket
+import sys
+import time
+from unittest import TestCase
+
+from emissor.processing.client import RoundRobinClient
+from emissor.processing.infra import ProcessInfra, HttpProbe, LogProbe, wait_until
+
+SERVER = """
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+class PortHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = sys.argv[1].encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+server = HTTPServer(("127.0.0.1", int(sys.argv[1])), PortHandler)
+print("Serving on port", sys.argv[1], flush=True)
+server.serve_forever()
+"""
+
+
+def free_ports(count):
+    for _ in range(100):
+        with socket.socket() as first:
+            first.bind(("127.0.0.1", 0))
+            port = first.getsockname()[1]
+        if port + count > 65536:
+            continue
+        try:
+            sockets = [socket.socket() for _ in range(count)]
+            for idx, sock in enumerate(sockets):
+                sock.bind(("127.0.0.1", port + idx))
+            return port
+        except OSError:
+            continue
+        finally:
+            for sock in sockets:
+                sock.close()
+
+    raise EnvironmentError("No free ports")
+
+
+class TestProcessInfra(TestCase):
+    def setUp(self):
+        self.port = free_ports(2)
+        self.command = [sys.executable, "-c", SERVER, "{port}"]
+
+    def test_replicas(self):
+        with ProcessInfra(self.command, self.port, replicas=2, probe=HttpProbe(), boot_timeout=30) as infra:
+            self.assertIsInstance(infra.client, RoundRobinClient)
+
+            responses = [infra.client.request("GET", "/").text for _ in range(4)]
+            self.assertEqual([str(self.port), str(self.port + 1)] * 2, responses)
+
+            processes = [replica.handle for replica in infra._replicas]
+
+        self.assertTrue(all(process.poll() is not None for process in processes))
+
+    def test_log_probe(self):
+        with ProcessInfra(self.command, self.port, probe=LogProbe("Serving on port"), boot_timeout=30) as infra:
+            self.assertEqual(str(self.port), infra.client.request("GET", "/").text)
+
+    def test_keep_warm(self):
+        warm = ProcessInfra(self.command, self.port, probe=HttpProbe(), boot_timeout=30, keep_warm=True)
+        with warm:
+            processes = [replica.handle for replica in warm._replicas]
+        try:
+            self.assertIsNone(processes[0].poll())
+
+            reused = ProcessInfra(self.command, self.port, probe=HttpProbe(), boot_timeout=30, keep_warm=True)
+            with reused:
+                self.assertEqual([], reused._replicas)
+                self.assertEqual(str(self.port), reused.client.request("GET", "/").text)
+        finally:
+            processes[0].terminate()
+            processes[0].wait()
+
+    def test_terminated(self):
+        infra = ProcessInfra([sys.executable, "-c", "print('failed')"], self.port, probe=HttpProbe(), boot_timeout=30)
+
+        with self.assertRaisesRegex(EnvironmentError, "terminated: failed"):
+            infra.start()
+
+    def test_timeout(self):
+        infra = ProcessInfra([sys.executable, "-c", "import time; time.sleep(10)"], self.port,
+                             probe=HttpProbe(), boot_timeout=0.2)
+
+        with self.assertRaises(TimeoutError):
+            infra.start()
+        self.assertEqual([], infra._replicas)
+
+
+class TestWaitUntil(TestCase):
+    def test_backoff(self):
+        calls = []
+        wait_until(lambda: calls.append(time.monotonic()) or len(calls) == 4, 10, initial_delay=0.01)
+
+        delays = [second - first for first, second in zip(calls, calls[1:])]
+        self.assertEqual(3, len(delays))
+        self.assertTrue(delays[0] < delays[2])
+
+    def test_timeout(self):
+        with self.assertRaises(TimeoutError):
+            wait_until(lambda: False, 0.1)
@@ -0,0 +1,367 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import uuid
+from glob import glob
+from unittest import TestCase
+
+import numpy as np
+
+from emissor.persistence import ScenarioStorage
+from emissor.processing.api import SignalProcessor, AsyncSignalProcessor
+from emissor.processing.processing import DataProcessing, _WORKER_TASKS, _new_task_keys, _setup_worker_task, \
+    _release_worker_task
+from emissor.representation.scenario import Modality, TextSignal, ScenarioContext, Mention, Annotation
+
+
+class MentionProcessor(SignalProcessor):
+    def __init__(self, parallel: bool = False, parallel_signals: bool = False, incremental: bool = False,
+                 fail_after: int = None):
+        self._parallel = parallel
+        self._parallel_signals = parallel_signals
+        self._incremental = incremental
+        self._fail_after = fail_after
+        self._worker_id = None
+        self.processed = []
+
+    def setup_worker(self):
+        self._worker_id = f"{os.getpid()}-{uuid.uuid4().hex}"
+
+    def process_signal(self, scenario, signal):
+        if len(self.processed) == self._fail_after:
+            raise RuntimeError("Processing failed")
+
+        self.processed.append(signal.id)
+        annotation = Annotation("worker", self._worker_id, self.name, 0)
+        scenario.add_mention(signal, Mention(f"{signal.id}-mention", [], [annotation]))
+
+    @property
+    def parallel(self) -> bool:
+        return self._parallel
+
+    @property
+    def parallel_signals(self) -> bool:
+        return self._parallel_signals
+
+    @property
+    def incremental(self) -> bool:
+        return self._incremental
+
+    @property
+    def modalities(self):
+        return (Modality.TEXT,)
+
+
+class BatchProcessor(MentionProcessor):
+    def __init__(self, batch_across_scenarios: bool):
+        super().__init__()
+        self._batch_across_scenarios = batch_across_scenarios
+        self.batches = []
+
+    def process_batch(self, scenarios, signals):
+        self.batches.append([scenario.id for scenario in scenarios])
+        super().process_batch(scenarios, signals)
+
+    @property
+    def batch_size(self):
+        return 4
+
+    @property
+    def batch_across_scenarios(self) -> bool:
+        return self._batch_across_scenarios
+
+
+class CountingProcessor(SignalProcessor):
+    """Annotates each mention with the number of mentions of the signal, which requires MentionProcessor."""
+    @property
+    def dependencies(self):
+        return (MentionProcessor.__name__,)
+
+    def process_signal(self, scenario, signal):
+        for mention in signal.mentions:
+            mention.annotations.append(Annotation("count", len(signal.mentions), self.name, 0))
+
+    @property
+    def parallel(self) -> bool:
+        return True
+
+    @property
+    def modalities(self):
+        return (Modality.TEXT,)
+
+
+class EmbeddingProcessor(MentionProcessor):
+    def process_signal(self, scenario, signal):
+        annotation = Annotation("embedding", np.full(32, len(signal.text), dtype=np.float32), self.name, 0)
+        scenario.add_mention(signal, Mention(f"{signal.id}-embedding", [], [annotation]))
+
+
+class SummaryProcessor(SignalProcessor):
+    """Processes scenarios as a whole, without signals of a modality, and requires MentionProcessor."""
+    def __init__(self):
+        self.processed = []
+
+    def process_scenario(self, scenario, signals):
+        self.processed.append(scenario.id)
+
+    @property
+    def dependencies(self):
+        return (MentionProcessor.__name__,)
+
+
+class CountingStorage(ScenarioStorage):
+    def __init__(self, data_path):
+        super().__init__(data_path)
+        self.saved = []
+
+    def save_scenario(self, scenario):
+        self.saved.append(scenario.id)
+        super().save_scenario(scenario)
+
+
+class AsyncMentionProcessor(AsyncSignalProcessor):
+    def __init__(self):
+        self.attempts = dict()
+        self.active = 0
+        self.max_active = 0
+
+    async def process_signal_async(self, scenario, signal):
+        self.attempts[signal.id] = self.attempts.get(signal.id, 0) + 1
+        self.active += 1
+        self.max_active = max(self.active, self.max_active)
+        try:
+            await asyncio.sleep(0.001)
+            if self.attempts[signal.id] == 1:
+                raise ConnectionError("Service not available")
+        finally:
+            self.active -= 1
+
+        scenario.add_mention(signal, Mention(f"{signal.id}-mention", [], []))
+
+    @property
+    def concurrency(self) -> int:
+        return 4
+
+    @property
+    def retries(self) -> int:
+        return 1
+
+    @property
+    def retry_delay(self) -> float:
+        return 0
+
+    @property
+    def modalities(self):
+        return (Modality.TEXT,)
+
+
+class TestDataProcessing(TestCase):
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        storage = ScenarioStorage(self.base_path)
+        for scenario_id in ("scenario1", "scenario2"):
+            scenario = storage.create_scenario(scenario_id, 0, 100, ScenarioContext("agent"))
+            for i in range(10):
+                scenario.append_signal(TextSignal.for_scenario(scenario_id, 10 - i, 11 - i, "file.txt", f"text {i}"))
+            storage.save_scenario(scenario)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    def _run(self, processor, num_jobs):
+        processing = DataProcessing(ScenarioStorage(self.base_path), [], None, [processor],
+                                    num_jobs=num_jobs, chunk_size=3)
+        processing.run()
+
+        storage = ScenarioStorage(self.base_path)
+
+        return {scenario_id: storage.load_scenario(scenario_id).get_signals(Modality.TEXT)
+                for scenario_id in ("scenario1", "scenario2")}
+
+    def _assert_setup_once_per_worker(self, scenarios):
+        worker_ids = {annotation.value for signals in scenarios.values()
+                      for signal in signals for mention in signal.mentions for annotation in mention.annotations}
+        pids = [worker_id.split("-")[0] for worker_id in worker_ids]
+
+        self.assertTrue(worker_ids)
+        self.assertEqual(len(set(pids)), len(pids))
+
+    def test_process(self):
+        processor = MentionProcessor()
+        scenarios = self._run(processor, num_jobs=1)
+
+        self.assertTrue(all(len(signal.mentions) == 1 for signals in scenarios.values() for signal in signals))
+        self._assert_setup_once_per_worker(scenarios)
+
+    def test_parallel_scenarios(self):
+        processor = MentionProcessor(parallel=True)
+        scenarios = self._run(processor, num_jobs=2)
+
+        self.assertIsNone(processor._worker_id)
+        self.assertTrue(all(len(signal.mentions) == 1 for signals in scenarios.values() for signal in signals))
+        self._assert_setup_once_per_worker(scenarios)
+
+    def test_parallel_signals(self):
+        scenarios = self._run(MentionProcessor(parallel_signals=True), num_jobs=2)
+
+        for signals in scenarios.values():
+            self.assertEqual(list(range(10, 0, -1)), [signal.time.start for signal in signals])
+            self.assertEqual([[f"{signal.id}-mention"] for signal in signals],
+                             [[mention.id for mention in signal.mentions] for signal in signals])
+        self._assert_setup_once_per_worker(scenarios)
+
+    def test_binary_arrays(self):
+        DataProcessing(ScenarioStorage(self.base_path, binary_arrays=True), [], None,
+                       [EmbeddingProcessor(parallel=True)], num_jobs=2).run()
+        self.assertEqual(2, len(glob(os.path.join(self.base_path, "*", "text.json*.bin"))))
+
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [EmbeddingProcessor(parallel=True)],
+                       num_jobs=2, force=True).run()
+        self.assertEqual(2, len(glob(os.path.join(self.base_path, "*", "text.json*.bin"))))
+
+        signal = ScenarioStorage(self.base_path).load_scenario("scenario1").get_signals(Modality.TEXT)[0]
+        self.assertEqual(2, len(signal.mentions))
+        np.testing.assert_array_equal(np.full(32, 6), signal.mentions[1].annotations[0].value)
+
+    def test_release_tasks_of_previous_steps(self):
+        first, = _new_task_keys()
+        second, third = _new_task_keys(2)
+        try:
+            _setup_worker_task(first, MentionProcessor())
+            _setup_worker_task(second, MentionProcessor())
+            _setup_worker_task(third, MentionProcessor())
+
+            self.assertEqual({second, third}, set(_WORKER_TASKS))
+        finally:
+            for task_key in (first, second, third):
+                _release_worker_task(task_key)
+
+    def test_batches(self):
+        processor = BatchProcessor(batch_across_scenarios=False)
+        scenarios = self._run(processor, num_jobs=1)
+
+        self.assertEqual([4, 4, 2, 4, 4, 2], [len(batch) for batch in processor.batches])
+        self.assertTrue(all(len(set(batch)) == 1 for batch in processor.batches))
+        self.assertTrue(all(len(signal.mentions) == 1 for signals in scenarios.values() for signal in signals))
+
+    def test_batches_across_scenarios(self):
+        processor = BatchProcessor(batch_across_scenarios=True)
+        scenarios = self._run(processor, num_jobs=1)
+
+        self.assertEqual([4, 4, 4, 4, 4], [len(batch) for batch in processor.batches])
+        self.assertEqual(["scenario1", "scenario1", "scenario2", "scenario2"], sorted(processor.batches[2]))
+        self.assertTrue(all(len(signal.mentions) == 1 for signals in scenarios.values() for signal in signals))
+
+    def test_fused_pipeline(self):
+        storage = CountingStorage(self.base_path)
+        DataProcessing(storage, [], None, [CountingProcessor(), MentionProcessor()], fused=True).run()
+
+        self.assertEqual(["scenario1", "scenario2"], storage.saved)
+        for scenario_id in storage.saved:
+            for signal in ScenarioStorage(self.base_path).load_scenario(scenario_id).get_signals(Modality.TEXT):
+                self.assertEqual(["worker", "count"], [annotation.type for annotation in signal.mentions[0].annotations])
+
+    def test_fused_pipeline_parallel(self):
+        DataProcessing(ScenarioStorage(self.base_path), [], None,
+                       [CountingProcessor(), MentionProcessor(parallel=True)], num_jobs=2, fused=True).run()
+
+        storage = ScenarioStorage(self.base_path)
+        for scenario_id in storage.list_scenarios():
+            for signal in storage.load_scenario(scenario_id).get_signals(Modality.TEXT):
+                self.assertEqual(["worker", "count"], [annotation.type for annotation in signal.mentions[0].annotations])
+
+    def _change_signal(self, scenario_id):
+        storage = ScenarioStorage(self.base_path)
+        scenario = storage.load_scenario(scenario_id)
+        signal = scenario.get_signals(Modality.TEXT)[0]
+        signal.text = "changed"
+        scenario.mark_dirty(Modality.TEXT)
+        storage.save_scenario(scenario)
+
+        return signal.id
+
+    def test_skip_up_to_date(self):
+        self._run(MentionProcessor(), num_jobs=1)
+
+        processor = MentionProcessor()
+        self._run(processor, num_jobs=1)
+        self.assertEqual([], processor.processed)
+
+        self._change_signal("scenario1")
+        processor = MentionProcessor()
+        self._run(processor, num_jobs=1)
+        self.assertEqual(10, len(processor.processed))
+
+        processor = MentionProcessor()
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [processor], force=True).run()
+        self.assertEqual(20, len(processor.processed))
+
+    def test_process_dependents_again(self):
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [CountingProcessor(), MentionProcessor()]).run()
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [MentionProcessor()], force=True).run()
+        scenarios = self._run(CountingProcessor(), num_jobs=1)
+
+        for signals in scenarios.values():
+            for signal in signals:
+                self.assertEqual(["worker", "count"],
+                                 [annotation.type for annotation in signal.mentions[-1].annotations])
+
+    def test_process_dependents_without_modalities_again(self):
+        processor = SummaryProcessor()
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [processor, MentionProcessor()]).run()
+        self.assertEqual(["scenario1", "scenario2"], sorted(processor.processed))
+
+        processor = SummaryProcessor()
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [processor]).run()
+        self.assertEqual([], processor.processed)
+
+        self._change_signal("scenario1")
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [MentionProcessor()]).run()
+        processor = SummaryProcessor()
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [processor]).run()
+        self.assertEqual(["scenario1"], processor.processed)
+
+    def test_process_changed_signals(self):
+        self._run(MentionProcessor(incremental=True), num_jobs=1)
+
+        changed_id = self._change_signal("scenario2")
+        processor = MentionProcessor(incremental=True)
+        scenarios = self._run(processor, num_jobs=1)
+
+        self.assertEqual([changed_id], processor.processed)
+        changed = next(signal for signal in scenarios["scenario2"] if signal.id == changed_id)
+        self.assertEqual(2, len(changed.mentions))
+
+    def test_resume(self):
+        with self.assertRaises(RuntimeError):
+            self._run(MentionProcessor(fail_after=15), num_jobs=1)
+
+        DataProcessing(ScenarioStorage(self.base_path), [], None, []).run()
+
+        processor = MentionProcessor()
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [processor], force=True, resume=True).run()
+        self.assertEqual(10, len(processor.processed))
+
+        processor = MentionProcessor()
+        DataProcessing(ScenarioStorage(self.base_path), [], None, [processor], force=True).run()
+        self.assertEqual(20, len(processor.processed))
+
+    def test_checkpoint(self):
+        with self.assertRaises(RuntimeError):
+            DataProcessing(ScenarioStorage(self.base_path), [], None, [MentionProcessor(incremental=True, fail_after=5)],
+                           checkpoint_interval=3).run()
+
+        processor = MentionProcessor(incremental=True)
+        scenarios = self._run(processor, num_jobs=1)
+
+        self.assertEqual(17, len(processor.processed))
+        self.assertTrue(all(len(signal.mentions) == 1 for signals in scenarios.values() for signal in signals))
+
+    def test_async_processor(self):
+        processor = AsyncMentionProcessor()
+        scenarios = self._run(processor, num_jobs=1)
+
+        self.assertEqual(4, processor.max_active)
+        self.assertEqual({2}, set(processor.attempts.values()))
+        self.assertTrue(all(len(signal.mentions) == 1 for signals in scenarios.values() for signal in signals))
@@ -1,3 +1,4 @@
+import json
 from dataclasses import dataclass
 from unittest import TestCase
 
@@ -92,6 +93,26 @@ class TestMarshallingDomain(TestCase):
                 clone = unmarshal(serialized, cls=instance.__class__)
                 self.assertEqual(instance, clone)
 
+    def test_marshalling_text_signal_without_sequence(self):
+        signal = TextSignal.for_scenario("id", 0, 1, "file.txt", "text", [])
+
+        serialized = json.loads(marshal(signal, cls=TextSignal))
+        self.assertNotIn("seq", serialized)
+
+        clone = unmarshal(json.dumps(serialized), cls=TextSignal)
+        self.assertEqual(signal, clone)
+        self.assertEqual("ex", clone.get_segment(Index.from_range(clone.id, 1, 3)))
+        self.assertEqual("text", "".join(clone.seq))
+
+    def test_unmarshalling_text_signal_with_sequence(self):
+        serialized = json.loads(marshal(TextSignal.for_scenario("id", 0, 1, "file.txt", "text", []), cls=TextSignal))
+        serialized["seq"] = list("text")
+
+        clone = unmarshal(json.dumps(serialized), cls=TextSignal)
+        self.assertEqual("text", clone.text)
+        self.assertEqual(list("text"), list(clone.seq))
+        self.assertIs(clone.text, clone.seq.text)
+
     def test_json_ld(self):
         for instance in CONTAINER_INSTANCES + SCENARIO_INSTANCES:
             with self.subTest(str(instance.__class__.__name__)):
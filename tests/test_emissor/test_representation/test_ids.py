@@ -0,0 +1,49 @@
+import time
+import uuid
+from unittest import TestCase
+
+from emissor.representation.container import Sequence
+from emissor.representation.ids import TimeOrderedIdGenerator, RandomIdGenerator, get_id_generator, \
+    set_id_generator, new_id, new_ids
+
+
+class TestTimeOrderedIdGenerator(TestCase):
+    def setUp(self):
+        self.generator = TimeOrderedIdGenerator()
+
+    def test_uuid_layout(self):
+        before = time.time_ns() // 1_000_000
+        identifier = uuid.UUID(self.generator.new_id())
+        after = time.time_ns() // 1_000_000
+
+        self.assertEqual(7, identifier.version)
+        self.assertEqual(uuid.RFC_4122, identifier.variant)
+        self.assertTrue(before <= identifier.int >> 80 <= after)
+
+    def test_ids_are_ordered_and_unique(self):
+        ids = self.generator.new_ids(10000) + [self.generator.new_id() for _ in range(100)]
+
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_ids_are_ordered_with_clock_set_back(self):
+        first = self.generator.new_id()
+        self.generator._millis += 10000
+        second = self.generator.new_id()
+        third = self.generator.new_id()
+
+        self.assertTrue(first < second < third)
+
+
+class TestIdGenerator(TestCase):
+    def tearDown(self):
+        set_id_generator(TimeOrderedIdGenerator())
+
+    def test_set_id_generator(self):
+        generator = RandomIdGenerator()
+        set_id_generator(generator)
+
+        self.assertIs(generator, get_id_generator())
+        self.assertEqual(4, uuid.UUID(new_id()).version)
+        self.assertEqual(4, uuid.UUID(Sequence.from_seq([1, 2]).id).version)
+        self.assertEqual(3, len(set(new_ids(3))))
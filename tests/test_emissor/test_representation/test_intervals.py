@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+import numpy as np
+
+from emissor.representation.intervals import IntervalIndex
+
+
+class TestIntervalIndex(TestCase):
+    def setUp(self):
+        random = np.random.default_rng(0)
+        self.starts = random.integers(0, 1000, 500)
+        self.ends = self.starts + random.integers(0, 50, 500)
+        self.index = IntervalIndex(self.starts, self.ends, list(range(500)))
+
+    def test_overlapping(self):
+        for start, end in [(0, 10), (100, 100), (500, 600), (990, 2000), (-10, 0)]:
+            with self.subTest(start=start, end=end):
+                expected = [idx for idx in np.argsort(self.starts, kind="stable")
+                            if self.starts[idx] < end and self.ends[idx] > start]
+                self.assertEqual(expected, self.index.overlapping(start, end))
+
+    def test_overlapping_closed(self):
+        for start, end in [(0, 10), (100, 100), (500, 600), (990, 2000), (-10, 0)]:
+            with self.subTest(start=start, end=end):
+                expected = [idx for idx in np.argsort(self.starts, kind="stable")
+                            if self.starts[idx] <= end and self.ends[idx] >= start]
+                self.assertEqual(expected, self.index.overlapping(start, end, closed=True))
+
+    def test_containing(self):
+        for point in [0, 1, 100, 500, 1049, 2000]:
+            with self.subTest(point=point):
+                expected = [idx for idx in np.argsort(self.starts, kind="stable")
+                            if self.starts[idx] <= point < self.ends[idx]]
+                self.assertEqual(expected, self.index.containing(point))
+
+    def test_empty(self):
+        index = IntervalIndex([], [], [])
+
+        self.assertEqual(0, len(index))
+        self.assertEqual([], index.overlapping(0, 10))
+        self.assertEqual([], index.containing(0))
+
+    def test_open_ended(self):
+        index = IntervalIndex([0, 5, 10], [2, None, 12], ["a", "b", "c"])
+
+        self.assertEqual(["b", "c"], index.overlapping(10, 11))
+        self.assertEqual(["a", "b"], index.overlapping(0, 5, closed=True))
+        self.assertEqual([], index.overlapping(3, 5))
+        self.assertEqual(["b"], index.containing(100))
@@ -3,7 +3,8 @@ from unittest import TestCase
 
 from rdflib import URIRef
 
-from emissor.representation.ldschema import ld_type, LD_CONTEXT_FIELD, LdProperty
+from emissor.representation.ldschema import ld_type, LD_CONTEXT_FIELD, LdProperty, LdId, emissor_dataclass
+from emissor.representation.util import marshal, unmarshal
 
 
 class TestSchemaWithoutOntology(TestCase):
@@ -125,3 +126,37 @@ class TestSchemaWithoutOntology(TestCase):
         self.assertEqual(URIRef("http://schema.org#hasParentProperty"), context["parent_property"])
         self.assertNotIn("hasChildProperty", context)
         self.assertEqual(URIRef("http://schema.org#hasChildProperty"), context["child_property"])
+
+
+@emissor_dataclass(slots=True)
+class SlotsBase:
+    reference: str = LdId()
+
+
+@emissor_dataclass(slots=True)
+class SlotsClass(SlotsBase):
+    property: str
+    other: int = 1
+
+
+class TestSlots(TestCase):
+    def test_slots(self):
+        instance = SlotsClass("reference", "testProperty")
+
+        self.assertFalse(hasattr(instance, "__dict__"))
+        self.assertEqual(("property", "other"), SlotsClass.__slots__)
+        self.assertEqual(1, instance.other)
+        with self.assertRaises(AttributeError):
+            instance.undefined = "value"
+
+    def test_slots_context(self):
+        context = getattr(SlotsClass("reference", "testProperty"), LD_CONTEXT_FIELD)
+
+        self.assertEqual("SlotsClass", SlotsClass._ld_type)
+        self.assertEqual({"@id": URIRef("https://emissor.org#reference"), "@type": "@id"}, context["reference"])
+        self.assertEqual(URIRef("https://emissor.org#property"), context["property"])
+
+    def test_slots_serialization(self):
+        instance = SlotsClass("reference", "testProperty", 2)
+
+        self.assertEqual(instance, unmarshal(marshal(instance, cls=SlotsClass), cls=SlotsClass))
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import wave
+from unittest import TestCase
+
+import numpy as np
+
+from emissor.representation.media import ArrayCache, load_audio, load_image, get_array_cache
+from emissor.representation.container import MultiIndex
+from emissor.representation.scenario import AudioSignal, ImageSignal
+
+
+class TestMedia(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        get_array_cache().clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write_wav(self, name, samples):
+        path = os.path.join(self.directory, name)
+        with wave.open(path, 'wb') as wav_file:
+            wav_file.setnchannels(samples.shape[1])
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(samples.astype("<i2").tobytes())
+
+        return path
+
+    def test_load_audio(self):
+        samples = np.arange(200, dtype=np.int16).reshape(100, 2)
+        audio = load_audio(self._write_wav("audio.wav", samples))
+
+        self.assertIsInstance(audio, np.memmap)
+        np.testing.assert_array_equal(samples, audio)
+
+    def test_load_image_npy(self):
+        image = np.arange(24, dtype=np.uint8).reshape(2, 4, 3)
+        np.save(os.path.join(self.directory, "image.npy"), image)
+
+        np.testing.assert_array_equal(image, load_image(os.path.join(self.directory, "image.npy")))
+
+    def test_cache_eviction(self):
+        cache = ArrayCache(max_bytes=250)
+        loads = []
+
+        def loader(key):
+            loads.append(key)
+            return np.zeros(100, dtype=np.uint8)
+
+        cache.get("a", loader)
+        cache.get("b", loader)
+        cache.get("a", loader)
+        cache.get("c", loader)
+        cache.get("a", loader)
+        cache.get("b", loader)
+
+        self.assertEqual(["a", "b", "c", "b"], loads)
+        self.assertEqual(200, cache.size)
+
+    def test_image_signal_array(self):
+        image = np.arange(24, dtype=np.uint8).reshape(2, 4, 3)
+        np.save(os.path.join(self.directory, "image.npy"), image)
+        signal = ImageSignal.for_scenario("scenario", 0, 1, "image.npy", (0, 0, 4, 2))
+        signal.set_base_path(self.directory)
+
+        self.assertIsNone(signal.array)
+        np.testing.assert_array_equal(image, signal.get_array())
+        self.assertIs(signal.get_array(), signal.get_array())
+
+    def test_audio_signal_array(self):
+        samples = np.arange(200, dtype=np.int16).reshape(100, 2)
+        self._write_wav("audio.wav", samples)
+        signal = AudioSignal.for_scenario("scenario", 0, 1, "audio.wav", 100, 2)
+        signal.set_base_path(self.directory)
+
+        np.testing.assert_array_equal(samples, signal.get_array())
+        self.assertEqual(0, get_array_cache().size)
+
+    def test_image_signal_segments(self):
+        image = np.arange(48, dtype=np.uint8).reshape(4, 6, 2)
+        np.save(os.path.join(self.directory, "image.npy"), image)
+        signal = ImageSignal.for_scenario("scenario", 0, 1, "image.npy", (0, 0, 6, 4))
+        signal.set_base_path(self.directory)
+
+        box = MultiIndex(signal.id, (1, 2, 4, 4))
+        np.testing.assert_array_equal(image[2:4, 1:4], signal.get_segment(box))
+
+        segments = signal.get_segments([box, MultiIndex(signal.id, (0, 0, 6, 4))], shape=(2, 3))
+        self.assertEqual((2, 2, 3, 2), segments.shape)
+        np.testing.assert_array_equal(image[2:4, 1:4], segments[0])
+        np.testing.assert_array_equal(image[1::2, 1::2], segments[1])
+
+    def test_audio_signal_segments(self):
+        samples = np.arange(200, dtype=np.int16).reshape(100, 2)
+        self._write_wav("audio.wav", samples)
+        signal = AudioSignal.for_scenario("scenario", 0, 1, "audio.wav", 100, 2)
+        signal.set_base_path(self.directory)
+
+        segments = signal.get_segments([MultiIndex(signal.id, (10, 0, 20, 1)), MultiIndex(signal.id, (50, 1, 60, 2))])
+
+        np.testing.assert_array_equal(samples[10:20, 0:1], segments[0])
+        np.testing.assert_array_equal(samples[50:60, 1:2], segments[1])
+        self.assertTrue(all(np.shares_memory(segment, signal.get_array()) for segment in segments))
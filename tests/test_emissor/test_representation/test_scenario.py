@@ -1,10 +1,17 @@
 import abc
+import json
+import os
+import shutil
+import tempfile
 from unittest import TestCase
 
 import numpy as np
 
-from emissor.representation.annotation import Entity
-from emissor.representation.scenario import Annotation, class_type, module_source, class_source
+from emissor.representation.annotation import Entity, Token
+from emissor.representation.container import Index, MultiIndex
+from emissor.representation.scenario import Annotation, class_type, module_source, class_source, create_mentions, \
+    ColumnarMentions, Mention, TextSignal
+from emissor.representation.util import marshal, unmarshal, BinaryArrayWriter, BinaryArrayReader
 
 
 class TestScenarioModule(TestCase):
@@ -54,4 +61,118 @@ class TestScenarioModule(TestCase):
         annotation = Annotation(class_type(annotation_value), annotation_value, module_source(np.__name__), 0)
 
         self.assertEqual("python-type:numpy.ndarray", annotation.type)
-        self.assertRegexpMatches(annotation.source, "python-source:numpy#\d[.][\w.]+")
\ No newline at end of file
+        self.assertRegexpMatches(annotation.source, "python-source:numpy#\d[.][\w.]+")
+
+
+class TestCreateMentions(TestCase):
+    def test_create_mentions_from_offsets(self):
+        mentions = create_mentions("signal", np.array([[0, 5], [6, 11]]), "token", ["Hello", "world"], "test", 42)
+
+        self.assertEqual([[Index("signal", 0, 5)], [Index("signal", 6, 11)]], [m.segment for m in mentions])
+        self.assertEqual(["Hello", "world"], [m.annotations[0].value for m in mentions])
+        self.assertTrue(all(m.annotations[0].type == "token" and m.annotations[0].source == "test"
+                            and m.annotations[0].timestamp == 42 for m in mentions))
+        self.assertEqual(2, len({m.id for m in mentions}))
+
+    def test_create_mentions_from_bounding_boxes(self):
+        mentions = create_mentions("signal", [(0, 0, 10, 20)], "face", ["face"], "test")
+
+        self.assertEqual([MultiIndex("signal", (0, 0, 10, 20))], mentions[0].segment)
+        self.assertIsInstance(mentions[0].annotations[0].timestamp, int)
+
+    def test_create_mentions_empty(self):
+        self.assertEqual([], create_mentions("signal", [], "token", [], "test"))
+
+    def test_create_mentions_invalid(self):
+        with self.assertRaises(ValueError):
+            create_mentions("signal", [(0, 5)], "token", ["a", "b"], "test")
+
+
+class TestColumnarMentions(TestCase):
+    def setUp(self):
+        self.signal = TextSignal.for_scenario("scenario", 0, 1, "text.txt", "Hello world")
+        self.mentions = ColumnarMentions.from_offsets(self.signal.id, [[0, 5], [6, 11]], "token", ["Hello", "world"],
+                                                      "tokenizer", 42)
+        self.mentions.extend_offsets(self.signal.id, [[6, 11]], "ner", ["PERSON"], "ner", 43)
+
+    def test_mentions(self):
+        self.assertEqual(3, len(self.mentions))
+        self.assertEqual([Index(self.signal.id, 6, 11)], self.mentions[1].segment)
+        self.assertEqual(Annotation("ner", "PERSON", "ner", 43), self.mentions[2].annotations[0])
+        self.assertEqual([[0, 5], [6, 11], [6, 11]], self.mentions.offsets.tolist())
+        self.assertEqual(["token", "token", "ner"], self.mentions.annotation_types.tolist())
+        self.assertEqual(self.mentions.ids, [mention.id for mention in self.mentions])
+
+    def test_filter(self):
+        self.assertEqual(["Hello", "world"],
+                         [mention.annotations[0].value for mention in self.mentions.filter("token")])
+        self.assertEqual(["PERSON"], [mention.annotations[0].value for mention in self.mentions.filter(source="ner")])
+        self.assertEqual(2, len(self.mentions.filter(source="ner", invert=True)))
+        self.assertEqual(0, len(self.mentions.filter("token", "ner")))
+
+    def test_modify(self):
+        self.mentions[0].annotations.append(Annotation("link", "entity", "linker", 44))
+        self.mentions.append(Mention("mention", [Index(self.signal.id, 0, 11)], []))
+        del self.mentions[1]
+
+        self.assertEqual(3, len(self.mentions))
+        self.assertEqual(2, len(self.mentions[0].annotations))
+        self.assertEqual("mention", self.mentions[-1].id)
+        self.assertEqual(1, len(self.mentions.filter("link")))
+        self.assertEqual(1, len(self.mentions.filter("token")))
+
+    def test_dictionary_size(self):
+        tokens = Token.for_strings(["Hello", "world"])
+        mentions = ColumnarMentions.from_offsets(self.signal.id, [[0, 5], [6, 11]], "token", tokens, "tokenizer", 42)
+        mentions.append(Mention("mention", [Index(self.signal.id, 0, 11)],
+                                [Annotation("token", tokens[0], "tokenizer", 42)]))
+        list(mentions)
+        mentions.offsets
+
+        self.assertEqual(2, len(mentions._values.values))
+        mentions.offsets
+        mentions.annotation_types
+        self.assertEqual(2, len(mentions._values.values))
+
+        selection = mentions.filter(source="tokenizer")
+        selection.append(Mention("other", [Index(self.signal.id, 0, 5)],
+                                 [Annotation("token", Token.for_string("Hi"), "tokenizer", 42)]))
+        selection.offsets
+        self.assertEqual(2, len(mentions._values.values))
+        self.assertEqual(3, len(selection._values.values))
+
+        del selection[-2:]
+        self.assertEqual(2, len(selection._take(np.arange(len(selection)))._values.values))
+
+    def test_serialization(self):
+        self.mentions[0].annotations.append(Annotation("link", "entity", "linker", 44))
+        self.mentions.append(Mention("mention", [Index(self.signal.id, 0, 11)], []))
+        self.signal.mentions = self.mentions
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with BinaryArrayWriter(os.path.join(directory, "arrays.bin"), min_size=1) as writer:
+            json_string = marshal(self.signal, cls=TextSignal, array_writer=writer)
+        loaded = unmarshal(json_string, cls=TextSignal, array_reader=BinaryArrayReader(directory))
+
+        self.assertIsInstance(loaded.mentions, ColumnarMentions)
+        self.assertEqual(list(self.mentions), list(loaded.mentions))
+        self.assertEqual(self.signal, loaded)
+
+    def test_serialization_as_list(self):
+        self.signal.mentions = self.mentions
+
+        json_string = marshal(self.signal, cls=TextSignal)
+        loaded = unmarshal(json_string, cls=TextSignal)
+
+        self.assertIsInstance(json.loads(json_string)["mentions"], list)
+        self.assertIsInstance(loaded.mentions, list)
+        self.assertEqual(self.signal, loaded)
+
+    def test_serialization_of_list(self):
+        self.signal.mentions = list(self.mentions)
+
+        loaded = unmarshal(marshal(self.signal, cls=TextSignal), cls=TextSignal)
+
+        self.assertIsInstance(loaded.mentions, list)
+        self.assertEqual(self.signal, loaded)
@@ -1,12 +1,20 @@
+import io
 import json
+import os
+import shutil
+import tempfile
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, date
-from typing import Union, Optional
+from typing import Union, Optional, Any
 from unittest import TestCase
 
 from emissor.representation.ldschema import emissor_dataclass, EMISSOR_NAMESPACE, LdProperty
-from emissor.representation.util import marshal, unmarshal
+import numpy as np
+from numpy.typing import ArrayLike
+
+from emissor.representation.util import marshal, unmarshal, schema_cache_info, clear_schema_cache, unmarshal_stream, \
+    BinaryArrayWriter, BinaryArrayReader
 
 
 class TestMarshallingWithTypes(TestCase):
@@ -442,4 +450,126 @@ class TestLDMarshalling(TestCase):
         instance = TestString("testString")
         unmarshalled = unmarshal(marshal(instance, cls=TestString))
 
-        self.assertEqual(unmarshalled.label, "testString")
\ No newline at end of file
+        self.assertEqual(unmarshalled.label, "testString")
+
+class TestSchemaCache(TestCase):
+    def setUp(self):
+        clear_schema_cache()
+
+    def test_schema_is_built_once(self):
+        @dataclass
+        class TestString:
+            label: str
+
+        instance = TestString("testString")
+        for _ in range(3):
+            unmarshal(marshal(instance, cls=TestString), cls=TestString)
+
+        info = schema_cache_info()
+        self.assertEqual(1, info.misses)
+        self.assertEqual(5, info.hits)
+        self.assertEqual(1, info.size)
+
+    def test_nested_generic_values_use_cache(self):
+        @emissor_dataclass
+        class TestString:
+            label: str
+
+        @dataclass
+        class NestTest:
+            nested: Any
+
+        instances = [NestTest(TestString("test1")), NestTest(TestString("test2"))]
+        unmarshalled = unmarshal(marshal(instances, cls=NestTest), cls=NestTest)
+
+        self.assertEqual("test2", unmarshalled[1].nested.label)
+        self.assertEqual(2, schema_cache_info().size)
+
+    def test_clear(self):
+        @dataclass
+        class TestString:
+            label: str
+
+        marshal(TestString("testString"), cls=TestString)
+        clear_schema_cache()
+
+        self.assertEqual((0, 0, 0), tuple(schema_cache_info()))
+
+
+class TestUnmarshalStream(TestCase):
+    def test_with_type(self):
+        @dataclass(frozen=True)
+        class TestString:
+            label: str
+
+        instance = [TestString("test" + str(i) * i) for i in range(10)]
+        stream = io.StringIO(marshal(instance, cls=TestString))
+        unmarshalled = unmarshal_stream(stream, cls=TestString, chunk_size=7)
+
+        self.assertListEqual(instance, list(unmarshalled))
+
+    def test_without_type(self):
+        stream = io.StringIO(json.dumps([{"label": "test"}, 1.25, "]", [1, [2]], None, True]))
+        unmarshalled = list(unmarshal_stream(stream, chunk_size=1))
+
+        self.assertEqual("test", unmarshalled[0].label)
+        self.assertListEqual([1.25, "]", [1, [2]], None, True], unmarshalled[1:])
+
+    def test_empty(self):
+        self.assertListEqual([], list(unmarshal_stream(io.StringIO(" [ ] "))))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, lambda: list(unmarshal_stream(io.StringIO("{}"))))
+        self.assertRaises(ValueError, lambda: list(unmarshal_stream(io.StringIO("[1 2]"))))
+        self.assertRaises(ValueError, lambda: list(unmarshal_stream(io.StringIO("[1, {"))))
+
+
+class TestBinaryArrays(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_array_like(self):
+        @dataclass
+        class TestArray:
+            array: ArrayLike
+
+        instance = TestArray(np.arange(32, dtype=np.float32).reshape(4, 8))
+        with BinaryArrayWriter(os.path.join(self.directory, "arrays.bin")) as writer:
+            json_string = marshal(instance, cls=TestArray, array_writer=writer)
+
+        self.assertEqual("arrays.bin", json.loads(json_string)["array"]["@array"])
+
+        unmarshalled = unmarshal(json_string, cls=TestArray, array_reader=BinaryArrayReader(self.directory))
+        np.testing.assert_array_equal(instance.array, unmarshalled.array)
+        self.assertEqual(np.float32, unmarshalled.array.dtype)
+        self.assertFalse(unmarshalled.array.flags.writeable)
+
+    def test_generic_value(self):
+        @dataclass
+        class TestValue:
+            value: Any
+
+        instances = [TestValue(np.full(512, i, dtype=np.float32)) for i in range(3)] + [TestValue("test")]
+        with BinaryArrayWriter(os.path.join(self.directory, "arrays.bin")) as writer:
+            json_string = marshal(instances, cls=TestValue, array_writer=writer)
+
+        unmarshalled = unmarshal(json_string, cls=TestValue, array_reader=BinaryArrayReader(self.directory))
+        for instance, clone in zip(instances[:3], unmarshalled[:3]):
+            np.testing.assert_array_equal(instance.value, clone.value)
+            self.assertEqual(0, clone.value.ctypes.data % BinaryArrayWriter.ALIGNMENT)
+        self.assertEqual("test", unmarshalled[3].value)
+
+    def test_small_arrays_inline(self):
+        @dataclass
+        class TestArray:
+            array: ArrayLike
+
+        with BinaryArrayWriter(os.path.join(self.directory, "arrays.bin"), min_size=16) as writer:
+            json_string = marshal(TestArray(np.arange(4)), cls=TestArray, array_writer=writer)
+
+        self.assertFalse(writer.written)
+        self.assertEqual([0, 1, 2, 3], json.loads(json_string)["array"])
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "arrays.bin")))
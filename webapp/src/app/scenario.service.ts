@@ -46,8 +46,10 @@ export class ScenarioService {
         signal.display = signal.display || fileName;
         break;
       case 'textsignal':
-        (<TextSignal> signal).text = (<TextSignal> signal).seq.join('');
-        signal.display = signal.display || (<TextSignal> signal).text;
+        let textSignal = <TextSignal> signal;
+        // Only the text is serialized, the character sequence is included by older backends
+        textSignal.text = textSignal.text ?? textSignal.seq?.join('') ?? '';
+        signal.display = signal.display || textSignal.text;
         break;
       default:
         throw Error("Unknown signal type: " + signal['@type']);